@@ -0,0 +1,88 @@
+'''Benchmarks the logging done during one chat turn, as time spent in the calling thread: the former
+configuration (synchronous DEBUG sinks, errors printed twice, f-strings formatting full histories)
+against the current one (background writers, INFO level, arguments formatted only when logged), in
+text and JSON, with histories of growing length. Both write to files in a temporary directory.
+
+    python scripts/benchmark_logging.py --turns 500
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+from utils.logger import LOG, BackgroundWriter, log_format
+
+REPLY = 'Welcome to our hotel! May I have your name, please? ' * 10
+
+
+def turn_before(history, messages):
+    # The log calls of a chat turn as they were
+    LOG.debug(f'[Chat history]: {messages}')
+    LOG.debug(f'[history]: {history}')
+    LOG.debug(f'[History window] session=s, messages={len(messages)}/{len(messages)}, summarized=0, tokens=1000')
+    LOG.debug(f'[First visible token]: {0.25:.2f}s')
+    LOG.debug(f'[Tokens sent]: {1000}')
+    LOG.info(f'[Bot message]: {REPLY}')
+
+
+def turn_after(history, messages):
+    LOG.debug('[Chat history]: {}', messages)
+    LOG.debug('[history]: {}', history)
+    LOG.debug('[History window] session={}, messages={}/{}, summarized={}, tokens={}', 's', len(messages), len(messages), 0, 1000)
+    LOG.debug('[Thinking chars]: {}{}', 120, '')
+    LOG.opt(lazy=True).debug('[Tokens sent]: {}', lambda: 1000)
+    LOG.debug('[Bot message]: {}', REPLY)
+    LOG.info('[Request]: {session_id} {status}, ms queued={queue_ms} first_token={first_token_ms} total={total_ms}',
+             session_id='s', model='qwen3', status='ok', queue_ms=0.1, first_token_ms=250.0, total_ms=2000.0, chars=len(REPLY))
+
+
+def configure(directory, before: bool, serialize: bool=False):
+    LOG.remove()  # Stops the previous writers once they have written everything
+    console = open(os.path.join(directory, 'console.log'), 'a', encoding='utf-8')  # Stands in for stderr
+    if before:
+        LOG.add(console, level='DEBUG', format=log_format, colorize=True)
+        LOG.add(console, level='ERROR', format=log_format, colorize=True)
+        LOG.add(os.path.join(directory, 'before.log'), rotation='1 MB', level='DEBUG', format=log_format)
+    else:
+        LOG.add(BackgroundWriter(console), level='INFO', format=log_format, colorize=True)
+        LOG.add(BackgroundWriter(path=os.path.join(directory, 'after.log'), rotation=1024 * 1024), level='INFO',
+                format=log_format, serialize=serialize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Logging benchmark')
+    parser.add_argument('--turns', type=int, default=500)
+    parser.add_argument('--history', type=int, nargs='+', default=[2, 20, 100], help='messages in the history')
+    args = parser.parse_args()
+
+    print(f'{"history":>8} {"config":<14} {"us/turn":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.history:
+            history = InMemoryChatMessageHistory()
+            for i in range(size // 2):
+                history.add_messages([HumanMessage(content=f'Message {i}, I would like to check in.'), AIMessage(content=REPLY)])
+            messages = [message.model_dump() for message in history.messages]
+
+            for name, before, serialize, turn in [('before', True, False, turn_before),
+                                             ('after', False, False, turn_after),
+                                             ('after, JSON', False, True, turn_after)]:
+                configure(directory, before, serialize)
+                start = time.perf_counter()
+                for _ in range(args.turns):
+                    turn(history, messages)
+                elapsed = time.perf_counter() - start
+                print(f'{size:>8} {name:<14} {elapsed / args.turns * 1e6:>9.0f}')
+
+        LOG.remove()
+        with open(os.path.join(directory, 'after.log'), encoding='utf-8') as file:
+            print(f'JSON record fields: {json.loads(file.readlines()[-1])["record"]["extra"]}')
+
+
+if __name__ == '__main__':
+    main()
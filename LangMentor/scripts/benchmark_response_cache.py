@@ -0,0 +1,62 @@
+'''Benchmarks the response cache: simulated learners open the hotel check-in scenario through
+main.serve, as Gradio calls it, against a fake Ollama server with the cache on, and the hit rate,
+saved generation time, mean turn time and model requests are reported. The cache's behaviour is
+covered by tests/test_response_cache.py.
+
+    python scripts/benchmark_response_cache.py --learners 60
+'''
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+
+from fake_ollama import FakeOllama
+
+OPENERS = ["Hi, I'd like to check in", "hi, i'd like to check in.", "Hello, I'd like to check in please",
+           'I have a reservation under Wang', "I'd like to check in"]
+
+
+async def run(main, server: FakeOllama, learners: int):
+    from utils.response_cache import response_cache
+
+    agent = main.scenario_registry.get('hotel_checkin')
+    server.reply = [f'<think>Greet the guest.</think>{reply}' for reply in
+                    ['Welcome! May I have your name, please?', 'Certainly. Could I see your ID?',
+                     'Of course! What name is the booking under?', 'Sure. Do you have a reservation number?']]
+
+    latencies = []
+    for learner in range(learners):
+        session_id = f'benchmark:{learner}'
+        agent.start_new_session(session_id)
+        start = time.perf_counter()
+        async for _ in main.serve(agent, random.choice(OPENERS), session_id):
+            pass
+        latencies.append(time.perf_counter() - start)
+
+    stats = response_cache.stats()
+    print(f'{learners} learners: {stats["hits"]} hits, hit rate {stats["hit_rate"]:.0%}, '
+          f'saved {stats["saved_seconds"]:.1f}s of generation, mean turn {sum(latencies) / len(latencies):.2f}s, '
+          f'{server.requests} model requests')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Response cache benchmark')
+    parser.add_argument('--learners', type=int, default=60)
+    args = parser.parse_args()
+
+    random.seed(0)
+    server = FakeOllama(load_delay=0, token_delay=0.02).start()
+    os.environ['LANGMENTOR_OLLAMA_URL'] = server.url
+    os.environ['LANGMENTOR_RESPONSE_CACHE'] = '1'
+    os.environ.setdefault('LANGMENTOR_LOG_FILE', '')
+
+    from utils.logger import LOG
+    LOG.remove()
+
+    import main
+    asyncio.run(run(main, server, args.learners))
+    server.shutdown()
@@ -0,0 +1,94 @@
+'''Benchmarks removing <think> blocks from multi-megabyte responses: the former regex clean_thinking,
+the current one, and ThinkingFilter fed the response in small streamed chunks. Reports the time, MB/s,
+peak memory allocated while filtering and the visible characters left, for a long reasoning block,
+many short ones and a reasoning block that is never closed.
+
+    python scripts/benchmark_thinking.py --mb 1 4 16
+'''
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+
+from utils.string_utils import ThinkingFilter, clean_thinking
+
+SENTENCE = 'The student wants to check in, so I should ask for the name on the booking. '
+
+
+def clean_thinking_regex(text):
+    # clean_thinking before ThinkingFilter, kept for comparison
+    patterns = [
+        r'<think>.*?</think>',
+    ]
+
+    cleaned_text = text
+    for pattern in patterns:
+        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.DOTALL | re.MULTILINE)
+
+    return cleaned_text.strip()
+
+
+def stream_filter(text, chunk_size):
+    thinking_filter = ThinkingFilter()
+    visible = 0
+    for start in range(0, len(text), chunk_size):
+        visible += len(thinking_filter.feed(text[start:start + chunk_size]))
+    visible += len(thinking_filter.flush())
+    return visible, thinking_filter.thinking_chars
+
+
+def responses(size):
+    reasoning = SENTENCE * (size // len(SENTENCE))
+    answer = 'Welcome! May I have your name, please?'
+    block = f'<think>{SENTENCE * 3}</think>{answer} '
+
+    return {
+        'one long block': f'<think>{reasoning}</think>\n\n{answer}',
+        'many short blocks': block * (size // len(block)),
+        'unclosed block': f'<think>{reasoning}',
+    }
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+
+    # Separate run, tracing allocations slows them down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='clean_thinking benchmark')
+    parser.add_argument('--mb', type=float, nargs='+', default=[1, 4, 16], help='response sizes in MB')
+    parser.add_argument('--chunk', type=int, default=32, help='characters per streamed chunk')
+    args = parser.parse_args()
+
+    print(f'{"size":>6} {"response":<18} {"function":<16} {"seconds":>8} {"MB/s":>8} {"peak MB":>8} {"visible":>10}')
+    for mb in args.mb:
+        size = int(mb * 1024 * 1024)
+        for name, text in responses(size).items():
+            runs = {
+                'regex (before)': lambda: len(clean_thinking_regex(text)),
+                'clean_thinking': lambda: len(clean_thinking(text)),
+                'ThinkingFilter': lambda: stream_filter(text, args.chunk)[0],
+            }
+            for function, run in runs.items():
+                visible, elapsed, peak = measure(run)
+                print(f'{mb:>5}M {name:<18} {function:<16} {elapsed:>8.3f} {len(text) / elapsed / 1e6:>8.1f} '
+                      f'{peak / 1e6:>8.2f} {visible:>10}')
+
+    _, thinking_chars = stream_filter(responses(1024 * 1024)['one long block'], args.chunk)
+    print(f'thinking_chars of the 1M long block: {thinking_chars}')
+
+
+if __name__ == '__main__':
+    main()
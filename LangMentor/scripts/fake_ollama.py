@@ -0,0 +1,170 @@
+'''A local stand-in for the Ollama HTTP API, for exercising LangMentor without a GPU.
+
+Serves /api/chat (streamed NDJSON or a single reply), /api/generate, /api/tags and /api/version.
+The first request for a model waits load_delay seconds, as Ollama does while loading it, unless the
+model was used within keep_alive; each streamed token then takes token_delay seconds. reply may be a
+list, one is picked at random per request like a sampling model would. Like
+OLLAMA_NUM_PARALLEL, at most parallel replies are generated at once, the others wait their turn.
+
+    python scripts/fake_ollama.py --port 11435
+    LANGMENTOR_OLLAMA_URL=http://127.0.0.1:11435 python src/main.py
+'''
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = '<think>The student said hello, greet them back.</think>Hello! Nice to meet you. How are you doing today?'
+
+
+class FakeOllama(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Listen backlog, for load tests with many users
+
+    def __init__(self, port: int=0, load_delay: float=1.0, token_delay: float=0.01, reply: str | list[str]=REPLY,
+                 parallel: int=4):
+        super().__init__(('127.0.0.1', port), FakeOllamaHandler)
+        self.load_delay = load_delay
+        self.token_delay = token_delay
+        self.reply = reply
+        self.requests = 0
+        self.loads = 0
+        self.disconnects = 0  # Replies the client stopped reading
+        self.slots = threading.Semaphore(parallel)
+        self._expires: dict[str, float] = {}  # Model -> time it gets unloaded
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> 'FakeOllama':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def load(self, model: str, keep_alive) -> int:
+        '''Waits for the model like Ollama would, returns the load duration in nanoseconds.'''
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            loaded = self._expires.get(model, 0) > now
+            self._expires[model] = now + _seconds(keep_alive)
+            if not loaded:
+                self.loads += 1
+
+        if loaded:
+            return 0
+        time.sleep(self.load_delay)
+        return int(self.load_delay * 1e9)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive connections, as a real server
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json({'models': [{'name': 'qwen3:latest', 'model': 'qwen3:latest'}]})
+        elif self.path == '/api/version':
+            self._send_json({'version': '0.0.0-fake'})
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        model = body.get('model', '')
+        load_duration = self.server.load(model, body.get('keep_alive', '5m'))
+
+        if self.path == '/api/generate':
+            # An empty prompt only loads the model
+            self._send_json({**_stats(model, load_duration), 'response': '', 'done': True, 'done_reason': 'load'})
+        elif self.path == '/api/chat':
+            reply = self.server.reply
+            tokens = _tokens(random.choice(reply) if isinstance(reply, list) else reply)
+            num_predict = (body.get('options') or {}).get('num_predict')
+            if num_predict is not None and num_predict >= 0:
+                tokens = tokens[:num_predict]
+            self._chat(model, tokens, load_duration, body.get('stream', True))
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def _chat(self, model: str, tokens: list[str], load_duration: int, stream: bool):
+        final = {**_stats(model, load_duration), 'message': {'role': 'assistant', 'content': ''},
+                 'done': True, 'done_reason': 'stop', 'eval_count': len(tokens)}
+
+        with self.server.slots:
+            if not stream:
+                time.sleep(self.server.token_delay * len(tokens))
+                final['message']['content'] = ''.join(tokens)
+                self._send_json(final)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for token in tokens:
+                    time.sleep(self.server.token_delay)
+                    self._write_chunk({**_stats(model), 'message': {'role': 'assistant', 'content': token}, 'done': False})
+                self._write_chunk(final)
+                self.wfile.write(b'0\r\n\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                self.server.disconnects += 1  # The client cancelled the request
+                self.close_connection = True
+
+    def _write_chunk(self, data: dict):
+        line = json.dumps(data).encode() + b'\n'
+        self.wfile.write(f'{len(line):x}\r\n'.encode() + line + b'\r\n')
+        self.wfile.flush()
+
+    def _send_json(self, data: dict, status: int=200):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _tokens(text: str) -> list[str]:
+    # Roughly one token per word, keeping the spaces so the pieces join back to the text
+    tokens, start = [], 0
+    for i in range(1, len(text)):
+        if text[i] in ' <' or text[i - 1] == '>':
+            tokens.append(text[start:i])
+            start = i
+    return tokens + [text[start:]]
+
+
+def _stats(model: str, load_duration: int=0) -> dict:
+    return {'model': model, 'created_at': datetime.now(timezone.utc).isoformat(), 'load_duration': load_duration}
+
+
+def _seconds(keep_alive) -> float:
+    if isinstance(keep_alive, (int, float)):
+        return float('inf') if keep_alive < 0 else keep_alive
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    for unit in sorted(units, key=len, reverse=True):
+        if keep_alive.endswith(unit) and keep_alive[:-len(unit)].lstrip('-').replace('.', '', 1).isdigit():
+            seconds = float(keep_alive[:-len(unit)])
+            return float('inf') if seconds < 0 else seconds * units[unit]
+    return 300.0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Ollama server')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--load-delay', type=float, default=1.0, help='seconds to "load" a model')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='seconds per streamed token')
+    parser.add_argument('--parallel', type=int, default=4, help='replies generated at once')
+    args = parser.parse_args()
+
+    server = FakeOllama(args.port, args.load_delay, args.token_delay, parallel=args.parallel)
+    print(f'Fake Ollama listening on {server.url}')
+    server.serve_forever()
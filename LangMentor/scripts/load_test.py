@@ -0,0 +1,118 @@
+'''Load test of the chat handlers against a fake Ollama server: simulated users chat concurrently
+through main.handle_conversation, as Gradio calls it, and the p50/p95 latencies, throughput and
+rejected requests are reported for each number of users. The history budget is small, so that the
+history summaries take their share of the model's slots as they would over longer conversations.
+Finally a request is cancelled mid-reply to check it frees its slot and stops the model's stream.
+
+    python scripts/load_test.py --users 1 10 100 --parallel 4
+'''
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+
+from fake_ollama import FakeOllama
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float('nan')
+
+
+async def user(main, n: int, turns: int, latencies: list, first_tokens: list, errors: list):
+    request = SimpleNamespace(session_hash=f'load-test-{n}')
+    for turn in range(turns):
+        start = time.perf_counter()
+        first_token = None
+        try:
+            async for _ in main.handle_conversation(f'Hello, this is turn {turn}.', [], request):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+        except Exception as e:
+            errors.append(e)
+            continue
+        latencies.append(time.perf_counter() - start)
+        first_tokens.append(first_token)
+
+
+async def run(main, users: int, turns: int) -> dict:
+    latencies, first_tokens, errors = [], [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(user(main, n, turns, latencies, first_tokens, errors) for n in range(users)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'users': users,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'first_p50': percentile(first_tokens, 0.5),
+        'first_p95': percentile(first_tokens, 0.95),
+        'throughput': len(latencies) / elapsed,
+        'rejected': len(errors),
+    }
+
+
+async def check_cancellation(main, server: FakeOllama):
+    gate = main.model_registry.gate(main.conversation_agent.llm.model)
+    cancelled, disconnects = gate.cancelled, server.disconnects
+
+    async def chat():
+        async for _ in main.handle_conversation('Hello', [], SimpleNamespace(session_hash='load-test-cancel')):
+            first_token.set()
+
+    first_token = asyncio.Event()
+    task = asyncio.create_task(chat())
+    await first_token.wait()
+    task.cancel()  # What Gradio does when the user leaves the page
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0.5)  # Let the server notice the closed stream
+
+    print(f'cancellation: slot freed={gate.running == 0}, counted={gate.cancelled == cancelled + 1}, '
+          f'server stream stopped={server.disconnects > disconnects}')
+
+
+async def load_test(args, server: FakeOllama):
+    import main
+    from utils.logger import LOG
+
+    LOG.remove()  # Per-request logging would dominate the timings
+    LOG.add(sys.stderr, level='ERROR')
+
+    print(f'{"users":>6} {"p50 s":>8} {"p95 s":>8} {"first p50":>10} {"first p95":>10} {"req/s":>8} {"rejected":>9}')
+    for users in args.users:
+        result = await run(main, users, args.turns)
+        print(f'{result["users"]:>6} {result["p50"]:>8.2f} {result["p95"]:>8.2f} {result["first_p50"]:>10.2f} '
+              f'{result["first_p95"]:>10.2f} {result["throughput"]:>8.1f} {result["rejected"]:>9}')
+
+    history_window = main.conversation_agent.history_window
+    await asyncio.to_thread(lambda: history_window._executor.submit(lambda: None).result())  # Pending summaries
+    print(f'summaries: {history_window.summaries}, failed {history_window.summary_failures}')
+
+    await check_cancellation(main, server)
+    print(f'gate: {main.model_registry.gate(main.conversation_agent.llm.model).stats()}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='LangMentor load test')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 2, 5, 10, 20, 50, 100])
+    parser.add_argument('--turns', type=int, default=3, help='requests per user, one after the other')
+    parser.add_argument('--parallel', type=int, default=4, help="fake server's parallel replies")
+    parser.add_argument('--token-delay', type=float, default=0.01, help='seconds per streamed token')
+    parser.add_argument('--history-tokens', type=int, default=32, help='verbatim history budget')
+    parser.add_argument('--summary-tokens', type=int, default=16, help='tokens past the budget summarized at once')
+    args = parser.parse_args()
+
+    server = FakeOllama(load_delay=0, token_delay=args.token_delay, parallel=args.parallel).start()
+
+    # The app reads its configuration on import
+    os.environ['LANGMENTOR_OLLAMA_URL'] = server.url
+    os.environ.setdefault('LANGMENTOR_MODEL_CONCURRENCY', str(args.parallel))
+    os.environ['LANGMENTOR_HISTORY_TOKENS'] = str(args.history_tokens)
+    os.environ['LANGMENTOR_SUMMARY_BATCH_TOKENS'] = str(args.summary_tokens)
+
+    asyncio.run(load_test(args, server))
+    server.shutdown()
@@ -1,12 +1,14 @@
 import os
+from contextlib import aclosing
+from typing import AsyncIterator
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_ollama import ChatOllama
 # from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from utils.session_history import get_session_history
+from utils.history_window import HISTORY_MAX_TOKENS, SUMMARY_BATCH_TOKENS, HistoryWindow, count_tokens, make_llm_summarizer
 from utils.logger import LOG
-from utils.string_utils import clean_thinking
+from utils.model_registry import close_on_cancel, model_registry
+from utils.string_utils import ThinkingFilter, astream_without_thinking, clean_thinking
 
 # Message history store
 # store = {}
@@ -33,20 +35,27 @@ class ConversationAgent:
             )
         ])
 
-        self.chat_bot = self.prompt | ChatOllama(
-            model='qwen3',
-            max_tokens=8192,
-            temperature=0.8
+        # Shared with the other agents using the same model and options
+        self.llm = model_registry.get('qwen3', num_predict=8192, temperature=0.8)
+        self.chat_bot = self.prompt | self.llm
+
+        # Send the recent history verbatim and older turns as a summary
+        self.history_window = HistoryWindow(
+            max_tokens=HISTORY_MAX_TOKENS,
+            summarize=make_llm_summarizer(self.llm),
+            summary_batch_tokens=SUMMARY_BATCH_TOKENS,
+            fixed_tokens=count_tokens(self.system_prompt)
         )
 
         self.chat_bot_with_history = RunnableWithMessageHistory(
             self.chat_bot,
-            get_session_history
+            self.history_window.get_session_history
         )
 
-        self.config = {
+    def session_config(self, session_id: str) -> dict:
+        return {
             'configurable': {
-                'session_id': 'default_session',
+                'session_id': session_id,
             }
         }
 
@@ -57,11 +66,34 @@ class ConversationAgent:
 
         return response.content
     
-    def chat_with_history(self, user_input: str) -> str:
+    def chat_with_history(self, user_input: str, session_id: str='default_session') -> str:
         response = self.chat_bot_with_history.invoke([
             HumanMessage(content=user_input),
-        ], self.config)
+        ], self.session_config(session_id))
 
         LOG.debug(response)
 
         return clean_thinking(response.content)
+
+    def cached_reply(self, user_input: str, session_id: str) -> tuple[list, str | None]:
+        '''Free conversation replies are not cached, see ScenarioAgent.cached_reply.'''
+        return [], None
+
+    async def astream_with_history(self, user_input: str, session_id: str='default_session') -> AsyncIterator[str]:
+        '''Streaming chat_with_history: yields the visible parts of the response as they are generated,
+        with the <think> block filtered out on the fly.'''
+        chunks = self.chat_bot_with_history.astream([
+            HumanMessage(content=user_input),
+        ], self.session_config(session_id))
+
+        thinking_filter = ThinkingFilter()
+
+        # Closing the stream when the caller stops early (e.g. a cancelled request) stops the model's reply
+        async with aclosing(close_on_cancel(chunks)) as chunks:
+            async for text in astream_without_thinking((chunk.content async for chunk in chunks), thinking_filter):
+                yield text
+
+        LOG.debug('[Thinking chars]: {}{}', thinking_filter.thinking_chars,
+                  ' (unclosed <think>)' if thinking_filter.in_thinking else '')
+        LOG.opt(lazy=True).debug('[Tokens sent]: {}',
+                                 lambda: self.history_window.last_tokens(session_id) + count_tokens(user_input))
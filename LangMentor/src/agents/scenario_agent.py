@@ -1,13 +1,20 @@
+import asyncio
 import json
 import random
 import os
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_ollama import ChatOllama
+import time
+from contextlib import aclosing
+from typing import AsyncIterator
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.messages import AIMessage, HumanMessage
+from utils.history_window import HISTORY_MAX_TOKENS, SUMMARY_BATCH_TOKENS, HistoryWindow, count_tokens, make_llm_summarizer
+from utils.file_cache import file_cache
 from utils.session_history import get_session_history
 from utils.logger import LOG
-from utils.string_utils import clean_thinking
+from utils.model_registry import close_on_cancel, model_registry
+from utils.response_cache import response_cache
+from utils.string_utils import ThinkingFilter, astream_without_thinking, clean_thinking
 
 class ScenarioAgent:
     def __init__(self, scenario_name):
@@ -16,25 +23,45 @@ class ScenarioAgent:
         self.greetings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, os.path.pardir, 'content', 'greetings', f'{scenario_name}.json')
         
         self.prompt = self.load_prompt()
-        self.greetings = self.load_greetings()
+
+        # Shared with the other agents using the same model and options
+        self.llm = model_registry.get('qwen3', num_predict=8192, temperature=0.8)
+
+        # Send the recent history verbatim and older turns as a summary. Kept across prompt edits,
+        # so the sessions' summaries survive them
+        self.history_window = HistoryWindow(
+            max_tokens=HISTORY_MAX_TOKENS,
+            summarize=make_llm_summarizer(self.llm),
+            summary_batch_tokens=SUMMARY_BATCH_TOKENS
+        )
 
         self.create_chatbot()
 
+    @property
+    def greetings(self) -> list[str]:
+        return self.load_greetings()
+
     def load_prompt(self):
         try:
-            with open(self.prompt_file, 'r', encoding='utf-8') as file:
-                return file.read().strip()
+            return file_cache.load(self.prompt_file, str.strip)
         except FileNotFoundError:
             raise ValueError(f'Prompt file {self.prompt_file} not found.')
 
     def load_greetings(self):
         try:
-            with open(self.greetings_file, 'r', encoding='utf-8') as file:
-                return json.load(file)
+            return file_cache.load(self.greetings_file, json.loads)
         except FileNotFoundError:
-            raise ValueError(f'Intro file {self.greetings_file} not found.')
+            raise ValueError(f'Greetings file {self.greetings_file} not found.')
         except json.JSONDecodeError:
             raise ValueError(f'Error decoding JSON from {self.greetings_file}.')
+
+    def refresh(self):
+        '''Rebuilds the chatbot if the prompt file was edited since it was built.'''
+        prompt = self.load_prompt()
+        if prompt != self.prompt:
+            LOG.info('[Scenario] prompt of {} changed, rebuilding the chatbot', self.name)
+            self.prompt = prompt
+            self.create_chatbot()
         
     def create_chatbot(self):
         system_prompt = ChatPromptTemplate.from_messages([
@@ -42,20 +69,17 @@ class ScenarioAgent:
             ('system', self.prompt)
         ])
 
-        self.chatbot = system_prompt | ChatOllama(
-            model='qwen3',
-            max_tokens=8192,
-            temperature=0.8
-        )
+        self.chatbot = system_prompt | self.llm
+        self.history_window.fixed_tokens = count_tokens(self.prompt)
 
-        self.chatbot_with_history = RunnableWithMessageHistory(self.chatbot, get_session_history)
+        self.chatbot_with_history = RunnableWithMessageHistory(self.chatbot, self.history_window.get_session_history)
 
     def start_new_session(self, session_id: str='default_session'):
         if session_id is None or session_id.strip() == '':
             session_id = self.name
 
         history = get_session_history(session_id)
-        LOG.debug(f'[history]: {history}')
+        LOG.debug('[history]: {}', history)
 
         if not history.messages:
             greeting = random.choice(self.greetings)
@@ -64,10 +88,34 @@ class ScenarioAgent:
         else:
             return history.messages[-1].content
 
+    def cached_reply(self, user_input: str, session_id: str) -> tuple[list, str | None]:
+        '''With the response cache enabled, looks up a reply to user_input and records it in the session's history
+        as the model's. Returns the messages before this turn, to cache the model's reply with, and the reply or None.'''
+        if response_cache is None:
+            return [], None
+
+        history = get_session_history(session_id)
+        messages = list(history.messages)  # The memory backend returns its live list
+        reply = response_cache.get(self.name, messages, user_input)
+        if reply is not None:
+            history.add_messages([HumanMessage(content=user_input), AIMessage(content=reply)])
+            LOG.opt(lazy=True).debug('[Response cache] hit: {}', response_cache.stats)
+
+        return messages, reply
+
+    def cache_reply(self, messages: list, user_input: str, reply: str, seconds: float):
+        if response_cache is not None and reply:
+            response_cache.put(self.name, messages, user_input, reply, seconds)
+
     def chat_with_history(self, user_input: str, session_id: str='default_session'):
         if session_id is None or session_id.strip() == '':
             session_id = self.name
 
+        messages, reply = self.cached_reply(user_input, session_id)
+        if reply is not None:
+            return reply
+
+        start = time.perf_counter()
         response = self.chatbot_with_history.invoke(
             [
                 HumanMessage(content=user_input),
@@ -79,4 +127,41 @@ class ScenarioAgent:
             }
         )
 
-        return clean_thinking(response.content)
+        reply = clean_thinking(response.content)
+        self.cache_reply(messages, user_input, reply, time.perf_counter() - start)
+        return reply
+
+    async def astream_with_history(self, user_input: str, session_id: str='default_session') -> AsyncIterator[str]:
+        '''Streaming chat_with_history: yields the visible parts of the response as they are generated,
+        with the <think> block filtered out on the fly. The reply is always generated; callers look up
+        cached replies first with cached_reply, before waiting for a slot of the model.'''
+        if session_id is None or session_id.strip() == '':
+            session_id = self.name
+
+        messages = list(get_session_history(session_id).messages) if response_cache is not None else []
+        start = time.perf_counter()
+        chunks = self.chatbot_with_history.astream(
+            [
+                HumanMessage(content=user_input),
+            ],
+            {
+                'configurable': {
+                    'session_id': session_id,
+                }
+            }
+        )
+
+        reply = ''
+        thinking_filter = ThinkingFilter()
+
+        # Closing the stream when the caller stops early (e.g. a cancelled request) stops the model's reply
+        async with aclosing(close_on_cancel(chunks)) as chunks:
+            async for text in astream_without_thinking((chunk.content async for chunk in chunks), thinking_filter):
+                reply += text
+                yield text
+
+        await asyncio.to_thread(self.cache_reply, messages, user_input, reply, time.perf_counter() - start)
+        LOG.debug('[Thinking chars]: {}{}', thinking_filter.thinking_chars,
+                  ' (unclosed <think>)' if thinking_filter.in_thinking else '')
+        LOG.opt(lazy=True).debug('[Tokens sent]: {}',
+                                 lambda: self.history_window.last_tokens(session_id) + count_tokens(user_input))
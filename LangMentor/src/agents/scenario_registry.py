@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from agents.scenario_agent import ScenarioAgent
+from utils.file_cache import file_cache
+from utils.logger import LOG
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, os.path.pardir)
+PROMPTS_DIR = os.path.join(ROOT_DIR, 'prompts')
+GREETINGS_DIR = os.path.join(ROOT_DIR, 'content', 'greetings')
+INTRO_DIR = os.path.join(ROOT_DIR, 'content', 'intro')
+
+
+class ScenarioRegistry:
+    '''Scenarios discovered from the content directories: every name with a prompt (prompts/<name>.md),
+    greetings (content/greetings/<name>.json) and an intro (content/intro/<name>.md).
+
+    Agents are built on first use and kept. Files are read through file_cache and the scenario list is
+    rescanned only when a directory changes. Like file_cache, the directories are stat'ed at most once
+    every check_interval seconds, so most clicks cost no system call and edits are picked up within it.'''
+
+    def __init__(self, check_interval: float=1.0):
+        self.check_interval = check_interval
+        self._agents: dict[str, ScenarioAgent] = {}
+        self._names: tuple[tuple[int, ...], list[str]] = ((), [])  # (directory mtimes, names)
+        self._checked = -float('inf')
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self._names[1]
+
+        self._checked = now
+        mtimes = tuple(os.stat(directory).st_mtime_ns for directory in (PROMPTS_DIR, GREETINGS_DIR, INTRO_DIR))
+        if mtimes != self._names[0]:
+            names = (_stems(PROMPTS_DIR, '.md') & _stems(GREETINGS_DIR, '.json') & _stems(INTRO_DIR, '.md'))
+            self._names = (mtimes, sorted(names))
+            LOG.debug('[Scenario registry] scenarios: {}', self._names[1])
+
+        return self._names[1]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names()
+
+    def get(self, name: str) -> ScenarioAgent:
+        if name not in self:
+            raise ValueError(f'Unknown scenario {name}.')
+
+        # Building and refreshing under the lock, so concurrent clicks never rebuild the same agent twice
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._agents[name] = ScenarioAgent(name)
+            else:
+                agent.refresh()
+
+        return agent
+
+    def intro(self, name: str) -> str:
+        filepath = os.path.join(INTRO_DIR, f'{name}.md')
+
+        try:
+            return file_cache.load(filepath, str.strip)
+        except FileNotFoundError:
+            raise ValueError(f'Intro file {filepath} not found.')
+
+
+def _stems(directory: str, extension: str) -> set[str]:
+    return {entry.name[:-len(extension)] for entry in os.scandir(directory) if entry.name.endswith(extension)}
+
+
+scenario_registry = ScenarioRegistry()
@@ -1,43 +1,120 @@
+import asyncio
 import os
+import time
+from contextlib import aclosing
 import gradio as gr
 from agents.conversation_agent import ConversationAgent
-from agents.scenario_agent import ScenarioAgent
+from agents.scenario_registry import scenario_registry
 from utils.logger import LOG
+from utils.model_registry import QueueFullError, model_registry
+from utils.response_cache import response_cache
+from utils.session_history import session_store
 
 
 conversation_agent = ConversationAgent()
 
-scenario_agents = {
-    'hotel_checkin': ScenarioAgent('hotel_checkin'),
+# Labels of the scenarios in the selector, others are shown by name
+SCENARIO_LABELS = {
+    'hotel_checkin': '酒店入住',
+    'job_interview': '求职面试',
 }
 
 
-def handle_conversation(user_input, history):
-    LOG.debug(f'[Chat history]: {history}')
+def session_id_for(request: gr.Request | None, name: str) -> str:
+    # One history per browser session and conversation; falls back to a shared one outside Gradio
+    if request is None or not request.session_hash:
+        return name
+    return f'{request.session_hash}:{name}'
 
-    bot_message = conversation_agent.chat_with_history(user_input)
 
-    LOG.info(f'[Bot message]: {bot_message}')
+def end_sessions(request: gr.Request):
+    for name in ['conversation', *scenario_registry.names()]:
+        session_store.delete(session_id_for(request, name))
+    LOG.opt(lazy=True).debug('[Session store]: {}', session_store.stats)
 
-    return bot_message
 
+async def stream_to_chat(chunks):
+    # ChatInterface streams by re-rendering the whole message, so yield the text so far
+    bot_message = ''
+
+    async for text in chunks:
+        bot_message += text
+        yield bot_message
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
 
-def get_scenario_intro(name: str):
-    filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'content', 'intro', f'{name}.md')
+
+async def serve(agent, user_input: str, session_id: str):
+    # A cached reply is returned at once; otherwise waits for a free slot of the agent's model. Gradio cancels
+    # the task when the user leaves the page, which closes the model's stream and frees the slot. Every request
+    # ends with one [Request] record whose fields (status and latencies) are in record.extra, JSON fields with
+    # LANGMENTOR_LOG_JSON=1
+    start = time.perf_counter()
+    fields = {'session_id': session_id, 'model': agent.llm.model, 'status': 'ok',
+              'queue_ms': None, 'first_token_ms': None, 'total_ms': None, 'chars': 0}
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return file.read().strip()
-    except FileNotFoundError:
-        raise ValueError(f'Intro file {filepath} not found.')
+        if response_cache is not None:
+            # Off the event loop: the embedding may be a request to the embedding model
+            _, reply = await asyncio.to_thread(agent.cached_reply, user_input, session_id)
+            if reply is not None:
+                fields.update(status='cached', first_token_ms=elapsed_ms(start), chars=len(reply))
+                yield reply
+                return
+
+        async with model_registry.gate(agent.llm.model):
+            fields['queue_ms'] = elapsed_ms(start)
+            async with aclosing(agent.astream_with_history(user_input, session_id=session_id)) as chunks:
+                async for bot_message in stream_to_chat(chunks):
+                    if fields['first_token_ms'] is None:
+                        fields['first_token_ms'] = elapsed_ms(start)
+                    fields['chars'] = len(bot_message)
+                    yield bot_message
+    except QueueFullError:
+        fields['status'] = 'rejected'
+        raise gr.Error('当前练习的人太多了，请稍后再试。')
+    except (asyncio.CancelledError, GeneratorExit):
+        fields['status'] = 'cancelled'
+        raise
+    except Exception:
+        fields['status'] = 'error'
+        raise
+    finally:
+        fields['total_ms'] = elapsed_ms(start)
+        LOG.log('INFO' if fields['status'] in ('ok', 'cached', 'cancelled') else 'WARNING',
+                '[Request]: {session_id} {status}, ms queued={queue_ms} first_token={first_token_ms} total={total_ms}',
+                **fields)
+
+
+async def handle_conversation(user_input, history, request: gr.Request):
+    LOG.debug('[Chat history]: {}', history)
+
+    session_id = session_id_for(request, 'conversation')
+    bot_message = ''
+    async with aclosing(serve(conversation_agent, user_input, session_id)) as replies:
+        async for bot_message in replies:
+            yield bot_message
+
+    LOG.debug('[Bot message]: {}', bot_message)
 
 
-def handle_scenario(user_input, history, name):
-    bot_message = scenario_agents[name].chat_with_history(user_input, session_id=name)
-    
-    LOG.info(f'[Scenario Bot message]: {bot_message}')
+def get_scenario_intro(name: str):
+    return scenario_registry.intro(name)
+
+
+async def handle_scenario(user_input, history, name, request: gr.Request):
+    if name not in scenario_registry:
+        raise gr.Error('请先选择一个场景。')
+
+    session_id = session_id_for(request, name)
+    bot_message = ''
+    async with aclosing(serve(scenario_registry.get(name), user_input, session_id)) as replies:
+        async for bot_message in replies:
+            yield bot_message
     
-    return bot_message
+    LOG.debug('[Scenario Bot message]: {}', bot_message)
 
 
 def create_gradio_app():
@@ -46,13 +123,10 @@ def create_gradio_app():
         with gr.Tab('场景对话'):
             gr.Markdown('## 场景对话练习')
 
+            # Scenarios found in the content directories, their agents are built when first chosen
             scenario_selector = gr.Radio(
-                choices=[
-                    ('酒店入住', 'hotel_checkin'),
-                    ('求职面试', 'job_interview'),
-                ],
-                label='选择场景',
-                value='酒店入住'
+                choices=[(SCENARIO_LABELS.get(name, name), name) for name in scenario_registry.names()],
+                label='选择场景'
             )
 
             scenario_home = gr.Markdown()
@@ -62,8 +136,8 @@ def create_gradio_app():
                 type='messages'
             )
 
-            def start_new_scenario_chatbot(scenario_name):
-                greeting = scenario_agents[scenario_name].start_new_session(session_id=scenario_name)
+            def start_new_scenario_chatbot(scenario_name, request: gr.Request):
+                greeting = scenario_registry.get(scenario_name).start_new_session(session_id=session_id_for(request, scenario_name))
 
                 return gr.Chatbot(
                     value=[{
@@ -74,8 +148,11 @@ def create_gradio_app():
                     type='messages',
                 )
             
+            def change_scenario(scenario_name, request: gr.Request):
+                return get_scenario_intro(scenario_name), start_new_scenario_chatbot(scenario_name, request)
+
             scenario_selector.change(
-                fn=lambda x: (get_scenario_intro(x), start_new_scenario_chatbot(x)),
+                fn=change_scenario,
                 inputs=scenario_selector,
                 outputs=[scenario_home, scenario_chatbot]
             )
@@ -103,12 +180,24 @@ def create_gradio_app():
                 type='messages'
             )
 
+        # Release the histories of a browser session when it closes
+        lang_mentor_app.unload(end_sessions)
+
     return lang_mentor_app
 
 
 if __name__ == "__main__":
-    # Launch the Gradio app
+    # Load the model before the first user arrives; LANGMENTOR_WARMUP=0 skips it
+    if os.getenv('LANGMENTOR_WARMUP', '1') != '0':
+        model_registry.warm_up()
+
+    # Launch the Gradio app; requests are limited per model by model_registry.gate instead of one at a time
+    # per event, and at most LANGMENTOR_MAX_QUEUE more wait in Gradio's queue
     lang_mentor_app = create_gradio_app()
+    lang_mentor_app.queue(
+        default_concurrency_limit=None,
+        max_size=model_registry.max_queue,
+    )
 
     lang_mentor_app.launch(
         share=False,
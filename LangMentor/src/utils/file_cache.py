@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+
+class FileCache:
+    '''Parsed file contents by path. A file is stat'ed at most once every check_interval seconds, and only
+    read and parsed again when its modification time or size changed, so edits are picked up on the first
+    load after that.'''
+
+    def __init__(self, check_interval: float=1.0):
+        self.check_interval = check_interval
+        self.reads = 0
+        self._entries: dict[str, tuple[tuple[int, int], object, float]] = {}  # path -> ((mtime, size), value, checked)
+        self._lock = threading.Lock()
+
+    def load(self, path: str, parse: Callable[[str], T]) -> T:
+        '''Returns parse(file text), raises FileNotFoundError like open.'''
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and now - entry[2] < self.check_interval:
+            return entry[1]
+
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self._entries[path] = (version, entry[1], now)
+            return entry[1]
+
+        with open(path, 'r', encoding='utf-8') as file:
+            value = parse(file.read())
+
+        with self._lock:
+            self._entries[path] = (version, value, now)
+            self.reads += 1
+        return value
+
+
+file_cache = FileCache()
@@ -0,0 +1,193 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from utils.logger import LOG
+from utils.model_registry import model_registry
+from utils.session_history import SessionStore, session_store
+from utils.string_utils import clean_thinking
+
+# Verbatim history budget per turn, and tokens past it summarized at once, configured from the environment
+HISTORY_MAX_TOKENS = int(os.getenv('LANGMENTOR_HISTORY_TOKENS', 2048))
+SUMMARY_BATCH_TOKENS = int(os.getenv('LANGMENTOR_SUMMARY_BATCH_TOKENS', 256))
+
+# CJK characters are about one token each, other words about one token per 4 characters
+TOKEN_PATTERN = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]|\w+|[^\w\s]')
+
+SUMMARY_PROMPT = '''Summarize the earlier part of this English practice conversation between a student and their teacher in a few sentences.
+Keep the student's personal details, the scenario progress and the mistakes they made. Reply with the summary only.'''
+
+
+def count_tokens(text: str) -> int:
+    '''Approximate token count, close enough to budget prompts without loading the model's tokenizer.'''
+    return sum(1 if len(match) == 1 else (len(match) + 3) // 4 for match in TOKEN_PATTERN.findall(text))
+
+
+def make_llm_summarizer(llm: BaseChatModel) -> Callable[[str, list[BaseMessage]], str]:
+    '''Returns a summarize(previous_summary, messages) function that asks llm for an updated summary,
+    in one of the slots of the model's gate like the chat requests.'''
+    def summarize(previous_summary: str, messages: list[BaseMessage]) -> str:
+        transcript = '\n'.join(f'{"Student" if isinstance(message, HumanMessage) else "Teacher"}: {message.content}'
+                               for message in messages)
+        if previous_summary:
+            transcript = f'Summary so far: {previous_summary}\n\n{transcript}'
+
+        with model_registry.gate(llm.model).blocking():
+            response = llm.invoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)])
+        return clean_thinking(response.content)
+
+    return summarize
+
+
+class WindowedChatMessageHistory(BaseChatMessageHistory):
+    '''A session's stored history as seen by the chain: reads go through HistoryWindow.window,
+    writes go to the full stored history.'''
+
+    def __init__(self, window: 'HistoryWindow', session_id: str, history: BaseChatMessageHistory):
+        self.window = window
+        self.session_id = session_id
+        self.history = history
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        return self.window.window(self.session_id, self.history.messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.history.add_messages(messages)
+
+    def clear(self) -> None:
+        self.history.clear()
+        self.window.forget(self.session_id)
+
+
+class HistoryWindow:
+    '''Token-budgeted view of the session histories for RunnableWithMessageHistory.
+
+    The most recent messages are sent verbatim up to max_tokens (always at least the last one), with
+    <think> blocks removed from the model's earlier replies. Older messages are replaced by a running
+    summary kept per session. Once at least summary_batch_tokens of messages past the budget are not in
+    the summary yet, a background thread folds them in with summarize(previous_summary, messages), so the
+    request path never waits for it; until then they are still sent verbatim, over the budget, so that
+    nothing leaves the prompt before it is in the summary. Without summarize they are dropped.
+    fixed_tokens (e.g. the system prompt) is added to the tokens reported for each turn. The state of the
+    max_sessions most recently used sessions is kept, and dropped when the store deletes or evicts them.'''
+
+    def __init__(self, max_tokens: int=2048, summarize: Callable[[str, list[BaseMessage]], str] | None=None,
+                 summary_batch_tokens: int=256, fixed_tokens: int=0, max_sessions: int=1000,
+                 store: SessionStore=session_store):
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.summary_batch_tokens = summary_batch_tokens
+        self.fixed_tokens = fixed_tokens
+        self.max_sessions = max_sessions
+        self.store = store
+        self.summaries = 0  # Summaries made
+        self.summary_failures = 0
+
+        self._lock = threading.Lock()
+        # session -> (messages summarized, summary, tokens sent on the last turn)
+        self._sessions: OrderedDict[str, tuple[int, str, int]] = OrderedDict()
+        self._refreshing: dict[str, object] = {}  # session -> token of its summary in progress
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-summary')
+        store.on_remove(self.forget)
+
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        return WindowedChatMessageHistory(self, session_id, self.store.get(session_id))
+
+    def last_tokens(self, session_id: str) -> int:
+        '''Tokens sent on the last turn of the session, 0 if unknown.'''
+        with self._lock:
+            return self._sessions.get(session_id, (0, '', 0))[2]
+
+    def forget(self, session_id: str):
+        '''Drops the session's summary, e.g. once its history is cleared or deleted.'''
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._refreshing.pop(session_id, None)
+
+    def window(self, session_id: str, messages: list[BaseMessage]) -> list[BaseMessage]:
+        messages = [_without_thinking(message) for message in messages]
+
+        # Walk back from the newest message until the budget is spent
+        start, tokens = len(messages), 0
+        while start > 0:
+            message_tokens = count_tokens(messages[start - 1].content)
+            if tokens + message_tokens > self.max_tokens and start < len(messages):
+                break
+            tokens += message_tokens
+            start -= 1
+
+        with self._lock:
+            summarized, summary, _ = self._sessions.get(session_id, (0, '', 0))
+        if summarized > len(messages):
+            summarized, summary = 0, ''  # The history was cleared behind our back
+
+        if start > summarized and self.summarize is not None:
+            self._maybe_refresh(session_id, messages[summarized:start], start, summary)
+            # Not in the summary yet, keep them
+            tokens += sum(count_tokens(message.content) for message in messages[summarized:start])
+            start = summarized
+
+        window = messages[start:]
+        if summary and start > 0:
+            summary_message = SystemMessage(content=f'Summary of the earlier conversation: {summary}')
+            window.insert(0, summary_message)
+            tokens += count_tokens(summary_message.content)
+
+        with self._lock:
+            summarized, summary, _ = self._sessions.pop(session_id, (summarized, summary, 0))
+            self._sessions[session_id] = (summarized, summary, self.fixed_tokens + tokens)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        LOG.debug('[History window] session={}, messages={}/{}, summarized={}, tokens={}',
+                  session_id, len(window), len(messages), summarized, self.fixed_tokens + tokens)
+        return window
+
+    def _maybe_refresh(self, session_id: str, dropped: list[BaseMessage], upto: int, summary: str):
+        if sum(count_tokens(message.content) for message in dropped) < self.summary_batch_tokens:
+            return
+
+        token = object()
+        with self._lock:
+            if session_id in self._refreshing:
+                return
+            self._refreshing[session_id] = token
+
+        self._executor.submit(self._refresh, session_id, dropped, upto, summary, token)
+
+    def _refresh(self, session_id: str, dropped: list[BaseMessage], upto: int, summary: str, token: object):
+        try:
+            new_summary = self.summarize(summary, dropped)
+        except Exception as e:
+            LOG.error('[History window] summary of session {} failed: {}', session_id, e)
+            new_summary = None
+
+        with self._lock:
+            if new_summary is None:
+                self.summary_failures += 1
+            else:
+                self.summaries += 1
+
+            # The session may have been forgotten meanwhile, its summary is then out of date
+            if self._refreshing.get(session_id) is not token:
+                return
+            del self._refreshing[session_id]
+
+            entry = self._sessions.pop(session_id, (0, '', 0))
+            if new_summary is not None and upto > entry[0]:
+                entry = (upto, new_summary, entry[2])
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+def _without_thinking(message: BaseMessage) -> BaseMessage:
+    if isinstance(message, AIMessage) and '<think>' in message.content:
+        return AIMessage(content=clean_thinking(message.content))
+    return message
@@ -1,14 +1,161 @@
+import os
+import queue
 import sys
+import threading
+from datetime import datetime
+from typing import TextIO
 from loguru import logger
 
+# Configured from the environment:
+#   LANGMENTOR_LOG_LEVEL         console level (default INFO)
+#   LANGMENTOR_LOG_FILE_LEVEL    file level (default LANGMENTOR_LOG_LEVEL)
+#   LANGMENTOR_LOG_FILE          rotating log file (default logs/app.log, empty to disable)
+#   LANGMENTOR_LOG_JSON=1        write the file as JSON lines, with the fields of each record under record.extra
+#   LANGMENTOR_LOG_BACKGROUND=0  write from the calling thread instead of a background one
+#   LANGMENTOR_LOG_QUEUE         records a background writer holds before dropping new ones (default 10000)
+#
+# Log calls pass their values as arguments ('[history]: {}', history) rather than f-strings, so nothing is
+# formatted unless a sink takes the level; use LOG.opt(lazy=True) for values that are costly to compute.
+LOG_LEVEL = os.getenv('LANGMENTOR_LOG_LEVEL', 'INFO').upper()
+LOG_FILE_LEVEL = os.getenv('LANGMENTOR_LOG_FILE_LEVEL', LOG_LEVEL).upper()
+LOG_FILE = os.getenv('LANGMENTOR_LOG_FILE', 'logs/app.log')
+LOG_JSON = os.getenv('LANGMENTOR_LOG_JSON', '0') != '0'
+LOG_BACKGROUND = os.getenv('LANGMENTOR_LOG_BACKGROUND', '1') != '0'
+LOG_ROTATION = 1024 * 1024
+LOG_QUEUE = int(os.getenv('LANGMENTOR_LOG_QUEUE', 10000))
+
+
+class BackgroundWriter:
+    '''Loguru sink that writes from a background thread: a log call only formats its record and queues it,
+    and the thread writes whatever has queued up since its last write in one batch.
+
+    Writes to stream, or to the file at path, rotated like loguru's rotation option once it grows past
+    rotation bytes. (loguru's own enqueue=True pickles every record through a pipe for multiprocessing,
+    which costs the caller more than the write it saves.)
+
+    At most max_queue records wait for the thread; when the disk cannot keep up, further records are
+    counted in dropped rather than held in memory or blocking the caller, and the number dropped since
+    the last batch is reported on stderr before the next one is written. Failed writes and rotations are
+    counted in errors; a file writer reports them on stderr, with the batch it could not write, and
+    reopens the file for the next batch.'''
+
+    def __init__(self, stream: TextIO | None=None, path: str | None=None, rotation: int | None=None,
+                 max_queue: int=10000):
+        self.path = path
+        self.rotation = rotation
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self._reported_dropped = 0
+        self._dropped_lock = threading.Lock()  # write() runs on the callers' threads
+        self._queue = queue.Queue(max_queue)
+        self._stream = stream if path is None else self._open()
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, message: str):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def drain(self):
+        '''Blocks until everything logged so far is written.'''
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def stop(self):
+        # Called by loguru when the sink is removed, including at exit
+        self._queue.put(None)
+        self._thread.join()
+        if self.path is not None:
+            self._stream.close()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            text = ''.join(item for item in batch if isinstance(item, str))
+            if text:
+                self._report_dropped()
+                self._write(text)
+                self.batches += 1
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is None for item in batch):
+                return
+
+    def _write(self, text: str):
+        try:
+            if self.path is not None and self._stream.closed:  # After a failed rotation
+                self._stream = self._open()
+            self._stream.write(text)
+            self._stream.flush()
+        except (OSError, ValueError) as e:
+            self._error(e, text)
+            return
+
+        if self.rotation is not None and self._stream.tell() > self.rotation:
+            try:
+                self._rotate()
+            except OSError as e:
+                self._error(e)
+
+    def _report_dropped(self):
+        with self._dropped_lock:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+        if not dropped:
+            return
+        try:
+            sys.stderr.write(f'Log writer for {self.path or "the console"} fell behind, '
+                             f'dropped {dropped} records ({self.dropped} so far)\n')
+        except (OSError, ValueError):
+            pass
+
+    def _error(self, error: Exception, text: str=''):
+        self.errors += 1
+        if self.path is None:
+            return  # Nowhere left to report it
+        try:
+            sys.stderr.write(f'Log file {self.path} failed ({error}), {self.errors} errors so far\n{text}')
+        except (OSError, ValueError):
+            pass
+
+    def _open(self) -> TextIO:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        return open(self.path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        self._stream.close()
+        root, extension = os.path.splitext(self.path)
+        os.rename(self.path, f'{root}.{datetime.now():%Y-%m-%d_%H-%M-%S_%f}{extension}')
+        self._stream = self._open()
+
+
 log_format = '<green>{time:YYYY-MM-DD at HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>'
 
 logger.remove()
 
-logger.add(sys.stderr, level='DEBUG', format=log_format, colorize=True)
-logger.add(sys.stderr, level='ERROR', format=log_format, colorize=True)
-
-logger.add('logs/app.log', rotation='1 MB', level='DEBUG', format=log_format, colorize=False)
+if LOG_BACKGROUND:
+    logger.add(BackgroundWriter(sys.stderr, max_queue=LOG_QUEUE), level=LOG_LEVEL, format=log_format, colorize=True)
+    if LOG_FILE:
+        logger.add(BackgroundWriter(path=LOG_FILE, rotation=LOG_ROTATION, max_queue=LOG_QUEUE), level=LOG_FILE_LEVEL,
+                   format=log_format, colorize=False, serialize=LOG_JSON)
+else:
+    logger.add(sys.stderr, level=LOG_LEVEL, format=log_format, colorize=True)
+    if LOG_FILE:
+        logger.add(LOG_FILE, rotation=LOG_ROTATION, level=LOG_FILE_LEVEL, format=log_format, colorize=False,
+                   serialize=LOG_JSON)
 
 LOG = logger
 
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import aclosing, closing, contextmanager
+from typing import AsyncIterator, Iterator, TypeVar
+import ollama
+from langchain_ollama import ChatOllama
+from utils.logger import LOG
+
+T = TypeVar('T')
+
+
+class QueueFullError(RuntimeError):
+    '''Raised when a model already has as many requests waiting as its gate allows.'''
+
+
+class ModelGate:
+    '''Admission control for one model: at most concurrency requests run at once and at most max_queue
+    wait for a slot, further requests are turned away with QueueFullError instead of piling up.
+
+        async with gate:
+            ... stream the reply ...
+
+    A request cancelled while waiting or running (e.g. the user left the page) frees its place.
+    Work running in other threads (e.g. history summaries) takes its slot with "with gate.blocking():".'''
+
+    def __init__(self, concurrency: int=4, max_queue: int=64):
+        if concurrency <= 0 or max_queue < 0:
+            raise ValueError('concurrency must be positive and max_queue not negative.')
+
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aenter__(self) -> 'ModelGate':
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)  # Bound to the serving event loop on first use
+            self._loop = asyncio.get_running_loop()
+
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(f'{self.waiting} requests already waiting.')
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.running -= 1
+        self._semaphore.release()
+        if exc_type is None:
+            self.completed += 1
+        elif issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+            self.cancelled += 1
+
+    @contextmanager
+    def blocking(self) -> Iterator['ModelGate']:
+        '''The gate for a thread other than the event loop's, which blocks until it gets a slot.
+        Before the first request has bound the gate to the serving loop, there is nothing to wait for.'''
+        loop = self._loop
+        if loop is None:
+            yield self
+            return
+
+        asyncio.run_coroutine_threadsafe(self.__aenter__(), loop).result()
+        try:
+            yield self
+        except BaseException as e:
+            asyncio.run_coroutine_threadsafe(self.__aexit__(type(e), e, e.__traceback__), loop).result()
+            raise
+        asyncio.run_coroutine_threadsafe(self.__aexit__(None, None, None), loop).result()
+
+    def stats(self) -> dict:
+        return {
+            'running': self.running,
+            'waiting': self.waiting,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'cancelled': self.cancelled,
+        }
+
+
+async def close_on_cancel(chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+    '''Iterates a model's stream so that cancelling the consumer closes it, which stops the reply on the server.
+    A cancellation landing inside LangChain's per-chunk tasks would leave the HTTP stream open, so the chunk
+    in flight is awaited first and the stream is then closed between two chunks.'''
+    async with aclosing(chunks):
+        while True:
+            next_chunk = asyncio.ensure_future(anext(chunks))
+            try:
+                chunk = await asyncio.shield(next_chunk)
+            except StopAsyncIteration:
+                return
+            except asyncio.CancelledError:
+                await asyncio.gather(next_chunk, return_exceptions=True)
+                raise
+            yield chunk
+
+
+class ModelRegistry:
+    '''One shared ChatOllama client per model config, so every agent using the same model and options
+    reuses one client and its HTTP connection pool.
+
+    keep_alive is sent with every request and tells Ollama how long to keep the model loaded after it
+    (e.g. '30m', or -1 to keep it forever). warm_up() loads the registered models ahead of the first
+    request and records the load and first-token times in timings. gate(model) is the model's ModelGate,
+    shared by every client of that model, whatever their options.'''
+
+    def __init__(self, base_url: str | None=None, keep_alive: str | int | None='30m',
+                 concurrency: int=4, max_queue: int=64):
+        self.base_url = base_url
+        self.keep_alive = keep_alive
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.timings: dict[str, dict[str, float]] = {}  # Warm-up timings by model name
+        self._models: dict[tuple, ChatOllama] = {}
+        self._gates: dict[str, ModelGate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str='qwen3', **options) -> ChatOllama:
+        '''Returns the shared client for the model and ChatOllama options (temperature, num_predict, ...).'''
+        key = (model, tuple(sorted(options.items())))
+
+        with self._lock:
+            llm = self._models.get(key)
+            if llm is None:
+                llm = ChatOllama(model=model, base_url=self.base_url, keep_alive=self.keep_alive, **options)
+                self._models[key] = llm
+                LOG.debug('[Model registry] new client for {} {}', model, options)
+
+        return llm
+
+    def gate(self, model: str) -> ModelGate:
+        with self._lock:
+            if model not in self._gates:
+                self._gates[model] = ModelGate(self.concurrency, self.max_queue)
+            return self._gates[model]
+
+    def warm_up(self, models: list[str] | None=None) -> dict[str, dict[str, float]]:
+        '''Loads each model (by default every registered one) and times a one-token reply.
+        Failures are logged and skipped, the app can still start and load the model on first use.'''
+        models = models or sorted({key[0] for key in self._models})
+        client = ollama.Client(host=self.base_url)
+
+        for model in models:
+            try:
+                start = time.perf_counter()
+                response = client.generate(model=model, keep_alive=self.keep_alive)  # Loads without generating
+                load_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                stream = client.chat(model=model, messages=[{'role': 'user', 'content': 'Hi'}], stream=True,
+                                     keep_alive=self.keep_alive, options={'num_predict': 1})
+                with closing(stream):  # Closes the HTTP response instead of leaving it to the garbage collector
+                    next(stream)
+                first_token_seconds = time.perf_counter() - start
+            except Exception as e:
+                LOG.error('[Model registry] warm-up of {} failed: {}', model, e)
+                continue
+
+            self.timings[model] = {
+                'load_seconds': load_seconds,
+                'server_load_seconds': (response.load_duration or 0) / 1e9,
+                'first_token_seconds': first_token_seconds,
+            }
+            LOG.info('[Model registry] warmed up {}: {}', model, self.timings[model])
+
+        return self.timings
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+def _keep_alive(value: str) -> str | int:
+    # Ollama takes durations like '30m' or a number of seconds (-1 keeps the model loaded)
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+# Configured from the environment: LANGMENTOR_OLLAMA_URL defaults to Ollama's own default (OLLAMA_HOST),
+# LANGMENTOR_MODEL_CONCURRENCY should match the server's OLLAMA_NUM_PARALLEL
+model_registry = ModelRegistry(
+    base_url=os.getenv('LANGMENTOR_OLLAMA_URL'),
+    keep_alive=_keep_alive(os.getenv('LANGMENTOR_KEEP_ALIVE', '30m')),
+    concurrency=int(os.getenv('LANGMENTOR_MODEL_CONCURRENCY', 4)),
+    max_queue=int(os.getenv('LANGMENTOR_MAX_QUEUE', 64)),
+)
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Callable
+import numpy as np
+from langchain_core.messages import BaseMessage
+from utils.logger import LOG
+from utils.model_registry import model_registry
+from utils.string_utils import clean_thinking
+
+WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def normalize(text: str) -> str:
+    '''Lowercased words without punctuation, so small differences in typing map to the same text.'''
+    return ' '.join(WORD_PATTERN.findall(text.lower()))
+
+
+def hash_embed(text: str, dim: int=512) -> np.ndarray:
+    '''Unit vector of hashed words and character trigrams: cheap and needs no model, but only close for texts
+    typed nearly the same ("Hi, I'd like to check in" / "i'd like to check in."), it doesn't know that
+    "check in" and "check out" differ more than "I'd" and "I would". See ollama_embedder for paraphrases.'''
+    vector = np.zeros(dim, dtype=np.float32)
+    words = normalize(text).split()
+    padded = f' {" ".join(words)} '
+
+    for feature in [*words, *(padded[i:i + 3] for i in range(len(padded) - 2))]:
+        h = zlib.crc32(feature.encode())
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def ollama_embedder(model: str, base_url: str | None=None) -> Callable[[str], np.ndarray]:
+    '''embed function using an Ollama embedding model (e.g. nomic-embed-text) instead of hash_embed.
+    It blocks in one of the slots of the model's gate, so call it outside the event loop's thread.'''
+    from langchain_ollama import OllamaEmbeddings
+
+    embeddings = OllamaEmbeddings(model=model, base_url=base_url)
+
+    def embed(text: str) -> np.ndarray:
+        with model_registry.gate(model).blocking():
+            vector = np.asarray(embeddings.embed_query(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    return embed
+
+
+class ResponseCache:
+    '''Semantic cache of model replies, so near-identical messages don't each cost a full generation.
+
+    An entry is keyed by the scenario, the whole conversation so far (normalized, matched exactly, so a
+    reply is only reused in a conversation that went the same way, e.g. from the same greeting) and the
+    embedding of the user message (matched by cosine similarity >= threshold), searched by brute force
+    over a NumPy matrix. Entries expire after ttl seconds and the least recently
+    used one is evicted beyond max_entries.
+
+    To keep the dialogue from feeling canned, an entry only answers once it holds variants different
+    replies, returning one at random, and a hit still goes to the model with refresh_rate probability,
+    whose reply replaces the oldest variant.'''
+
+    def __init__(self, embed: Callable[[str], np.ndarray]=hash_embed, threshold: float=0.9,
+                 ttl: float | None=3600, max_entries: int=10000, variants: int=3, refresh_rate: float=0.1):
+        if max_entries <= 0 or variants <= 0:
+            raise ValueError('max_entries and variants must be positive.')
+
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.variants = variants
+        self.refresh_rate = refresh_rate
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None  # One row per slot, allocated on the first put
+        self._contexts = np.zeros(0, dtype=np.int64)  # Hash of scenario and history
+        self._expires = np.zeros(0)
+        self._last_used = np.zeros(0)
+        self._used = np.zeros(0, dtype=bool)
+        self._replies: list[list[str]] = []
+        self._seconds: list[float] = []  # Mean generation time of each entry
+        self._samples: list[int] = []  # Generation times in that mean
+
+    def context_key(self, scenario: str, history: list[BaseMessage]) -> int:
+        # 64 bits, a collision would answer in another learner's conversation
+        key = hashlib.blake2b(scenario.encode(), digest_size=8)
+        for message in history:
+            key.update(f'\n{message.type}:{normalize(clean_thinking(message.content))}'.encode())
+        return int.from_bytes(key.digest(), 'little', signed=True)
+
+    def get(self, scenario: str, history: list[BaseMessage], user_input: str) -> str | None:
+        '''A cached reply to user_input in this context, or None when the model should answer.'''
+        context = self.context_key(scenario, history)
+        vector = self.embed(user_input)
+
+        with self._lock:
+            slot = self._find(context, vector, time.time())
+            if slot is not None and len(self._replies[slot]) >= self.variants and random.random() >= self.refresh_rate:
+                self._last_used[slot] = time.time()
+                self.hits += 1
+                self.saved_seconds += self._seconds[slot]
+                return random.choice(self._replies[slot])
+
+            self.misses += 1
+            return None
+
+    def put(self, scenario: str, history: list[BaseMessage], user_input: str, reply: str, seconds: float):
+        '''Stores the model's reply to user_input, generated in seconds, history being the messages before it.'''
+        context = self.context_key(scenario, history)
+        vector = self.embed(user_input)
+        now = time.time()
+
+        with self._lock:
+            slot = self._find(context, vector, now)
+            if slot is None:
+                slot = self._allocate(len(vector))
+                self._vectors[slot] = vector
+                self._contexts[slot] = context
+                self._used[slot] = True
+                self._replies[slot] = []
+                self._seconds[slot] = 0.0
+                self._samples[slot] = 0
+
+            replies = self._replies[slot]
+            if reply not in replies:
+                if len(replies) >= self.variants:
+                    replies.pop(0)
+                replies.append(reply)
+            self._samples[slot] += 1
+            self._seconds[slot] += (seconds - self._seconds[slot]) / self._samples[slot]
+            self._expires[slot] = now + self.ttl if self.ttl is not None else np.inf
+            self._last_used[slot] = now
+
+    def _find(self, context: int, vector: np.ndarray, now: float) -> int | None:
+        if self._vectors is None:
+            return None
+
+        candidates = self._used & (self._contexts == context) & (self._expires > now)
+        if not candidates.any():
+            return None
+
+        similarities = np.where(candidates, self._vectors @ vector, -np.inf)
+        slot = int(similarities.argmax())
+        return slot if similarities[slot] >= self.threshold else None
+
+    def _allocate(self, dim: int) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+
+        now = time.time()
+        free = ~self._used | (self._expires <= now)
+        if free.any():
+            return int(free.argmax())
+
+        size = len(self._used)
+        if size < self.max_entries:
+            # Grow geometrically, as a list would
+            new_size = min(self.max_entries, max(16, size * 2))
+            self._vectors = np.resize(self._vectors, (new_size, dim))
+            self._contexts = np.resize(self._contexts, new_size)
+            self._expires = np.resize(self._expires, new_size)
+            self._last_used = np.resize(self._last_used, new_size)
+            self._used = np.concatenate([self._used, np.zeros(new_size - size, dtype=bool)])
+            self._replies.extend([] for _ in range(new_size - size))
+            self._seconds.extend(0.0 for _ in range(new_size - size))
+            self._samples.extend(0 for _ in range(new_size - size))
+            return size
+
+        return int(self._last_used.argmin())  # Least recently used
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.time()
+            entries = int((self._used & (self._expires > now)).sum())
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': self.saved_seconds,
+        }
+
+
+def _response_cache_from_env() -> ResponseCache | None:
+    if os.getenv('LANGMENTOR_RESPONSE_CACHE', '0') == '0':
+        return None
+
+    embed_model = os.getenv('LANGMENTOR_CACHE_EMBED_MODEL')
+    cache = ResponseCache(
+        embed=ollama_embedder(embed_model, os.getenv('LANGMENTOR_OLLAMA_URL')) if embed_model else hash_embed,
+        threshold=float(os.getenv('LANGMENTOR_CACHE_THRESHOLD', 0.9)),
+        ttl=float(os.getenv('LANGMENTOR_CACHE_TTL', 3600)),
+        max_entries=int(os.getenv('LANGMENTOR_CACHE_SIZE', 10000)),
+    )
+    LOG.info('[Response cache] enabled, embeddings: {}', embed_model or 'hashed words')
+    return cache
+
+
+# Opt-in with LANGMENTOR_RESPONSE_CACHE=1, None otherwise
+response_cache = _response_cache_from_env()
@@ -1,10 +1,199 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Sequence
 from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
-from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
 
-store = {}
 
-def get_session_history(session_id: str) -> BaseChatMessageHistory:
-    if session_id not in store:
-        store[session_id] = InMemoryChatMessageHistory()
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    '''Chat history of one session in the store's SQLite database. Messages are written through on every
+    change; reads come from the store's cache of recently read sessions, filled from the database on a miss.'''
+
+    def __init__(self, store: 'SessionStore', session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        store = self.store
+        with store._lock:
+            messages = store._message_cache.get(self.session_id)
+            if messages is None:
+                rows = store._db.execute(
+                    'SELECT message FROM messages WHERE session_id = ? ORDER BY id', (self.session_id,)
+                ).fetchall()
+                messages = messages_from_dict([json.loads(row[0]) for row in rows])
+                store._message_cache[self.session_id] = messages
+                while len(store._message_cache) > store.cache_sessions:
+                    store._message_cache.popitem(last=False)
+            else:
+                store._message_cache.move_to_end(self.session_id)
+
+            return list(messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        with self.store._lock, self.store._db:
+            self.store._db.executemany(
+                'INSERT INTO messages (session_id, message) VALUES (?, ?)',
+                [(self.session_id, json.dumps(message_to_dict(message))) for message in messages]
+            )
+            cached = self.store._message_cache.get(self.session_id)
+            if cached is not None:
+                cached.extend(messages)
+
+    def clear(self) -> None:
+        with self.store._lock, self.store._db:
+            self.store._db.execute('DELETE FROM messages WHERE session_id = ?', (self.session_id,))
+            self.store._message_cache.pop(self.session_id, None)
+
+
+class SessionStore:
+    '''Chat histories by session id, one per user and conversation.
+
+    At most max_sessions histories are kept: the least recently used one is evicted to make room,
+    and a history not used for ttl seconds expires. With db_path, histories live in a SQLite
+    database instead of memory, so they survive restarts and only the sessions being served are loaded:
+    the messages of the cache_sessions most recently read ones are kept, so that the several reads of
+    one turn do not each decode the whole history. The cache assumes this store is the database's only writer.
+    Callbacks registered with on_remove are called with the id of every session deleted, expired or evicted.'''
+
+    def __init__(self, max_sessions: int=1000, ttl: float | None=24 * 3600, db_path: str | None=None,
+                 cache_sessions: int=64):
+        if max_sessions <= 0:
+            raise ValueError('max_sessions must be positive.')
+
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.db_path = db_path
+        self.cache_sessions = cache_sessions
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.RLock()
+        self._sessions: OrderedDict[str, tuple[InMemoryChatMessageHistory, float]] = OrderedDict()
+        self._db = None
+        self._message_cache: OrderedDict[str, list[BaseMessage]] = OrderedDict()
+        self._remove_callbacks: list[Callable[[str], None]] = []
+
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            with self._db:
+                self._db.execute('CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, last_access REAL)')
+                self._db.execute('CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)')
+                self._db.execute('CREATE TABLE IF NOT EXISTS messages '
+                                 '(id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, message TEXT)')
+                self._db.execute('CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id)')
+
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        now = time.time()
+
+        with self._lock:
+            if self._db is not None:
+                return self._get_sqlite(session_id, now)
+
+            self._expire(now)
+            entry = self._sessions.pop(session_id, None)
+            history = entry[0] if entry is not None else InMemoryChatMessageHistory()
+            self._sessions[session_id] = (history, now)
+
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._removed(evicted)
+                self.evictions += 1
+
+            return history
 
-    return store.get(session_id)
+    def _get_sqlite(self, session_id: str, now: float) -> SQLiteChatMessageHistory:
+        with self._db:
+            if self.ttl is not None:
+                expired = self._delete_sessions('SELECT session_id FROM sessions WHERE last_access < ?', (now - self.ttl,))
+                self.expirations += expired
+
+            self._db.execute('INSERT INTO sessions (session_id, last_access) VALUES (?, ?) '
+                             'ON CONFLICT (session_id) DO UPDATE SET last_access = excluded.last_access', (session_id, now))
+
+            (count,) = self._db.execute('SELECT COUNT(*) FROM sessions').fetchone()
+            if count > self.max_sessions:
+                self.evictions += self._delete_sessions('SELECT session_id FROM sessions ORDER BY last_access LIMIT ?',
+                                                        (count - self.max_sessions,))
+
+        return SQLiteChatMessageHistory(self, session_id)
+
+    def _delete_sessions(self, select: str, params: tuple) -> int:
+        session_ids = [(row[0],) for row in self._db.execute(select, params).fetchall()]
+        self._db.executemany('DELETE FROM messages WHERE session_id = ?', session_ids)
+        self._db.executemany('DELETE FROM sessions WHERE session_id = ?', session_ids)
+        for (session_id,) in session_ids:
+            self._removed(session_id)
+        return len(session_ids)
+
+    def _expire(self, now: float):
+        # Sessions are ordered by last access, so the expired ones are at the front
+        while self.ttl is not None and self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl:
+                break
+            del self._sessions[session_id]
+            self._removed(session_id)
+            self.expirations += 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if self._db is not None:
+                with self._db:
+                    self._db.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+                    self._db.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            else:
+                self._sessions.pop(session_id, None)
+            self._removed(session_id)
+
+    def on_remove(self, callback: Callable[[str], None]):
+        with self._lock:
+            self._remove_callbacks.append(callback)
+
+    def _removed(self, session_id: str):
+        self._message_cache.pop(session_id, None)
+        for callback in self._remove_callbacks:
+            callback(session_id)
+
+    def stats(self) -> dict:
+        '''Number of sessions and messages, and the bytes held by the message contents (in RAM or on disk).'''
+        with self._lock:
+            if self._db is not None:
+                (sessions,) = self._db.execute('SELECT COUNT(*) FROM sessions').fetchone()
+                messages, nbytes = self._db.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(message)), 0) FROM messages').fetchone()
+            else:
+                sessions = len(self._sessions)
+                all_messages = [message for history, _ in self._sessions.values() for message in history.messages]
+                messages = len(all_messages)
+                nbytes = sum(sys.getsizeof(message.content) for message in all_messages)
+
+        return {
+            'sessions': sessions,
+            'messages': messages,
+            'bytes': nbytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'backend': 'sqlite' if self._db is not None else 'memory',
+        }
+
+
+def parse_ttl(value: str) -> float | None:
+    # 0 or empty keeps idle sessions until they are evicted
+    return float(value or 0) or None
+
+
+# Configured from the environment: LANGMENTOR_SESSION_DB switches to the SQLite backend
+session_store = SessionStore(
+    max_sessions=int(os.getenv('LANGMENTOR_MAX_SESSIONS', 1000)),
+    ttl=parse_ttl(os.getenv('LANGMENTOR_SESSION_TTL', str(24 * 3600))),
+    db_path=os.getenv('LANGMENTOR_SESSION_DB'),
+)
+
+
+def get_session_history(session_id: str) -> BaseChatMessageHistory:
+    return session_store.get(session_id)
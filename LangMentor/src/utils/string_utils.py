@@ -1,16 +1,109 @@
-import re
+from typing import AsyncIterator
 
 def clean_thinking(text):
-    patterns = [
-        r'<think>.*?</think>', # 移除<think>标签内容
-    ]
+    '''Removes the <think>...</think> blocks from a complete response and strips it, in one pass.
+    An unclosed <think> hides the rest of the text rather than showing the reasoning, see ThinkingFilter.'''
+    thinking_filter = ThinkingFilter()
 
-    cleaned_text = text
+    return thinking_filter.feed(text) + thinking_filter.flush()
 
-    for pattern in patterns:
-        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.DOTALL | re.MULTILINE)
 
-    # cleaned_text = re.sub(r'\n{3, }', '\n\n', cleaned_text)
-    cleaned_text = cleaned_text.strip()
-    
-    return cleaned_text
\ No newline at end of file
+class ThinkingFilter:
+    '''Incremental clean_thinking for streamed text.
+
+    feed() each chunk as it arrives and get back the visible text outside <think>...</think>.
+    A chunk ending with the start of a tag (e.g. '</th') is held back until the next chunk
+    decides it, so tags split across chunks are still removed. Thinking text is skipped, not
+    kept, so memory stays constant however long it is; thinking_chars counts it. The visible
+    text is stripped like clean_thinking does: leading whitespace is dropped, and trailing
+    whitespace is held back until more visible text follows it. Call flush() at the end of the
+    stream for any held-back text. in_thinking is still True after it if the last <think> was
+    never closed.'''
+
+    OPEN_TAG = '<think>'
+    CLOSE_TAG = '</think>'
+
+    def __init__(self):
+        self.in_thinking = False
+        self.thinking_chars = 0  # Length of the thinking text removed so far
+        self._pending = ''  # Possible start of the next tag
+        self._started = False  # Visible text has been returned
+        self._trailing = ''  # Whitespace after the visible text so far, returned once more follows
+
+    def feed(self, chunk: str) -> str:
+        if not self._pending and '<' not in chunk:
+            # Most chunks hold no tag
+            if self.in_thinking:
+                self.thinking_chars += len(chunk)
+                return ''
+            return self._visible(chunk)
+
+        text = self._pending + chunk
+        self._pending = ''
+        visible = []
+        position = 0
+
+        while True:
+            tag = self.CLOSE_TAG if self.in_thinking else self.OPEN_TAG
+            index = text.find(tag, position)
+
+            if index < 0:
+                end = len(text) - _partial_tag_length(text, tag, position)
+                self._pending = text[end:]
+            else:
+                end = index
+
+            if self.in_thinking:
+                self.thinking_chars += end - position
+            else:
+                visible.append(text[position:end])
+
+            if index < 0:
+                break
+            position = index + len(tag)
+            self.in_thinking = not self.in_thinking
+
+        return self._visible(''.join(visible))
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ''
+        if self.in_thinking:
+            self.thinking_chars += len(pending)
+            return ''
+        return self._visible(pending)
+
+    def _visible(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+
+        stripped = text.rstrip()
+        if not stripped:
+            self._trailing += text
+            return ''
+        text, self._trailing = self._trailing + stripped, text[len(stripped):]
+        return text
+
+
+def _partial_tag_length(text: str, tag: str, start: int=0) -> int:
+    '''Length of the longest suffix of text[start:] that is a proper prefix of tag.
+    Tags have no '<' but the first, so only a suffix starting at the last '<' can match.'''
+    index = text.rfind('<', max(start, len(text) - len(tag) + 1))
+    if index < 0 or not tag.startswith(text[index:]):
+        return 0
+    return len(text) - index
+
+
+async def astream_without_thinking(chunks: AsyncIterator[str], thinking_filter: ThinkingFilter | None=None) -> AsyncIterator[str]:
+    '''Yields the visible text of a stream of response chunks as soon as it arrives, see ThinkingFilter.
+    Pass thinking_filter to read its thinking_chars once the stream is done.'''
+    thinking_filter = thinking_filter or ThinkingFilter()
+
+    async for chunk in chunks:
+        visible = thinking_filter.feed(chunk)
+        if visible:
+            yield visible
+
+    visible = thinking_filter.flush()
+    if visible:
+        yield visible
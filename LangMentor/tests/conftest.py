@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'scripts'))  # fake_ollama
+
+# No log file from the tests
+os.environ.setdefault('LANGMENTOR_LOG_FILE', '')
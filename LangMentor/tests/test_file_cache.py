@@ -0,0 +1,25 @@
+from utils import file_cache
+from utils.file_cache import FileCache
+
+
+def test_files_are_checked_once_per_interval(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(file_cache.time, 'monotonic', lambda: now[0])
+    stats = []
+    stat = file_cache.os.stat
+    monkeypatch.setattr(file_cache.os, 'stat', lambda path: stats.append(path) or stat(path))
+
+    path = tmp_path / 'prompt.md'
+    path.write_text('first', encoding='utf-8')
+    cache = FileCache(check_interval=1.0)
+    assert cache.load(str(path), str.strip) == 'first'
+
+    path.write_text('second version', encoding='utf-8')
+    now[0] += 0.5
+    assert cache.load(str(path), str.strip) == 'first'  # Not checked yet
+    assert len(stats) == 1
+
+    now[0] += 0.5
+    assert cache.load(str(path), str.strip) == 'second version'
+    assert len(stats) == 2
+    assert cache.reads == 2
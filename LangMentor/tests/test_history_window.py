@@ -0,0 +1,80 @@
+import threading
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from utils.history_window import HistoryWindow, count_tokens
+from utils.session_history import SessionStore
+
+# 10 tokens each
+TURNS = [(HumanMessage if i % 2 == 0 else AIMessage)(content=f'm{i} ' + 'word ' * 9) for i in range(10)]
+
+
+class Summarizer:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, previous_summary, messages):
+        self.calls.append(len(messages))
+        self.release.wait(5)
+        return f'{previous_summary}+{len(messages)}'
+
+
+def wait_for_summaries(history_window):
+    history_window._executor.submit(lambda: None).result()
+
+
+@pytest.fixture
+def summarizer():
+    summarizer = Summarizer()
+    yield summarizer
+    summarizer.release.set()
+
+
+def test_messages_stay_until_summarized(summarizer):
+    assert count_tokens(TURNS[0].content) == 10
+    history_window = HistoryWindow(max_tokens=30, summarize=summarizer, summary_batch_tokens=20,
+                                   store=SessionStore())
+
+    assert history_window.window('s', TURNS[:4]) == TURNS[:4]  # 10 tokens past the budget, below the batch
+    assert summarizer.calls == []
+
+    assert history_window.window('s', TURNS[:5]) == TURNS[:5]  # Summarizing the first 2 messages
+    assert summarizer.calls == [2]
+
+    summarizer.release.set()
+    wait_for_summaries(history_window)
+    window = history_window.window('s', TURNS[:5])
+    assert window == [SystemMessage(content='Summary of the earlier conversation: +2')] + TURNS[2:5]
+    assert history_window.last_tokens('s') == sum(count_tokens(message.content) for message in window)
+
+
+def test_sessions_are_capped(summarizer):
+    history_window = HistoryWindow(max_sessions=2, summarize=summarizer, store=SessionStore())
+    for session_id in 'abc':
+        history_window.window(session_id, TURNS[:1])
+
+    assert history_window.last_tokens('a') == 0
+    assert history_window.last_tokens('c') == 10
+    assert len(history_window._sessions) == 2
+
+
+@pytest.mark.parametrize('remove', ['delete', 'evict', 'clear'])
+def test_removed_sessions_are_forgotten(summarizer, remove):
+    store = SessionStore(max_sessions=1)
+    history_window = HistoryWindow(max_tokens=10, summarize=summarizer, summary_batch_tokens=10, store=store)
+    history = history_window.get_session_history('s')
+    history.add_messages(TURNS[:2])
+    summarizer.release.set()
+    history.messages
+    wait_for_summaries(history_window)
+    assert history_window._sessions['s'][1] == '+1'
+
+    if remove == 'delete':
+        store.delete('s')
+    elif remove == 'evict':
+        store.get('other')
+    else:
+        history.clear()
+
+    assert 's' not in history_window._sessions
+    assert history_window.last_tokens('s') == 0
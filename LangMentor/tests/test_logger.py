@@ -0,0 +1,53 @@
+import threading
+from utils.logger import BackgroundWriter
+
+
+class SlowStream:
+    def __init__(self):
+        self.text = ''
+        self.closed = False
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        self.text += text
+
+    def flush(self):
+        pass
+
+
+def test_full_queue_drops_records(capsys):
+    stream = SlowStream()
+    writer = BackgroundWriter(stream, max_queue=2)
+    writer.write('a\n')
+    stream.writing.wait(5)  # The thread took 'a' and waits in write
+    for message in ['b\n', 'c\n', 'd\n']:
+        writer.write(message)
+
+    stream.release.set()
+    writer.drain()
+    assert writer.dropped == 1
+    assert stream.text == 'a\nb\nc\n'
+    assert 'dropped 1 records (1 so far)' in capsys.readouterr().err
+
+    writer.write('e\n')
+    writer.drain()
+    assert 'dropped' not in capsys.readouterr().err  # Reported once
+    writer.stop()
+
+
+def test_failed_rotation_reopens_the_file(tmp_path, monkeypatch, capsys):
+    path = tmp_path / 'app.log'
+    writer = BackgroundWriter(path=str(path), rotation=4)
+    monkeypatch.setattr('utils.logger.os.rename', lambda *args: (_ for _ in ()).throw(OSError('disk full')))
+
+    writer.write('first\n')
+    writer.drain()
+    writer.write('second\n')
+    writer.stop()
+
+    assert writer.errors == 2  # One failed rotation per batch
+    assert path.read_text(encoding='utf-8') == 'first\nsecond\n'
+    assert 'disk full' in capsys.readouterr().err
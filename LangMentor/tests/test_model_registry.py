@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+import pytest
+from fake_ollama import FakeOllama
+from utils.model_registry import ModelGate, ModelRegistry
+
+
+@pytest.fixture
+def server():
+    server = FakeOllama(load_delay=0.3, token_delay=0.001).start()
+    yield server
+    server.shutdown()
+
+
+def test_clients_are_shared_per_config(server):
+    registry = ModelRegistry(base_url=server.url)
+    llm = registry.get('qwen3', num_predict=8192, temperature=0.8)
+
+    assert registry.get('qwen3', temperature=0.8, num_predict=8192) is llm
+    assert registry.get('qwen3', temperature=0.2) is not llm
+    assert len(registry) == 2
+
+
+def test_warm_up_loads_the_model_once(server):
+    registry = ModelRegistry(base_url=server.url, keep_alive='30m')
+    llm = registry.get('qwen3')
+
+    timings = registry.warm_up()['qwen3']
+    assert timings['server_load_seconds'] > 0
+
+    start = time.perf_counter()
+    first_token = None
+    for _ in llm.stream('Hello'):
+        first_token = first_token or time.perf_counter() - start
+    assert first_token < server.load_delay  # The first request does not pay the load time
+    assert server.loads == 1
+
+
+def test_warm_up_failure_is_skipped():
+    registry = ModelRegistry(base_url='http://127.0.0.1:9')  # Nothing listens on the discard port
+    assert registry.warm_up(['qwen3']) == {}
+
+
+def test_threads_wait_for_a_slot():
+    gate = ModelGate(concurrency=1)
+    order = []
+
+    def background():
+        with gate.blocking():
+            order.append('thread')
+
+    async def main():
+        async with gate:
+            thread = threading.Thread(target=background)
+            thread.start()
+            await asyncio.sleep(0.1)
+            assert gate.waiting == 1
+            order.append('request')
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert order == ['request', 'thread']
+    assert gate.completed == 2
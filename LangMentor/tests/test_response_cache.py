@@ -0,0 +1,97 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from langchain_core.messages import AIMessage, HumanMessage
+from utils.response_cache import ResponseCache, hash_embed
+
+GREETING = [AIMessage(content='Hello! Are you here to check in?')]
+
+
+def filled_cache(**kwargs) -> ResponseCache:
+    cache = ResponseCache(**{'ttl': 60, 'variants': 2, 'refresh_rate': 0, **kwargs})
+    cache.put('hotel_checkin', GREETING, "Hi, I'd like to check in", 'Sure, may I have your name?', 2.0)
+    cache.put('hotel_checkin', GREETING, "hi, I'd like to check in.", 'Of course. Your name, please?', 3.0)
+    return cache
+
+
+def test_hash_embed_is_unit_and_typing_insensitive():
+    a, b = hash_embed("Hi, I'd like to check in"), hash_embed("hi, i'd like to check in.")
+    assert abs(float(a @ a) - 1.0) < 1e-6
+    assert float(a @ b) > 0.99
+
+
+def test_hit_needs_all_variants():
+    cache = ResponseCache(ttl=60, variants=2, refresh_rate=0)
+    assert cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in") is None
+    cache.put('hotel_checkin', GREETING, "Hi, I'd like to check in", 'Sure, may I have your name?', 2.0)
+    assert cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in") is None
+
+    cache.put('hotel_checkin', GREETING, "Hi, I'd like to check in", 'Of course. Your name, please?', 3.0)
+    replies = {cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in!") for _ in range(30)}
+    assert replies == {'Sure, may I have your name?', 'Of course. Your name, please?'}
+
+
+def test_other_messages_and_contexts_miss():
+    cache = filled_cache()
+    assert cache.get('hotel_checkin', GREETING, "Hi, I'd like to check out") is None
+    assert cache.get('job_interview', GREETING, "Hi, I'd like to check in") is None
+    assert cache.get('hotel_checkin', [], "Hi, I'd like to check in") is None
+
+
+def test_earlier_history_is_part_of_the_context():
+    cache = filled_cache()
+    earlier = [HumanMessage(content='My name is Wang, room 512.'), AIMessage(content='Thank you, Ms. Wang.')]
+    assert cache.get('hotel_checkin', earlier + GREETING, "Hi, I'd like to check in") is None
+
+
+def test_expiry():
+    cache = filled_cache(ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = filled_cache(max_entries=2)
+    for message in ['Where is the gym?', 'Is breakfast included?']:
+        cache.put('hotel_checkin', GREETING, message, 'reply a', 1.0)
+        cache.put('hotel_checkin', GREETING, message, 'reply b', 1.0)
+
+    assert cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in") is None
+    assert cache.get('hotel_checkin', GREETING, 'Where is the gym?') in {'reply a', 'reply b'}
+
+
+def test_saved_seconds():
+    cache = filled_cache()
+    cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in")
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['saved_seconds'] == 2.5  # Mean generation time of the two replies
+
+
+def test_saved_seconds_count_replaced_variants():
+    cache = filled_cache()
+    cache.put('hotel_checkin', GREETING, "Hi, I'd like to check in", 'Welcome! Your name?', 4.0)  # Replaces the first
+    cache.get('hotel_checkin', GREETING, "Hi, I'd like to check in")
+    assert cache.stats()['saved_seconds'] == 3.0
+
+
+def test_cached_replies_skip_the_model_gate(monkeypatch):
+    import main
+
+    class Agent:
+        llm = SimpleNamespace(model='qwen3')
+
+        def cached_reply(self, user_input, session_id):
+            return [], 'Sure, may I have your name?'
+
+    def gate(model):
+        raise AssertionError('a cached reply should not wait for the model')
+
+    monkeypatch.setattr(main, 'response_cache', filled_cache())
+    monkeypatch.setattr(main.model_registry, 'gate', gate)
+
+    async def replies():
+        return [reply async for reply in main.serve(Agent(), "Hi, I'd like to check in", 's')]
+
+    assert asyncio.run(replies()) == ['Sure, may I have your name?']
@@ -0,0 +1,46 @@
+import pytest
+from agents.scenario_registry import ScenarioRegistry
+from utils.file_cache import file_cache
+
+
+@pytest.fixture
+def registry():
+    return ScenarioRegistry()
+
+
+def test_scenarios_are_discovered_and_built_on_first_use(registry):
+    names = registry.names()
+    assert 'hotel_checkin' in names and 'job_interview' in names
+    assert not registry._agents
+
+    agent = registry.get('hotel_checkin')
+    assert registry.get('hotel_checkin') is agent
+    assert list(registry._agents) == ['hotel_checkin']
+
+
+def test_repeated_clicks_read_no_files(registry):
+    for name in registry.names():
+        registry.get(name).start_new_session(f'test:{name}')
+        registry.intro(name)
+    reads = file_cache.reads
+
+    for _ in range(100):
+        for name in registry.names():
+            registry.get(name).start_new_session(f'test:{name}')
+            registry.intro(name)
+    assert file_cache.reads == reads
+
+
+def test_unknown_scenario(registry):
+    with pytest.raises(ValueError, match='Unknown scenario'):
+        registry.get('unknown')
+
+
+def test_prompt_edits_rebuild_only_the_chain(registry):
+    agent = registry.get('hotel_checkin')
+    history_window, chatbot = agent.history_window, agent.chatbot_with_history
+    agent.prompt = 'An older prompt'
+
+    assert registry.get('hotel_checkin') is agent
+    assert agent.chatbot_with_history is not chatbot
+    assert agent.history_window is history_window
@@ -0,0 +1,99 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from utils import session_history
+from utils.session_history import SessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_history.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        db_path = str(tmp_path / 'sessions.db') if request.param == 'sqlite' else None
+        return SessionStore(db_path=db_path, **kwargs)
+    return make
+
+
+def test_histories_are_separate(make_store):
+    store = make_store()
+    store.get('a').add_messages([HumanMessage(content='Hi'), AIMessage(content='Hello!')])
+    store.get('b').add_messages([HumanMessage(content='Bonjour')])
+
+    assert [message.content for message in store.get('a').messages] == ['Hi', 'Hello!']
+    assert [message.content for message in store.get('b').messages] == ['Bonjour']
+
+
+def test_least_recently_used_is_evicted(make_store, clock):
+    store = make_store(max_sessions=2)
+    for session_id in ['a', 'b']:
+        store.get(session_id).add_messages([HumanMessage(content=session_id)])
+        clock[0] += 1
+    store.get('a')  # b is now the least recently used
+    clock[0] += 1
+    store.get('c')
+
+    assert store.stats()['sessions'] == 2
+    assert store.evictions == 1
+    assert [message.content for message in store.get('a').messages] == ['a']
+    assert store.get('b').messages == []
+
+
+def test_idle_sessions_expire(make_store, clock):
+    store = make_store(ttl=60)
+    store.get('a').add_messages([HumanMessage(content='a')])
+    clock[0] += 30
+    store.get('b').add_messages([HumanMessage(content='b')])
+    clock[0] += 45  # a idle 75s, b 45s
+
+    store.get('c')
+    assert store.expirations == 1
+    assert store.get('a').messages == []
+    assert [message.content for message in store.get('b').messages] == ['b']
+
+
+def test_no_ttl(make_store, clock):
+    store = make_store(ttl=None)
+    store.get('a').add_messages([HumanMessage(content='a')])
+    clock[0] += 10 ** 9
+
+    assert [message.content for message in store.get('a').messages] == ['a']
+    assert store.expirations == 0
+
+
+def test_delete(make_store):
+    store = make_store()
+    store.get('a').add_messages([HumanMessage(content='a')])
+    store.delete('a')
+
+    assert store.get('a').messages == []
+
+
+def test_sqlite_messages_are_read_once(tmp_path, monkeypatch):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.db'))
+    reads = []
+    decode = session_history.messages_from_dict
+    monkeypatch.setattr(session_history, 'messages_from_dict', lambda messages: reads.append(1) or decode(messages))
+
+    history = store.get('a')
+    history.add_messages([HumanMessage(content='Hi')])
+    assert [message.content for message in history.messages] == ['Hi']
+    history.add_messages([AIMessage(content='Hello!')])
+    assert [message.content for message in store.get('a').messages] == ['Hi', 'Hello!']
+    assert len(reads) == 1
+
+    history.clear()
+    assert history.messages == []
+    store.get('a').add_messages([HumanMessage(content='Again')])
+    store.delete('a')
+    assert store.get('a').messages == []
+    assert len(reads) == 3
+
+
+@pytest.mark.parametrize('value, ttl', [('3600', 3600.0), ('0', None), ('', None)])
+def test_parse_ttl(value, ttl):
+    assert session_history.parse_ttl(value) == ttl
@@ -0,0 +1,66 @@
+import pytest
+from utils.string_utils import ThinkingFilter, clean_thinking
+
+# (response, visible text)
+RESPONSES = [
+    ('<think>The student said hello.</think>\n\nHello! How are you?', 'Hello! How are you?'),
+    ('Hello!\n\n<think>Done.</think>\n', 'Hello!'),
+    ('Sure.<think>a</think> Your name, <b>please</b>?<think>b</think> Thanks', 'Sure. Your name, <b>please</b>? Thanks'),
+    ('<think></think>Hi<think>x < y</think>!', 'Hi!'),
+    ('No thinking at all, 3 < 4.', 'No thinking at all, 3 < 4.'),
+    ('Hi <think>reasoning that never ends', 'Hi'),
+]
+
+
+def feed_chunks(chunks: list[str]) -> tuple[str, ThinkingFilter]:
+    thinking_filter = ThinkingFilter()
+    visible = ''.join(thinking_filter.feed(chunk) for chunk in chunks) + thinking_filter.flush()
+    return visible, thinking_filter
+
+
+@pytest.mark.parametrize('response, expected', RESPONSES)
+def test_clean_thinking(response, expected):
+    assert clean_thinking(response) == expected
+
+
+@pytest.mark.parametrize('response, expected', RESPONSES)
+def test_tags_split_at_every_position(response, expected):
+    for split in range(len(response) + 1):
+        visible, _ = feed_chunks([response[:split], response[split:]])
+        assert visible == expected, f'split at {split}'
+
+
+@pytest.mark.parametrize('response, expected', RESPONSES)
+def test_one_character_chunks(response, expected):
+    visible, _ = feed_chunks(list(response))
+    assert visible == expected
+
+
+def test_partial_tag_is_held_back():
+    thinking_filter = ThinkingFilter()
+    assert thinking_filter.feed('Hello <thi') == 'Hello'
+    assert thinking_filter.feed('nk>secret</th') == ''
+    assert thinking_filter.feed('ink> there') == '  there'
+    assert thinking_filter.thinking_chars == len('secret')
+
+
+def test_unclosed_thinking_is_hidden():
+    assert clean_thinking('Hi<think>reasoning that never ends') == 'Hi'
+
+    visible, thinking_filter = feed_chunks(['Hi<think>reason', 'ing</thi'])
+    assert visible == 'Hi'
+    assert thinking_filter.in_thinking
+    assert thinking_filter.thinking_chars == len('reasoning</thi')
+
+
+def test_leading_whitespace_is_dropped():
+    visible, _ = feed_chunks(['<think>x</think>', '\n\n', '  Hello'])
+    assert visible == 'Hello'
+
+
+def test_trailing_whitespace_is_held_back():
+    thinking_filter = ThinkingFilter()
+    assert thinking_filter.feed('Hello \n') == 'Hello'
+    assert thinking_filter.feed(' ') == ''
+    assert thinking_filter.feed('there\n\n') == ' \n there'
+    assert thinking_filter.flush() == ''
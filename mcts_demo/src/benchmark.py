@@ -0,0 +1,29 @@
+import argparse
+from benchmarks import games, in_place, opening_book, parallel, profiling, puct, reuse, rollouts, solver, trees
+
+
+BENCHMARKS = {
+    **trees.BENCHMARKS,
+    **rollouts.BENCHMARKS,
+    **reuse.BENCHMARKS,
+    **parallel.BENCHMARKS,
+    **profiling.BENCHMARKS,
+    **puct.BENCHMARKS,
+    **solver.BENCHMARKS,
+    **opening_book.BENCHMARKS,
+    **games.BENCHMARKS,
+    **in_place.BENCHMARKS,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='MCTS engine benchmarks')
+    parser.add_argument('names', nargs='*', metavar='name', help=f'benchmarks to run (default: all): {", ".join(BENCHMARKS)}')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmark(s): {", ".join(unknown)}')
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
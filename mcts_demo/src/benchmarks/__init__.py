@@ -0,0 +1,7 @@
+'''Benchmarks of the MCTS engine, one module per feature, each with a BENCHMARKS dict of name -> function.
+Run them with benchmark.py; the pass/fail checks live in mcts_demo/tests.'''
+from ttt_state import BitboardTTTState, TTTState
+
+
+EMPTY_BOARD = TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1)
+EMPTY_BITBOARD = BitboardTTTState.from_board(EMPTY_BOARD.board, 1)
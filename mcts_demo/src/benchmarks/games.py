@@ -0,0 +1,55 @@
+'''Throughput of each game.'''
+import random
+import time
+import timeit
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+from grid_state import ConnectFourState, GomokuState
+
+
+def bench_games(duration: float=1.0, n_sim: int=2000):
+    '''Throughput of each game: rollouts and MCTS simulations per second from the start position, average
+    game length and branching factor, and the cost of the incremental win check against a full scan.'''
+    games = (('ttt', EMPTY_BITBOARD),
+             ('connect-four', ConnectFourState()), ('gomoku', GomokuState()))
+    print(f'--- Game throughput from the start position, {duration:.0f}s of rollouts, n_sim={n_sim} ---')
+
+    for name, state in games:
+        random.seed(0)
+        mcts = MCTS()
+        rollouts = plies = branching = 0
+        start = time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < duration:
+            game = state
+            while not game.is_terminal():
+                actions = game.legal_actions()
+                branching += len(actions)
+                plies += 1
+                game = game.next_state(random.choice(actions))
+            rollouts += 1
+
+        line = (f'{name:>12}: {rollouts / elapsed:>8,.0f} rollouts/s, {plies / elapsed:>9,.0f} plies/s, '
+                f'length={plies / rollouts:.1f}, branching={branching / plies:.1f}')
+        for tree in ('node', 'array'):
+            mcts = MCTS(tree=tree)
+            mcts.search(state, n_sim=n_sim)
+            line += f', {tree}={mcts.last_search.sims_per_second:,.0f} sims/s'
+        print(line)
+
+    # Win detection on a late Gomoku position: lines through the last move against every stone
+    random.seed(0)
+    game = GomokuState()
+    for _ in range(120):
+        game = game.next_state(random.choice(game.legal_actions()))
+    n = 2000
+    incremental = timeit.timeit(lambda: GomokuState(x=game.x, o=game.o, current_player_index=game.current_player_index,
+                                                    last_move=game.last_move, key=game.key), number=n) / n
+    full_scan = timeit.timeit(lambda: GomokuState(x=game.x, o=game.o, current_player_index=game.current_player_index,
+                                                  key=game.key), number=n) / n
+    print(f'gomoku win check after 120 stones: last move {1e6 * incremental:.1f}us, '
+          f'full scan {1e6 * full_scan:.1f}us per state')
+
+
+BENCHMARKS = {
+    'games': bench_games,
+}
@@ -0,0 +1,53 @@
+'''In-place apply/undo search.'''
+import random
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+from grid_state import ConnectFourState, GomokuState, GridState
+from ttt_state import BitboardTTTState
+
+
+def count_state_allocations(search) -> int:
+    '''Runs search() and returns how many BitboardTTTState and GridState objects it constructed.'''
+    allocated = 0
+    originals = {cls: cls.__post_init__ for cls in (BitboardTTTState, GridState)}
+
+    def counting(post_init):
+        def wrapper(self):
+            nonlocal allocated
+            allocated += 1
+            post_init(self)
+        return wrapper
+
+    for cls, post_init in originals.items():
+        cls.__post_init__ = counting(post_init)
+    try:
+        search()
+    finally:
+        for cls, post_init in originals.items():
+            cls.__post_init__ = post_init
+    return allocated
+
+
+def bench_in_place(n_sim: int=2000, gomoku_sims: int=200):
+    '''Immutable next_state against in-place apply/undo search, with the same seed.
+    Reports sims/s, the move and game states allocated per simulation (counted in a second, untimed run).'''
+    print('--- In-place (apply/undo) search from the start position ---')
+    games = (('ttt', EMPTY_BITBOARD, n_sim),
+             ('connect-four', ConnectFourState(), n_sim), ('gomoku', GomokuState(), gomoku_sims))
+
+    for name, state, sims in games:
+        for in_place in (False, True):
+            random.seed(0)
+            mcts = MCTS(in_place=in_place)
+            move = mcts.search(state, n_sim=sims)
+            sims_per_second = mcts.last_search.sims_per_second
+
+            random.seed(0)
+            allocated = count_state_allocations(lambda: mcts.search(state, n_sim=sims))
+            print(f'{name:>12} in_place={str(in_place):>5}: {sims_per_second:>8,.0f} sims/s, move={move}, '
+                  f'{allocated / mcts.last_search.simulations:>6.1f} states/sim')
+
+
+BENCHMARKS = {
+    'in-place': bench_in_place,
+}
@@ -0,0 +1,50 @@
+'''Opening book.'''
+import os
+import random
+import tempfile
+import time
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+from common.opening_book import OpeningBook
+
+
+def bench_opening_book(depth: int=2, book_sims: int=2000, n_games: int=20, n_sim: int=2000):
+    '''Builds a small opening book, then compares turn time vs random with and without it and reports its hit rate.'''
+    state = EMPTY_BITBOARD
+    print(f'--- Opening book, depth={depth}, {book_sims} simulations per position ---')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ttt.book')
+        random.seed(0)
+        start = time.perf_counter()
+        n_positions = OpeningBook.build(path, state, depth, lambda position: MCTS().root_visits(position, book_sims))
+        print(f'build: {n_positions} positions, {os.path.getsize(path):,} bytes, {time.perf_counter() - start:.1f}s')
+
+        with OpeningBook(path) as book:
+            for use_book in (False, True):
+                results = {1: 0, 0: 0, -1: 0}
+                turn_times = []
+                for seed in range(n_games):
+                    random.seed(seed)
+                    mcts = MCTS(opening_book=book if use_book else None)
+                    game = state
+                    while not game.is_terminal():
+                        if game.current_player() == 1:
+                            start = time.perf_counter()
+                            action = mcts.search(game, n_sim=n_sim)
+                            turn_times.append(time.perf_counter() - start)
+                        else:
+                            action = random.choice(game.legal_actions())
+                        game = game.next_state(action)
+                    results[game._check_winner() or 0] += 1
+
+                line = (f'book={str(use_book):>5}: W/D/L={results[1]}/{results[0]}/{results[-1]}, '
+                        f'turn={1000 * sum(turn_times) / len(turn_times):.1f}ms')
+                if use_book:
+                    line += f', hit rate={book.hit_rate:.1%}'
+                print(line)
+
+
+BENCHMARKS = {
+    'opening-book': bench_opening_book,
+}
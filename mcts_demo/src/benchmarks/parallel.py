@@ -0,0 +1,50 @@
+'''Root-, leaf- and tree-parallel search.'''
+import os
+import random
+import time
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+from common.parallel import ParallelMCTS
+
+
+def bench_parallel(n_sim: int=20000, max_workers: int | None=None):
+    '''Scaling of root- and leaf-parallel search from one worker (serial) up to max_workers.'''
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, max_workers} | {2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers})
+    state = EMPTY_BITBOARD
+    print(f'--- Parallel search from the empty board, n_sim={n_sim}, up to {max_workers} workers ---')
+
+    for mode in ('root', 'leaf'):
+        serial = None
+        for workers in counts:
+            with ParallelMCTS(workers=workers, mode=mode) as mcts:
+                random.seed(0)
+                mcts.search(state, n_sim=min(n_sim, 100))  # Warm up the pool
+                start = time.perf_counter()
+                action = mcts.search(state, n_sim=n_sim)
+                elapsed = time.perf_counter() - start
+            serial = serial or elapsed
+            print(f'{mode:>5} x{workers:<3}: {n_sim / elapsed:>9,.0f} sims/s, speedup={serial / elapsed:.2f}, move={action}')
+
+
+def bench_tree_parallel(n_sim: int=5000, thread_counts: tuple[int, ...]=(1, 2, 4, 8)):
+    '''Simulations per second of tree-parallel search by thread count (slower than one thread under the GIL).'''
+    state = EMPTY_BITBOARD
+    print(f'--- Tree-parallel search from the empty board, n_sim={n_sim} ---')
+
+    for threads in thread_counts:
+        random.seed(0)
+        mcts = MCTS(threads=threads)
+        mcts.start(state)
+        root = mcts._search_root
+        stats = mcts.step(n_sim)
+        mcts.stop()
+
+        move = max(root.children, key=lambda n: n.N).action_from_parent
+        print(f'threads={threads}: root N={root.N}, {stats.sims_per_second:,.0f} sims/s, move={move}')
+
+
+BENCHMARKS = {
+    'parallel': bench_parallel,
+    'tree-parallel': bench_tree_parallel,
+}
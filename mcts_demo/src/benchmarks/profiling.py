@@ -0,0 +1,28 @@
+'''Per-phase search profile.'''
+import random
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+
+
+def bench_profile(n_sim: int=20000):
+    '''Per-phase search profile, and the cost of profiling against a plain search.'''
+    state = EMPTY_BITBOARD
+    print(f'--- Search profile from the empty board, n_sim={n_sim} ---')
+
+    for tree in ('node', 'array'):
+        for profile in (False, True):
+            random.seed(0)
+            mcts = MCTS(tree=tree, profile=profile)
+            mcts.search(state, n_sim=n_sim)
+            stats = mcts.last_search
+            line = f'{tree:>5} profile={str(profile):>5}: {stats.sims_per_second:>9,.0f} sims/s'
+            if profile:
+                phases = ('selection', 'expansion', 'rollout', 'backup')
+                line += ', ' + ', '.join(f'{phase}={getattr(stats, "time_" + phase) / stats.elapsed:.0%}' for phase in phases)
+                line += f', max depth={stats.max_depth}'
+            print(line)
+
+
+BENCHMARKS = {
+    'profile': bench_profile,
+}
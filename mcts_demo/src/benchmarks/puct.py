@@ -0,0 +1,35 @@
+'''PUCT search with a batched evaluator.'''
+import random
+from benchmarks import EMPTY_BITBOARD
+from common.mcts import MCTS
+from ttt_evaluator import make_ttt_evaluator
+
+
+def bench_puct(batch_sizes: tuple[int, ...]=(1, 4, 16, 64), n_sim: int=4000, n_games: int=10):
+    '''PUCT search with the NumPy evaluator: evaluator calls and states per second by batch size, and results vs random.'''
+    state = EMPTY_BITBOARD
+    print(f'--- PUCT with a NumPy evaluator from the empty board, n_sim={n_sim} ---')
+
+    for batch_size in batch_sizes:
+        evaluator = make_ttt_evaluator()
+        mcts = MCTS(evaluator=evaluator, eval_batch_size=batch_size)
+        mcts.search(state, n_sim=n_sim)
+        elapsed = mcts.last_search.elapsed
+        print(f'batch={batch_size:>3}: {evaluator.calls:>5} calls ({evaluator.calls / elapsed:>8,.0f}/s), '
+              f'{evaluator.states_evaluated / elapsed:>8,.0f} states/s, {mcts.last_search.sims_per_second:>8,.0f} sims/s')
+
+    results = {1: 0, 0: 0, -1: 0}
+    for seed in range(n_games):
+        random.seed(seed)
+        mcts = MCTS(evaluator=make_ttt_evaluator(), eval_batch_size=16)
+        game = state
+        while not game.is_terminal():
+            action = mcts.search(game, n_sim=400) if game.current_player() == 1 else random.choice(game.legal_actions())
+            game = game.next_state(action)
+        results[game._check_winner() or 0] += 1
+    print(f'PUCT (X, n_sim=400, batch=16) vs random (O): W/D/L={results[1]}/{results[0]}/{results[-1]}')
+
+
+BENCHMARKS = {
+    'puct': bench_puct,
+}
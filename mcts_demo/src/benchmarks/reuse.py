@@ -0,0 +1,79 @@
+'''Sharing statistics between searches: tree reuse and transposition tables.'''
+import random
+import time
+from benchmarks import EMPTY_BOARD, EMPTY_BITBOARD
+from common.mcts import MCTS
+from common.transposition_table import TranspositionTable
+
+
+def bench_tree_reuse(n_games: int=20, n_sim: int=2000):
+    '''MCTS (X) vs random (O) with and without tree reuse: turn time, results and carried-over visits.'''
+    print(f'--- Tree reuse, {n_games} games vs random, n_sim={n_sim} ---')
+
+    for reuse_tree in (False, True):
+        results = {1: 0, 0: 0, -1: 0}
+        turn_times = []
+        searches = reused = carried_visits = 0
+
+        for seed in range(n_games):
+            random.seed(seed)
+            mcts = MCTS(reuse_tree=reuse_tree)
+            state = EMPTY_BOARD
+            while not state.is_terminal():
+                if state.current_player() == 1:
+                    start = time.perf_counter()
+                    action = mcts.search(state, n_sim=n_sim)
+                    turn_times.append(time.perf_counter() - start)
+                else:
+                    action = random.choice(state.legal_actions())
+                state = state.next_state(action)
+            results[state._check_winner() or 0] += 1
+            searches += mcts.reuse_stats.searches
+            reused += mcts.reuse_stats.reused
+            carried_visits += mcts.reuse_stats.carried_visits
+
+        line = (f'reuse={str(reuse_tree):>5}: W/D/L={results[1]}/{results[0]}/{results[-1]}, '
+                f'turn={1000 * sum(turn_times) / len(turn_times):.1f}ms')
+        if reuse_tree:
+            line += (f', reused {reused}/{searches} searches, '
+                     f'avg carried visits={carried_visits / searches:.0f}/{n_sim}')
+        print(line)
+
+
+def bench_transpositions(n_games: int=20, n_sim: int=2000, max_entries: int=1000):
+    '''MCTS (X) vs random (O) with and without a transposition table: turn time, results and hit rate.'''
+    print(f'--- Transposition table, {n_games} games vs random, n_sim={n_sim}, max_entries={max_entries} ---')
+
+    for use_table in (False, True):
+        results = {1: 0, 0: 0, -1: 0}
+        turn_times = []
+        lookups = hits = evictions = 0
+
+        for seed in range(n_games):
+            random.seed(seed)
+            table = TranspositionTable(max_entries) if use_table else None
+            mcts = MCTS(transposition_table=table)
+            state = EMPTY_BITBOARD
+            while not state.is_terminal():
+                if state.current_player() == 1:
+                    start = time.perf_counter()
+                    action = mcts.search(state, n_sim=n_sim)
+                    turn_times.append(time.perf_counter() - start)
+                else:
+                    action = random.choice(state.legal_actions())
+                state = state.next_state(action)
+            results[state._check_winner() or 0] += 1
+            if table is not None:
+                lookups, hits, evictions = lookups + table.lookups, hits + table.hits, evictions + table.evictions
+
+        line = (f'table={str(use_table):>5}: W/D/L={results[1]}/{results[0]}/{results[-1]}, '
+                f'turn={1000 * sum(turn_times) / len(turn_times):.1f}ms')
+        if use_table:
+            line += f', hit rate={hits / lookups:.1%}, evictions={evictions}'
+        print(line)
+
+
+BENCHMARKS = {
+    'tree-reuse': bench_tree_reuse,
+    'transpositions': bench_transpositions,
+}
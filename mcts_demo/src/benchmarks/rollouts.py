@@ -0,0 +1,70 @@
+'''Rollout throughput, one at a time and batched with NumPy.'''
+import random
+import time
+from benchmarks import EMPTY_BOARD, EMPTY_BITBOARD
+from common.mcts import MCTS
+from ttt_batch_rollout import TTTBatchRollout
+
+
+def bench_rollouts(duration: float=2.0, seed: int=0):
+    '''Random rollouts per second from the empty board for the tuple and bitboard TTT states.'''
+    print(f'--- Random rollouts from the empty board, {duration:.0f}s each ---')
+    mcts = MCTS()
+
+    for name, state in (('tuple', EMPTY_BOARD), ('bitboard', EMPTY_BITBOARD)):
+        random.seed(seed)
+        rollouts, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < duration:
+            for _ in range(100):
+                mcts.rollout(state, 1)
+            rollouts += 100
+        print(f'{name:>8}: {rollouts / elapsed:,.0f} rollouts/s')
+
+
+def bench_batch_rollouts(batch_sizes: tuple[int, ...]=(1, 16, 64, 256, 1024), duration: float=1.0, n_sim: int=500):
+    '''Playouts per second of the batched NumPy engine against one-at-a-time rollouts, and its effect on search.'''
+    print(f'--- Batched rollouts from the empty board, {duration:.0f}s each ---')
+    state = EMPTY_BITBOARD
+    mcts = MCTS()
+
+    random.seed(0)
+    playouts, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        mcts.rollout(state, 1)
+        playouts += 1
+    print(f'{"serial":>10}: {playouts / elapsed:>12,.0f} playouts/s')
+
+    for batch_size in batch_sizes:
+        engine = TTTBatchRollout(batch_size, seed=0)
+        calls, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < duration:
+            engine.rollout(state, 1)
+            calls += 1
+        print(f'{f"batch={batch_size}":>10}: {calls * batch_size / elapsed:>12,.0f} playouts/s')
+
+    print(f'--- Search with batched rollouts, MCTS (X) vs random (O), n_sim={n_sim} ---')
+    for batch_size in (None, 16, 64):
+        results = {1: 0, 0: 0, -1: 0}
+        searches = sims_per_second = 0.0
+        for seed in range(10):
+            random.seed(seed)
+            engine = TTTBatchRollout(batch_size, seed=seed) if batch_size else None
+            mcts = MCTS(batch_rollout=engine)
+            game = state
+            while not game.is_terminal():
+                if game.current_player() == 1:
+                    action = mcts.search(game, n_sim=n_sim)
+                    searches += 1
+                    sims_per_second += mcts.last_search.sims_per_second
+                else:
+                    action = random.choice(game.legal_actions())
+                game = game.next_state(action)
+            results[game._check_winner() or 0] += 1
+        print(f'batch={str(batch_size):>4}: W/D/L={results[1]}/{results[0]}/{results[-1]}, '
+              f'{sims_per_second / searches:,.0f} sims/s, {sims_per_second / searches * (batch_size or 1):,.0f} playouts/s')
+
+
+BENCHMARKS = {
+    'rollouts': bench_rollouts,
+    'batch-rollouts': bench_batch_rollouts,
+}
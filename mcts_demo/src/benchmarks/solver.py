@@ -0,0 +1,61 @@
+'''MCTS-Solver and the endgame table.'''
+import os
+import random
+import tempfile
+import time
+from benchmarks import EMPTY_BITBOARD
+from common.endgame_table import EndgameTable
+from common.mcts import MCTS
+
+
+def bench_solver(n_games: int=20, n_sim: int=2000):
+    '''MCTS-Solver: solving the empty board, then turn time vs random for plain MCTS, the solver,
+    and the solver with an endgame table warmed up by the first solve and reloaded from disk.'''
+    state = EMPTY_BITBOARD
+    print('--- MCTS-Solver from the empty board ---')
+
+    random.seed(0)
+    table = EndgameTable()
+    mcts = MCTS(endgame_table=table)
+    mcts.start(state)
+    root = mcts._search_root
+    stats = mcts.step(n_sim=1_000_000)
+    mcts.stop()
+    print(f'solve: reason={stats.reason}, value={int(root.proven):+d}, {stats.simulations} simulations, '
+          f'{stats.elapsed:.2f}s, {len(table)} positions')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ttt.egt')
+        table.save(path)
+        size = os.path.getsize(path)
+        warm = EndgameTable(path)
+    print(f'endgame table file: {size:,} bytes')
+
+    print(f'--- MCTS (X) vs random (O), {n_games} games, n_sim={n_sim} ---')
+    for name, make in (('plain', lambda: MCTS()), ('solver', lambda: MCTS(solver=True)),
+                       ('solver+table', lambda: MCTS(endgame_table=warm))):
+        results = {1: 0, 0: 0, -1: 0}
+        turn_times, simulations, solved = [], 0, 0
+        for seed in range(n_games):
+            random.seed(seed)
+            mcts = make()
+            game = state
+            while not game.is_terminal():
+                if game.current_player() == 1:
+                    start = time.perf_counter()
+                    action = mcts.search(game, n_sim=n_sim)
+                    turn_times.append(time.perf_counter() - start)
+                    simulations += mcts.last_search.simulations
+                    solved += mcts.last_search.reason == 'solved'
+                else:
+                    action = random.choice(game.legal_actions())
+                game = game.next_state(action)
+            results[game._check_winner() or 0] += 1
+        print(f'{name:>12}: W/D/L={results[1]}/{results[0]}/{results[-1]}, '
+              f'turn={1000 * sum(turn_times) / len(turn_times):.1f}ms, '
+              f'sims/turn={simulations / len(turn_times):,.0f}, solved turns={solved}/{len(turn_times)}')
+
+
+BENCHMARKS = {
+    'solver': bench_solver,
+}
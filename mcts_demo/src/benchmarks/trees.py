@@ -0,0 +1,145 @@
+'''Node and array trees: memory, move agreement and UCT selection.'''
+import random
+import time
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from benchmarks import EMPTY_BOARD
+from common.array_tree import ArrayTree
+from common.game_state import GameState
+from common.mcts import MCTS
+from common.mcts_node import MCTSNode
+
+
+@dataclass(frozen=True)
+class WideState(GameState):
+    '''Synthetic game with a fixed branching factor, used to benchmark selection.'''
+    width: int
+    depth: int = 0
+    player: int = 1
+
+    def current_player(self) -> int:
+        return self.player
+
+    def legal_actions(self) -> list[int]:
+        return list(range(self.width))
+
+    def next_state(self, action: int) -> 'WideState':
+        return WideState(width=self.width, depth=self.depth + 1, player=-self.player)
+
+    def is_terminal(self) -> bool:
+        return self.depth >= 2
+
+    def reward(self, player: int) -> float:
+        return 0.0
+
+
+def build_node_tree(state, n_sim: int, mcts: MCTS) -> MCTSNode:
+    '''Runs n_sim plain UCT simulations (no early termination) and returns the root node.'''
+    root = MCTSNode(state=state)
+    for _ in range(n_sim):
+        node = root
+        while not node.state.is_terminal() and node.is_fully_expanded():
+            node = node.best_child(mcts.c)
+        if not node.state.is_terminal():
+            node = node.expand()
+        node.backup(mcts.rollout(node.state, -node.player_to_move))
+    return root
+
+
+def build_array_tree(state, n_sim: int, mcts: MCTS) -> ArrayTree:
+    '''Same as build_node_tree, using an ArrayTree.'''
+    tree = ArrayTree(state, capacity=n_sim + 1)
+    for _ in range(n_sim):
+        node, node_state = ArrayTree.ROOT, state
+        while not tree.terminal[node] and tree.is_fully_expanded(node):
+            node = tree.best_child(node, mcts.c)
+            node_state = node_state.next_state(tree.action[node])
+        if not tree.terminal[node]:
+            node, node_state = tree.expand(node, node_state)
+        tree.backup(node, mcts.rollout(node_state, -tree.player[node]))
+    return tree
+
+
+def count_nodes(root: MCTSNode) -> int:
+    count, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def bench_tree_memory(n_sim: int=20000, seed: int=0):
+    '''Compares node count, peak traced memory and build time of MCTSNode and ArrayTree trees.'''
+    mcts = MCTS()
+    print(f'--- Tree memory, {n_sim} simulations from the empty board ---')
+
+    for name, build in (('node', build_node_tree), ('array', build_array_tree)):
+        random.seed(seed)
+        start = time.perf_counter()
+        build(EMPTY_BOARD, n_sim, mcts)
+        elapsed = time.perf_counter() - start
+
+        # Trace allocations in a second, untimed run
+        random.seed(seed)
+        tracemalloc.start()
+        tree = build(EMPTY_BOARD, n_sim, mcts)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        nodes = count_nodes(tree) if name == 'node' else tree.n_nodes
+        print(f'{name:>6}: nodes={nodes}, peak={peak / 2**20:.2f} MiB, '
+              f'bytes/node={peak / nodes:.0f}, time={elapsed:.2f}s')
+
+
+def check_same_moves(n_games: int=20, n_sim: int=500):
+    '''Checks that node and array trees return the same move for the same seed.'''
+    print(f'--- Move agreement, {n_games} positions x {n_sim} simulations ---')
+    rng = random.Random(1234)
+    mismatches = 0
+
+    for game in range(n_games):
+        state = EMPTY_BOARD
+        for _ in range(rng.randrange(0, 5)):
+            state = state.next_state(rng.choice(state.legal_actions()))
+
+        moves = []
+        for tree in ('node', 'array'):
+            random.seed(game)
+            moves.append(MCTS(tree=tree).search(state, n_sim=n_sim))
+        mismatches += moves[0] != moves[1]
+
+    print(f'mismatches: {mismatches}/{n_games}')
+
+
+def bench_selection(widths: tuple[int, ...]=(9, 32, 100, 300, 1000), c: float=1.4):
+    '''Times MCTSNode.best_child (closure + max) against ArrayTree scalar and NumPy selection.'''
+    print('--- UCT child selection, microseconds per call ---')
+    print(f'{"children":>8} {"closure":>9} {"scalar":>9} {"numpy":>9}')
+    rng = random.Random(0)
+
+    for width in widths:
+        state = WideState(width=width)
+        root, tree = MCTSNode(state=state), ArrayTree(state)
+        for _ in range(width):
+            node, (index, _) = root.expand(), tree.expand(ArrayTree.ROOT, state)
+            node.N = tree.N[index] = rng.randrange(1, 1000)
+            node.W = tree.W[index] = rng.uniform(-node.N, node.N)
+        root.N = tree.N[ArrayTree.ROOT] = sum(child.N for child in root.children)
+
+        tree.VECTORIZE_MIN_CHILDREN = width + 1  # Force the scalar loop
+        timings = [
+            min(timeit.repeat(call, number=200, repeat=5)) / 200 * 1e6
+            for call in (lambda: root.best_child(c),
+                         lambda: tree.best_child(ArrayTree.ROOT, c),
+                         lambda: tree.best_child_vectorized(ArrayTree.ROOT, c))
+        ]
+        print(f'{width:>8} ' + ' '.join(f'{t:>9.2f}' for t in timings))
+
+
+BENCHMARKS = {
+    'tree-memory': bench_tree_memory,
+    'same-moves': check_same_moves,
+    'selection': bench_selection,
+}
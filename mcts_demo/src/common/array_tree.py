@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import math
+from array import array
+import numpy as np
+from common.game_state import GameState
+
+
+class ArrayTree:
+    '''MCTS tree stored in flat, preallocated arrays instead of one MCTSNode per expansion.
+
+    Nodes are integer indices into the arrays; the root is index 0. The first time a node
+    is expanded, a contiguous block with one slot per legal action is reserved for its
+    children. Slots are filled in the same order MCTSNode.expand pops untried actions, so
+    a search over an ArrayTree makes exactly the same choices as one over MCTSNode objects.
+
+    Only the root state is kept: callers track the state of the node they are at by
+    replaying tree.action along the path from the root, and pass it to expand.'''
+
+    ROOT = 0
+    # Child blocks at least this wide are scored with one NumPy operation in best_child
+    VECTORIZE_MIN_CHILDREN = 32
+
+    def __init__(self, root_state: GameState, capacity: int=1024):
+        self.N = array('q')  # Visit count
+        self.W = array('d')  # Total value
+        self.parent = array('q')
+        self.action = array('q')  # Action from parent
+        self.first_child = array('q')  # Start of the reserved child block
+        self.n_actions = array('q')  # Size of the child block, -1 until reserved
+        self.n_children = array('q')  # Number of expanded children
+        self.player = array('b')  # Player to move
+        self.terminal = array('b')
+        self.root_state = root_state
+
+        self.capacity = 0
+        self.size = 1  # Number of slots in use, including reserved but unexpanded children
+        self.n_nodes = 1  # Number of expanded nodes
+        self._grow(capacity)
+        self._init_node(self.ROOT, root_state, -1)
+
+    def _grow(self, min_capacity: int):
+        new_capacity = max(min_capacity, 2 * self.capacity)
+        extra = new_capacity - self.capacity
+
+        for arr in (self.N, self.parent, self.action, self.first_child, self.n_actions, self.n_children):
+            arr.extend(array('q', [0]) * extra)
+        self.W.extend(array('d', [0.0]) * extra)
+        self.player.extend(array('b', [0]) * extra)
+        self.terminal.extend(array('b', [0]) * extra)
+
+        self.capacity = new_capacity
+
+    def _init_node(self, index: int, state: GameState, parent: int):
+        self.parent[index] = parent
+        self.n_actions[index] = -1
+        self.n_children[index] = 0
+        self.player[index] = state.current_player()
+        self.terminal[index] = state.is_terminal()
+
+    def is_fully_expanded(self, index: int) -> bool:
+        n_actions = self.n_actions[index]
+        return n_actions >= 0 and self.n_children[index] == n_actions
+
+    def best_child(self, index: int, c: float=1.4) -> int:
+        '''UCT selection over the child block of the given node, see MCTSNode.best_child.'''
+        first = self.first_child[index]
+        n_children = self.n_children[index]
+        assert n_children > 0, "No children to select from"
+
+        if n_children >= self.VECTORIZE_MIN_CHILDREN:
+            return self.best_child_vectorized(index, c)
+
+        N, W = self.N, self.W
+        ln_parent_N = math.log(N[index])
+        best, best_score = first, -math.inf
+
+        for child in range(first, first + n_children):
+            n = N[child] + 1e-9  # Prevent division by zero
+            score = (W[child] / n) + c * math.sqrt(ln_parent_N / n)
+            if score > best_score:
+                best, best_score = child, score
+
+        return best
+
+    def best_child_vectorized(self, index: int, c: float=1.4) -> int:
+        '''Same as best_child, scoring the whole child block at once from zero-copy views of N and W.'''
+        first = self.first_child[index]
+        n_children = self.n_children[index]
+        assert n_children > 0, "No children to select from"
+
+        N = np.frombuffer(self.N, dtype=np.int64, count=n_children, offset=first * self.N.itemsize)
+        W = np.frombuffer(self.W, dtype=np.float64, count=n_children, offset=first * self.W.itemsize)
+
+        return first + int(np.argmax(uct_scores(N, W, self.N[index], c)))
+
+    def expand(self, index: int, state: GameState) -> tuple[int, GameState]:
+        '''Expands the next untried action of the node, given the node's state.
+        Returns the new child and its state.'''
+        if self.n_actions[index] < 0:
+            self._reserve_children(index, state)
+
+        child = self.first_child[index] + self.n_children[index]
+        child_state = state.next_state(self.action[child])
+        self.n_children[index] += 1
+        self._init_node(child, child_state, index)
+        self.n_nodes += 1
+
+        return child, child_state
+
+    def _reserve_children(self, index: int, state: GameState):
+        actions = state.legal_actions()
+        first = self.size
+
+        if first + len(actions) > self.capacity:
+            self._grow(first + len(actions))
+
+        # MCTSNode.expand pops from the end of the untried list
+        for offset, action in enumerate(reversed(actions)):
+            self.action[first + offset] = action
+
+        self.first_child[index] = first
+        self.n_actions[index] = len(actions)
+        self.size += len(actions)
+
+    def children(self, index: int) -> range:
+        first = self.first_child[index]
+        return range(first, first + self.n_children[index])
+
+    def backup(self, index: int, value_from_last_mover: float):
+        '''Backpropagate value up the tree, flipping perspective at each level, see MCTSNode.backup.'''
+        N, W, parent = self.N, self.W, self.parent
+        value = value_from_last_mover
+
+        while index >= 0:
+            N[index] += 1
+            W[index] += value
+            value = -value  # Switch perspective for zero-sum game
+            index = parent[index]
+
+    def state(self, index: int) -> GameState:
+        '''Rebuilds the state of a node by replaying the actions from the root.'''
+        path = []
+        while index != self.ROOT:
+            path.append(self.action[index])
+            index = self.parent[index]
+
+        state = self.root_state
+        for action in reversed(path):
+            state = state.next_state(action)
+        return state
+
+    def nbytes(self) -> int:
+        '''Returns the memory held by the tree, which is all in the arrays besides the root state.'''
+        arrays = (self.N, self.W, self.parent, self.action, self.first_child,
+                  self.n_actions, self.n_children, self.player, self.terminal)
+        return sum(arr.itemsize * len(arr) for arr in arrays)
+
+
+def uct_scores(N: np.ndarray, W: np.ndarray, parent_N: int, c: float) -> np.ndarray:
+    '''UCT score of every child given their visit counts N and total values W.
+    Matches the MCTSNode.best_child formula term for term, so argmax picks the same child.'''
+    n = N + 1e-9  # Prevent division by zero
+    return (W / n) + c * np.sqrt(math.log(parent_N) / n)
@@ -0,0 +1,14 @@
+from common.game_state import GameState
+
+
+class BatchRollout:
+    '''Abstract interface for an engine that plays many playouts from the same state at once.'''
+    def __init__(self, batch_size: int=64):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+
+        self.batch_size = batch_size
+
+    def rollout(self, state: GameState, player: int) -> float:
+        '''Plays batch_size playouts from state and returns their average reward for the given player.'''
+        raise NotImplementedError
@@ -0,0 +1,80 @@
+import os
+from array import array
+from common.game_state import GameState
+
+
+class EndgameTable:
+    '''Memo of positions proven by MCTS-Solver: GameState.hash_key -> exact game value for the player to move
+    (the reward of a win, a draw or a loss under perfect play).
+
+    Each position also stores the low 32 bits of hash(state), independent of a Zobrist hash_key, so a
+    hash_key collision reads as a miss instead of another position's value.
+
+    With a path, the table is loaded from it when the file exists and save() writes it back, so positions
+    solved in one run are known in the next. Persisting requires a hash_key and a hash() that are stable
+    across processes (e.g. a Zobrist hash_key, and dataclass states built from ints).'''
+
+    MAGIC = b'EGT2'
+    KEY_MASK = (1 << 64) - 1  # Keys are stored as unsigned 64-bit, hash() can be negative
+    CHECK_MASK = (1 << 32) - 1
+
+    def __init__(self, path: str | None=None):
+        self.path = path
+        self._values: dict[int, tuple[float, int]] = {}  # Key -> value and check
+        self.lookups = 0
+        self.hits = 0
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def get(self, state: GameState) -> float | None:
+        '''Returns the proven value of the position for its player to move, or None if it is not solved.'''
+        self.lookups += 1
+        entry = self._values.get(state.hash_key() & self.KEY_MASK)
+        if entry is None or entry[1] != hash(state) & self.CHECK_MASK:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, state: GameState, value: float):
+        self._values[state.hash_key() & self.KEY_MASK] = (value, hash(state) & self.CHECK_MASK)
+
+    def save(self, path: str | None=None):
+        '''Writes the table as a header, the keys (unsigned 64-bit), the values (doubles) and the checks (unsigned 32-bit).'''
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the endgame table to.")
+
+        keys = array('Q', self._values)
+        values = array('d', (value for value, _ in self._values.values()))
+        checks = array('I', (check for _, check in self._values.values()))
+        with open(path, 'wb') as file:
+            file.write(self.MAGIC)
+            file.write(array('Q', [len(keys)]).tobytes())
+            keys.tofile(file)
+            values.tofile(file)
+            checks.tofile(file)
+
+    def load(self, path: str):
+        '''Adds the positions stored in the file at path, see save().'''
+        with open(path, 'rb') as file:
+            if file.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"'{path}' is not an endgame table file.")
+            count = array('Q')
+            count.fromfile(file, 1)
+            keys, values, checks = array('Q'), array('d'), array('I')
+            keys.fromfile(file, count[0])
+            values.fromfile(file, count[0])
+            checks.fromfile(file, count[0])
+
+        self._values.update(zip(keys, zip(values, checks)))
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __str__(self) -> str:
+        return f'Positions: {len(self)}, Lookups: {self.lookups}, Hit rate: {self.hit_rate:.1%}'
@@ -0,0 +1,46 @@
+import math
+from typing import Callable
+import numpy as np
+from common.game_state import GameState
+
+
+class Evaluator:
+    '''Abstract interface for a batched position evaluator used by PUCT search.'''
+    def evaluate(self, states: list[GameState]) -> tuple[list[list[float]], list[float]]:
+        '''Returns, for each state, prior probabilities aligned with state.legal_actions()
+        and a value in [-1, 1] from the perspective of state.current_player().'''
+        raise NotImplementedError
+
+
+class NumpyEvaluator(Evaluator):
+    '''Tiny deterministic one-hidden-layer network with fixed random weights, evaluated on CPU with NumPy.
+
+    encode maps a state to a feature vector of length n_features; actions must lie in range(n_actions).
+    It plays no better than its random weights, but it costs what a small real model costs per call,
+    which is what batching is meant to amortize. calls and states_evaluated count its use.'''
+
+    def __init__(self, encode: Callable[[GameState], np.ndarray], n_features: int, n_actions: int, hidden: int=64, seed: int=0):
+        rng = np.random.default_rng(seed)
+        self.encode = encode
+        self.w_hidden = rng.standard_normal((n_features, hidden)) / math.sqrt(n_features)
+        self.w_policy = rng.standard_normal((hidden, n_actions)) / math.sqrt(hidden)
+        self.w_value = rng.standard_normal(hidden) / math.sqrt(hidden)
+        self.calls = 0
+        self.states_evaluated = 0
+
+    def evaluate(self, states: list[GameState]) -> tuple[list[list[float]], list[float]]:
+        self.calls += 1
+        self.states_evaluated += len(states)
+
+        features = np.stack([self.encode(state) for state in states])
+        hidden = np.tanh(features @ self.w_hidden)
+        logits = hidden @ self.w_policy
+        values = np.tanh(hidden @ self.w_value)
+
+        priors = []
+        for row, state in zip(logits, states):
+            legal = row[state.legal_actions()]
+            p = np.exp(legal - legal.max())
+            priors.append((p / p.sum()).tolist())
+
+        return priors, values.tolist()
@@ -19,3 +19,24 @@ class GameState:
     def reward(self, player: int) -> float:
         '''Returns the reward for the given player at the end of the game.'''
         raise NotImplementedError
+
+    def hash_key(self) -> int:
+        '''Optional: returns a hash identifying the position, used by transposition tables.
+        States that can compute a Zobrist hash should override it; the default is hash(self).'''
+        return hash(self)
+
+    def to_mutable(self) -> 'GameState':
+        '''Optional: returns a mutable copy of this state supporting apply, undo and snapshot, used by MCTS(in_place=True).'''
+        raise NotImplementedError
+
+    def apply(self, action: int):
+        '''Mutable states only: plays the action in place.'''
+        raise NotImplementedError
+
+    def undo(self):
+        '''Mutable states only: takes back the last applied action.'''
+        raise NotImplementedError
+
+    def snapshot(self) -> 'GameState':
+        '''Mutable states only: returns an immutable state equal to the current position.'''
+        raise NotImplementedError
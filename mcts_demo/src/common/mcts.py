@@ -1,76 +1,656 @@
 import math
 import random
+import threading
+import time
+from dataclasses import dataclass
 from typing import Callable
+from common.array_tree import ArrayTree
+from common.batch_rollout import BatchRollout
+from common.endgame_table import EndgameTable
+from common.evaluator import Evaluator
 from common.game_state import GameState
 from common.mcts_node import MCTSNode
+from common.opening_book import OpeningBook
+from common.puct_node import PUCTNode
+from common.transposition_table import TranspositionTable
+
+
+def random_rollout_policy(state: GameState) -> int:
+    return random.choice(state.legal_actions())
+
+
+# Options that cannot be combined: each option listed in a key excludes the options in its value.
+# 'solver' also stands for endgame_table, which turns the solver on.
+INCOMPATIBLE_OPTIONS = {
+    "tree='array'": ('reuse_tree', 'transposition_table', 'threads > 1', 'evaluator', 'solver', 'in_place'),
+    'threads > 1': ('transposition_table', 'evaluator', 'solver', 'in_place'),
+    'evaluator': ('reuse_tree', 'transposition_table', 'solver', 'in_place', 'batch_rollout'),
+    'in_place': ('batch_rollout',),
+}
+
+
+def check_options(enabled: dict[str, bool]):
+    '''Raises ValueError if two enabled options are incompatible, see INCOMPATIBLE_OPTIONS.'''
+    for option, excluded in INCOMPATIBLE_OPTIONS.items():
+        if not enabled[option]:
+            continue
+        for other in excluded:
+            if enabled[other]:
+                raise ValueError(f"{other} is not supported with {option}.")
+
+
+@dataclass
+class ReuseStats:
+    '''Tree reuse statistics of an MCTS instance created with reuse_tree=True.'''
+    searches: int = 0
+    reused: int = 0  # Searches that started from a promoted subtree
+    carried_visits: int = 0  # Root visits inherited from previous searches, summed over searches
+    last_carried_visits: int = 0
+
+
+class SearchStats:
+    '''Budget and statistics of one search call (or anytime step).
+
+    The search stops after n_sim simulations, time_budget wall-clock seconds or node_budget newly
+    allocated nodes, whichever runs out first, and reason records which one it was. Depth and the
+    time spent in each phase are only measured when the MCTS instance was created with profile=True.'''
+
+    def __init__(self, n_sim: int | None=None, time_budget: float | None=None, node_budget: int | None=None):
+        if n_sim is None and time_budget is None and node_budget is None:
+            raise ValueError("At least one of n_sim, time_budget and node_budget is required.")
+
+        self.n_sim = n_sim
+        self.node_budget = node_budget
+        self.started = time.perf_counter()
+        self.deadline = None if time_budget is None else self.started + time_budget
+        self.elapsed = 0.0
+        self.simulations = 0
+        self.nodes = 0  # Nodes allocated by expansion
+        self.reason: str | None = None  # 'n_sim', 'time', 'nodes', 'win', 'solved' or 'book' once the search stopped
+
+        # Only filled with profile=True
+        self.max_depth = 0
+        self.time_selection = 0.0
+        self.time_expansion = 0.0
+        self.time_rollout = 0.0
+        self.time_backup = 0.0
+
+    def exhausted(self) -> bool:
+        if self.n_sim is not None and self.simulations >= self.n_sim:
+            self.reason = 'n_sim'
+        elif self.node_budget is not None and self.nodes >= self.node_budget:
+            self.reason = 'nodes'
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.reason = 'time'
+        return self.reason is not None
+
+    def record(self, depth: int, t_start: float, t_selected: float, t_expanded: float, t_rolled_out: float, t_end: float):
+        '''Adds one profiled simulation, given the clock at the start and end of each phase.'''
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self.time_selection += t_selected - t_start
+        self.time_expansion += t_expanded - t_selected
+        self.time_rollout += t_rolled_out - t_expanded
+        self.time_backup += t_end - t_rolled_out
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def sims_per_second(self) -> float:
+        return self.simulations / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'simulations': self.simulations,
+            'nodes': self.nodes,
+            'max_depth': self.max_depth,
+            'reason': self.reason,
+            'elapsed': self.elapsed,
+            'sims_per_second': self.sims_per_second,
+            'time_selection': self.time_selection,
+            'time_expansion': self.time_expansion,
+            'time_rollout': self.time_rollout,
+            'time_backup': self.time_backup,
+        }
+
+    def __str__(self) -> str:
+        return (f'Simulations: {self.simulations}, Nodes: {self.nodes}, Max depth: {self.max_depth}, '
+                f'Reason: {self.reason}, Elapsed: {self.elapsed:.3f}s ({self.sims_per_second:,.0f} sims/s)')
 
 
 class MCTS:
-    def __init__(self, c_puct: float=math.sqrt(2), rollout_policy: Callable | None=None):
+    def __init__(self, c_puct: float=math.sqrt(2), rollout_policy: Callable | None=None, tree: str='node',
+                 reuse_tree: bool=False, transposition_table: TranspositionTable | None=None,
+                 threads: int=1, virtual_loss: float=1.0, batch_rollout: BatchRollout | None=None,
+                 profile: bool=False, on_search: Callable[[SearchStats], None] | None=None,
+                 evaluator: Evaluator | None=None, eval_batch_size: int=8, solver: bool=False,
+                 endgame_table: EndgameTable | None=None, opening_book: OpeningBook | None=None,
+                 in_place: bool=False):
+        if tree not in ('node', 'array'):
+            raise ValueError(f"Unknown tree type '{tree}', expected 'node' or 'array'.")
+        check_options({
+            "tree='array'": tree == 'array',
+            'reuse_tree': reuse_tree,
+            'transposition_table': transposition_table is not None,
+            'threads > 1': threads > 1,
+            'evaluator': evaluator is not None,
+            'solver': solver or endgame_table is not None,
+            'in_place': in_place,
+            'batch_rollout': batch_rollout is not None,
+        })
+        if eval_batch_size < 1:
+            raise ValueError(f"eval_batch_size must be at least 1, got {eval_batch_size}.")
+
         self.c = c_puct
         # Default rollout policy: random legal action
-        self.rollout_policy = rollout_policy or (lambda x: random.choice(x.legal_actions()))
+        self.rollout_policy = rollout_policy or random_rollout_policy
+        # Plays many playouts per leaf at once and backs up their average instead of one rollout_policy game
+        self.batch_rollout = batch_rollout
+        # 'node' keeps one MCTSNode per expansion, 'array' stores the tree in flat arrays (ArrayTree)
+        self.tree = tree
+        # Keep the tree between searches and restart from the subtree matching the next root state.
+        # n_sim then counts the inherited root visits, so reused searches run fewer new simulations.
+        self.reuse_tree = reuse_tree
+        self.reuse_stats = ReuseStats()
+        self._root: MCTSNode | None = None
+        # Share one node between all paths reaching the same position; kept across searches
+        self.transposition_table = transposition_table
+        # threads > 1 descends one shared tree from several threads, spread apart by virtual loss.
+        # The threads share the GIL, so with pure-Python states and rollouts this is slower than threads=1
+        # (tic-tac-toe: about 32-38k sims/s with 1 thread, 20-27k with 2 to 8); it only helps with rollouts
+        # that release the GIL. Use ParallelMCTS (processes) for a speedup.
+        self.threads = threads
+        self.virtual_loss = virtual_loss
+        # Statistics of the last search or step; profile=True also measures depth and per-phase times.
+        # on_search is called with them after every search or step.
+        self.profile = profile
+        self.on_search = on_search
+        self.last_search: SearchStats | None = None
+        # With an evaluator, search with PUCT: c_puct weighs the evaluator's priors and leaves are
+        # evaluated eval_batch_size at a time, kept apart within a batch by virtual loss
+        self.evaluator = evaluator
+        self.eval_batch_size = eval_batch_size
+        # MCTS-Solver: terminal results are proven values that propagate up during backup, selection skips
+        # proven subtrees and the search stops once the root is solved. Solved positions are memoized in
+        # endgame_table (which turns the solver on), so later searches know them on expansion.
+        self.solver = solver or endgame_table is not None
+        self.endgame_table = endgame_table
+        # Positions found in the opening book are answered from its stored visit counts without searching,
+        # by search, root_visits and the anytime interface alike
+        self.opening_book = opening_book
+        self._book_visits: dict[int, int] | None = None
+        # Walk one mutable copy of the root state (GameState.to_mutable) with apply/undo during selection
+        # and rollouts instead of allocating a state per ply; only expanded nodes get a snapshot()
+        self.in_place = in_place
+        # Anytime search in progress, see start()
+        self._search_root: MCTSNode | PUCTNode | ArrayTree | None = None
+        self._search_state: GameState | None = None
+        self._winning_action: int | None = None
 
-    def search(self, root_state: GameState, n_sim: int = 1000) -> int:
-        root_node = MCTSNode(state=root_state)
+    def search(self, root_state: GameState, n_sim: int | None = 1000, time_budget: float | None = None,
+               node_budget: int | None = None) -> int:
+        '''Returns the best action after n_sim simulations, time_budget seconds or node_budget new nodes,
+        whichever runs out first. Pass n_sim=None to search by time or nodes only.'''
+        visits, winning_action = self.root_visits(root_state, n_sim, time_budget, node_budget)
+        if winning_action is not None:
+            return winning_action
 
-        for _ in range(n_sim):
-            node = root_node
+        # Choose the action with the highest visit count
+        if not visits:
+            raise ValueError("No children found from root node after simulations.")
+
+        return max(visits, key=visits.get)
 
-            # DEBUG:
-            # print(f'--- Simulation {_ + 1} ---')
-            # print(f'Node: {node}')
-            # print(f'State:\n{node.state}\n')
-            # end DEBUG
+    def root_visits(self, root_state: GameState, n_sim: int | None = 1000, time_budget: float | None = None,
+                    node_budget: int | None = None) -> tuple[dict[int, int], int | None]:
+        '''Runs a search and returns the visit count of each root action, in expansion order,
+        together with the winning action if the search terminated early on an immediate win
+        (or, with the solver, the best proven action once the root is solved).
+        Positions in the opening book return the book's visit counts without a search.'''
+        self.start(root_state)
+        if self.reuse_tree and n_sim is not None and self._book_visits is None:
+            n_sim = max(n_sim - self._search_root.N, 0)
+
+        self.step(n_sim, time_budget, node_budget)
+        visits, winning_action = self.visit_counts(), self._winning_action
+        self._end_search()
+
+        return visits, winning_action
+
+    # ----------------------------------------
+    # Anytime interface: start, step, peek, stop
+    # ----------------------------------------
+
+    def start(self, root_state: GameState):
+        '''Starts an incremental search from root_state; run it with step() and finish it with stop().
+        A position in the opening book starts no tree: step() returns at once and the book's visit
+        counts are the result.'''
+        self._search_state = root_state
+        self._winning_action = None
+        self._book_visits = None
+        if self.opening_book is not None:
+            self._book_visits = self.opening_book.get(root_state)
+            if self._book_visits is not None:
+                self._search_root = None
+                return
+
+        if self.tree == 'array':
+            self._search_root = ArrayTree(root_state)
+        elif self.evaluator is not None:
+            self._search_root = PUCTNode(state=root_state)
+        elif self.reuse_tree:
+            self._search_root = self._promote_root(root_state)
+        elif self.transposition_table is not None:
+            self._search_root = self._table_root(root_state)
+        else:
+            self._search_root = MCTSNode(state=root_state)
+
+    def step(self, n_sim: int | None = 1, time_budget: float | None = None, node_budget: int | None = None) -> SearchStats:
+        '''Continues the search started with start() until one of the budgets runs out, an immediate
+        win is found or the solver proves the root. Returns its stats, with the simulations run and simulations per second.'''
+        if self._search_state is None:
+            raise RuntimeError("No search in progress, call start() first.")
+
+        stats = SearchStats(n_sim, time_budget, node_budget)
+
+        if self._book_visits is not None:
+            stats.reason = 'book'
+        elif self._winning_action is not None:
+            stats.reason = 'win'
+        elif self.tree == 'array':
+            self._winning_action = self._grow_array_tree(self._search_root, stats)
+        elif self.evaluator is not None:
+            self._grow_puct_tree(self._search_root, stats)
+        elif self.threads > 1:
+            self._winning_action = self._grow_tree_parallel(self._search_root, self._search_state, stats)
+        else:
+            self._winning_action = self._grow_node_tree(self._search_root, self._search_state, stats)
+
+        stats.finish()
+        self.last_search = stats
+        if self.on_search is not None:
+            self.on_search(stats)
+        return stats
+
+    def visit_counts(self) -> dict[int, int]:
+        '''Returns the current visit count of each root action of the search in progress.'''
+        if self._book_visits is not None:
+            return dict(self._book_visits)
+
+        root = self._search_root
+        if isinstance(root, ArrayTree):
+            return {root.action[child]: root.N[child] for child in root.children(ArrayTree.ROOT)}
+        if isinstance(root, PUCTNode):
+            return {child.action_from_parent: child.N for child in root.children}
+
+        return {root.action_to(child): child.N for child in root.children}
+
+    def best_action(self) -> int:
+        '''Returns the best action found so far by the search in progress, without stopping it.'''
+        if self._search_state is None:
+            raise RuntimeError("No search in progress, call start() first.")
+        if self._winning_action is not None:
+            return self._winning_action
+
+        visits = self.visit_counts()
+        if not visits:
+            raise ValueError("No children found from root node, run step() first.")
+
+        return max(visits, key=visits.get)
+
+    def stop(self) -> int:
+        '''Ends the search in progress and returns its best action.'''
+        action = self.best_action()
+        self._end_search()
+        return action
+
+    def _end_search(self):
+        self._search_root = None
+        self._search_state = None
+        self._book_visits = None
+
+    # ----------------------------------------
+    # Tree growth
+    # ----------------------------------------
+
+    def _grow_node_tree(self, root_node: MCTSNode, root_state: GameState, stats: SearchStats) -> int | None:
+        '''Runs simulations on root_node until one of the budgets in stats runs out; returns the winning action on early termination.'''
+        table = self.transposition_table
+        root_player = root_state.current_player()
+        profile = self.profile
+        solver = self.solver
+        clock = time.perf_counter
+        # With in_place, one working state follows each simulation down the tree and back with apply/undo
+        work = root_state.to_mutable() if self.in_place else None
+
+        if solver and root_node.proven is not None:
+            stats.reason = 'solved'
+            return self._solved_action(root_node)
+
+        while not stats.exhausted():
+            stats.simulations += 1
+            node = root_node
+            path = [node]
+            if profile:
+                t_start = clock()
 
             # Selection
             while not node.state.is_terminal() and node.is_fully_expanded():
-                node = node.best_child(self.c)
+                if not solver:
+                    child = node.best_child(self.c)
+                else:
+                    child = node.best_unproven_child(self.c)
+                    if child is None:  # Every child is proven, through another parent in a DAG
+                        self._update_proof(node)
+                        break
+                if work is not None:
+                    work.apply(node.action_to(child))
+                node = child
+                path.append(node)
+            if profile:
+                t_selected = clock()
 
             # Expansion
             if not node.state.is_terminal() and not node.is_fully_expanded():
-                node = node.expand()
+                node = node.expand(table, work)
+                path.append(node)
+                if node.N == 0:  # Not a transposition into a node visited before
+                    stats.nodes += 1
+                if solver and node.proven is None:
+                    self._prove_leaf(node)
+            if profile:
+                t_expanded = clock()
+
+            # Early exit on an immediate win for the root player
+            if len(path) == 2 and node.state.is_terminal() and node.state.reward(root_player) > 0:
+                stats.reason = 'win'
+                return root_node.action_to(node)
+
+            # Simulation, scored for the player who moved into the node; a proven node has its exact value
+            if solver and node.proven is not None:
+                rollout_value = node.proven
+            elif work is not None:
+                rollout_value = self._rollout_in_place(work, -node.player_to_move)
+            else:
+                rollout_value = self.rollout(node.state, -node.player_to_move)
+            if profile:
+                t_rolled_out = clock()
 
-            # Early exit for terminal state
-            if node.state.is_terminal():
-                winner = node.state._check_winner()
-                if winner == root_state.current_player() and node.parent == root_node:
-                    print(f'Early termination: found winning move at iteration {_ + 1}')
-                    return node.action_from_parent
+            # Backpropagation, then propagate a new proof towards the root
+            MCTSNode.backup_path(path, rollout_value)
+            if solver and node.proven is not None:
+                for parent in reversed(path[:-1]):
+                    if not self._update_proof(parent):
+                        break
+            if work is not None:
+                for _ in range(len(path) - 1):  # Back to the root for the next simulation
+                    work.undo()
+            if profile:
+                stats.record(len(path) - 1, t_start, t_selected, t_expanded, t_rolled_out, clock())
 
-            # Simulation
-            rollout_value = self.rollout(node.state, node.player_to_move)
+            if solver and root_node.proven is not None:
+                stats.reason = 'solved'
+                return self._solved_action(root_node)
+
+        return None
+
+    def _prove_leaf(self, node: MCTSNode):
+        '''Marks a newly expanded node proven if it is terminal or solved in the endgame table.'''
+        if node.state.is_terminal():
+            node.proven = node.state.reward(-node.player_to_move)
+        elif self.endgame_table is not None:
+            value = self.endgame_table.get(node.state)
+            if value is not None:
+                node.proven = -value  # The table scores the player to move
+
+    def _update_proof(self, node: MCTSNode) -> bool:
+        if node.proven is not None:
+            return True
+        if not node.update_proof():
+            return False
+        if self.endgame_table is not None:
+            self.endgame_table.put(node.state, -node.proven)
+        return True
+
+    def _solved_action(self, root_node: MCTSNode) -> int:
+        '''Best action of a proven root: a proven win if there is one, otherwise the best proven value,
+        most visited first. Unproven children (only possible next to a proven win) count as draws.'''
+        best = max(root_node.children,
+                   key=lambda child: (0.0 if child.proven is None else child.proven, child.N))
+        return root_node.action_to(best)
+
+    def _grow_tree_parallel(self, root_node: MCTSNode, root_state: GameState, stats: SearchStats) -> int | None:
+        '''Same as _grow_node_tree, from self.threads threads sharing the tree.
+
+        A node's N and W are only updated under its lock, taken from a fixed pool of locks striped by node id,
+        and at most one lock is held at a time. Virtual loss is added to every node on the way down, so N
+        counts a visit as soon as it starts and the root ends with exactly one more visit per simulation.
+        best_child runs under the parent's lock only and reads the children's N and W without theirs, on
+        purpose: a stale or half-updated score only skews one selection, and taking a second stripe lock
+        could deadlock when parent and child share it. See the threads comment in __init__ for speed.'''
+        locks = [threading.Lock() for _ in range(64)]
+        counter_lock = threading.Lock()
+        winning_action: list[int] = []
+        virtual_loss = self.virtual_loss
+        root_player = root_state.current_player()
+
+        def lock_for(node: MCTSNode) -> threading.Lock:
+            return locks[(id(node) >> 4) & 63]
+
+        def worker():
+            while True:
+                with counter_lock:
+                    if winning_action or stats.exhausted():
+                        return
+                    stats.simulations += 1
+
+                node = root_node
+                path = [node]
+                with lock_for(node):
+                    node.add_virtual_loss(virtual_loss)
+
+                # Selection and expansion, choosing the child under the parent's lock
+                while True:
+                    with lock_for(node):
+                        if node.state.is_terminal():
+                            break
+                        if node.is_fully_expanded():
+                            child, expanded = node.best_child(self.c), False
+                        else:
+                            child, expanded = node.expand(), True
+                    with lock_for(child):
+                        child.add_virtual_loss(virtual_loss)
+                    path.append(child)
+                    node = child
+                    if expanded:
+                        with counter_lock:
+                            stats.nodes += 1
+                        break
+
+                # Early exit on an immediate win for the root player
+                if len(path) == 2 and node.state.is_terminal() and node.state.reward(root_player) > 0:
+                    with counter_lock:
+                        winning_action.append(root_node.action_to(node))
+                        stats.reason = 'win'
+
+                # Simulation, scored for the player who moved into the node
+                value = self.rollout(node.state, -node.player_to_move)
+
+                # Backpropagation
+                for path_node in reversed(path):
+                    with lock_for(path_node):
+                        path_node.backup_virtual(value, virtual_loss)
+                    value = -value
+
+        threads = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return winning_action[0] if winning_action else None
+
+    def _promote_root(self, root_state: GameState) -> MCTSNode:
+        '''Returns the node of the previous tree matching root_state, at most two plies below the
+        previous root (our move and the opponent's reply), or a new node if there is none.
+        The rest of the previous tree is released.'''
+        stats = self.reuse_stats
+        stats.searches += 1
+
+        root_node = None
+        if self._root is not None:
+            candidates = [self._root]
+            candidates.extend(self._root.children)
+            candidates.extend(grandchild for child in self._root.children for grandchild in child.children)
+            root_node = next((node for node in candidates if node.state == root_state), None)
+
+        if root_node is None:
+            root_node = MCTSNode(state=root_state)
+            stats.last_carried_visits = 0
+        else:
+            root_node.parent = None  # Detach so the rest of the previous tree can be freed
+            stats.reused += 1
+            stats.last_carried_visits = root_node.N
+            stats.carried_visits += root_node.N
+
+        self._root = root_node
+        return root_node
+
+    def _table_root(self, root_state: GameState) -> MCTSNode:
+        '''Starts from the transposition table's node for root_state, so statistics gathered in earlier searches are kept.'''
+        key = root_state.hash_key()
+        root_node = self.transposition_table.get(key, root_state)
+
+        if root_node is None:
+            root_node = MCTSNode(state=root_state)
+            self.transposition_table.put(key, root_node)
+
+        return root_node
+
+    def _grow_array_tree(self, tree: ArrayTree, stats: SearchStats) -> int | None:
+        '''Same as _grow_node_tree, on an ArrayTree.'''
+        root = ArrayTree.ROOT
+        root_player = tree.player[root]
+        profile = self.profile
+        clock = time.perf_counter
+
+        while not stats.exhausted():
+            stats.simulations += 1
+            node, state = root, tree.root_state
+            depth = 0
+            if profile:
+                t_start = clock()
+
+            # Selection, replaying the chosen actions since the tree keeps no states
+            while not tree.terminal[node] and tree.is_fully_expanded(node):
+                node = tree.best_child(node, self.c)
+                state = state.next_state(tree.action[node])
+                depth += 1
+            if profile:
+                t_selected = clock()
+
+            # Expansion
+            if not tree.terminal[node]:
+                node, state = tree.expand(node, state)
+                depth += 1
+                stats.nodes += 1
+            if profile:
+                t_expanded = clock()
+
+            # Early exit on an immediate win for the root player
+            if depth == 1 and tree.terminal[node] and state.reward(root_player) > 0:
+                stats.reason = 'win'
+                return tree.action[node]
+
+            # Simulation, scored for the player who moved into the node
+            rollout_value = self.rollout(state, -tree.player[node])
+            if profile:
+                t_rolled_out = clock()
 
             # Backpropagation
-            node.backup(rollout_value)
+            tree.backup(node, rollout_value)
+            if profile:
+                stats.record(depth, t_start, t_selected, t_expanded, t_rolled_out, clock())
+
+        return None
+
+    def _grow_puct_tree(self, root_node: PUCTNode, stats: SearchStats):
+        '''PUCT search: descends eval_batch_size times with virtual loss, then evaluates the collected
+        leaves with a single evaluator call, expands them with their priors and backs up their values.'''
+        evaluator, c, virtual_loss = self.evaluator, self.c, self.virtual_loss
+
+        # Expand the root on its own, otherwise the whole first batch would stop at it
+        if not root_node.is_expanded and not root_node.state.is_terminal() and not stats.exhausted():
+            stats.simulations += 1
+            (priors,), (value,) = evaluator.evaluate([root_node.state])
+            stats.nodes += root_node.expand(priors)
+            root_node.N += 1
+            root_node.W -= value
+
+        while not stats.exhausted():
+            pending: list[list[PUCTNode]] = []  # Paths ending at a leaf waiting for evaluation
+            leaves: dict[int, PUCTNode] = {}  # Unique pending leaves by id; a leaf can be reached twice
+
+            while len(pending) < self.eval_batch_size and not stats.exhausted():
+                stats.simulations += 1
+                node = root_node
+                node.add_virtual_loss(virtual_loss)
+                path = [node]
+
+                # Selection
+                while node.is_expanded and not node.state.is_terminal():
+                    node = node.best_child(c)
+                    node.add_virtual_loss(virtual_loss)
+                    path.append(node)
+
+                # Terminal leaves have an exact value, back it up right away
+                if node.state.is_terminal():
+                    self._backup_puct(path, node.state.reward(-node.player_to_move))
+                    continue
+
+                pending.append(path)
+                leaves.setdefault(id(node), node)
+
+            if not leaves:
+                continue
+
+            # Evaluation, one call per batch
+            batch = list(leaves.values())
+            priors, values = evaluator.evaluate([leaf.state for leaf in batch])
+
+            # Expansion
+            value_of: dict[int, float] = {}
+            for leaf, leaf_priors, value in zip(batch, priors, values):
+                stats.nodes += leaf.expand(leaf_priors)
+                value_of[id(leaf)] = -value  # The evaluator scores the player to move at the leaf
+
+            # Backpropagation
+            for path in pending:
+                self._backup_puct(path, value_of[id(path[-1])])
+
+    def _backup_puct(self, path: list[PUCTNode], value_from_last_mover: float):
+        value = value_from_last_mover
+        for node in reversed(path):
+            node.backup_virtual(value, self.virtual_loss)
+            value = -value  # Switch perspective for zero-sum game
+
+    def _rollout_in_place(self, work: GameState, player: int) -> float:
+        '''Same as rollout, playing on the working state and taking the moves back afterwards.'''
+        moves = 0
+        while not work.is_terminal():
+            work.apply(self.rollout_policy(work))
+            moves += 1
+
+        value = work.reward(player)
+        for _ in range(moves):
+            work.undo()
+        return value
 
-        # Choose the action with the highest visit count
-        if not root_node.children:
-            raise ValueError("No children found from root node after simulations.")
-        
-        # # DEBUG:
-        # print("Root Node:")
-        # print(root_node)
-        # # end DEBUG
-
-        best_child = max(root_node.children, key=lambda n: n.N)
-        # best_child = root_node.best_child(self.c)
-        
-        # DEBUG:
-        print("=====All Children======")
-        for child in root_node.children:
-            print(child)
-        print("========================")
-
-        # print("Best Child:")
-        # print(best_child)
-
-        # print(max(root_node.children, key=lambda n: n.N))
-        # end DEBUG
-
-        return best_child.action_from_parent
-    
     def rollout(self, state: GameState, player: int) -> float:
+        if self.batch_rollout is not None:
+            return self.batch_rollout.rollout(state, player)
+
         current_state = state
 
         while not current_state.is_terminal():
@@ -1,26 +1,34 @@
 from __future__ import annotations
 
 import math
+from typing import TYPE_CHECKING
 from common.game_state import GameState
 
+if TYPE_CHECKING:
+    from common.transposition_table import TranspositionTable
+
 
 class MCTSNode:
-    __slots__ = ('state', 'parent', 'action_from_parent', 'children', 'N', 'W', 'untried_actions', 'player_to_move')
+    __slots__ = ('state', 'parent', 'action_from_parent', 'children', 'actions', 'N', 'W', 'untried_actions', 'player_to_move', 'proven')
 
     def __init__(self, state: GameState, parent: MCTSNode | None=None, action_from_parent: int | None=None):
         self.state = state
         self.parent = parent
         self.action_from_parent = action_from_parent
         self.children: list[MCTSNode] = []
+        self.actions: list[int] = []  # Action leading to each child, shared children included
         self.N = 0  # Visit count
         self.W = 0.0  # Total value
         self.untried_actions = state.legal_actions()
         self.player_to_move = state.current_player()
+        self.proven: float | None = None  # Exact value for the player who moved into the node, once solved (MCTS-Solver)
 
     def is_fully_expanded(self) -> bool:
         return len(self.untried_actions) == 0
     
     def best_child(self, c: float=1.4) -> MCTSNode:
+        '''Child with the highest UCT score. With threads > 1 the children's N and W are read without
+        their locks, racy on purpose (see MCTS._grow_tree_parallel).'''
         # UCT score = Q/N + c * sqrt(ln(N_parent) / N)
         #              ^        ^
         #         exploration  exploitation
@@ -34,20 +42,99 @@ class MCTSNode:
             return (Q / N) + c * math.sqrt(ln_parent_N / N)
         
         return max(self.children, key=utc)
+
+    def best_unproven_child(self, c: float=1.4) -> MCTSNode | None:
+        '''best_child among the children that are not proven yet, or None if they all are.
+        Solved subtrees need no more simulations, so MCTS-Solver never selects them.'''
+        ln_parent_N = math.log(self.N)
+        best, best_score = None, -math.inf
+
+        for child in self.children:
+            if child.proven is not None:
+                continue
+            N = child.N + 1e-9  # Prevent division by zero
+            score = (child.W / N) + c * math.sqrt(ln_parent_N / N)
+            if score > best_score:
+                best, best_score = child, score
+
+        return best
+
+    def update_proof(self) -> bool:
+        '''Proves this node from its children if possible and returns whether it is proven.
+        One child won by this node's player to move proves the node lost for the player who moved into it;
+        otherwise, once every action is expanded and proven, the player to move picks the best proven child.'''
+        if self.proven is not None:
+            return True
+
+        all_proven = not self.untried_actions
+        best = -math.inf
+        for child in self.children:
+            if child.proven is None:
+                all_proven = False
+            elif child.proven > 0:
+                self.proven = -child.proven
+                return True
+            elif child.proven > best:
+                best = child.proven
+
+        if not all_proven or not self.children:
+            return False
+
+        self.proven = -best
+        return True
     
-    def expand(self) -> MCTSNode:
+    def expand(self, table: TranspositionTable | None=None, work: GameState | None=None) -> MCTSNode:
+        '''Expands one untried action. With a transposition table, a position already in the table
+        reuses its node (which keeps its first parent and action), turning the tree into a DAG, and the
+        table is told about every new edge so it can unlink the nodes it evicts.
+        With a mutable working state at this node's position, the action is applied to it in place
+        and the child stores a snapshot.'''
         action = self.untried_actions.pop()
-        next_state = self.state.next_state(action)
-        child_node = MCTSNode(state=next_state, parent=self, action_from_parent=action)
+        if work is None:
+            next_state = self.state.next_state(action)
+        else:
+            work.apply(action)
+            next_state = work.snapshot()
+
+        if table is None:
+            child_node = MCTSNode(state=next_state, parent=self, action_from_parent=action)
+        else:
+            key = next_state.hash_key()
+            child_node = table.get(key, next_state)
+            if child_node is None:
+                child_node = MCTSNode(state=next_state, parent=self, action_from_parent=action)
+                table.put(key, child_node)
+            else:
+                table.add_parent(child_node, self)
+
         self.children.append(child_node)
+        self.actions.append(action)
         return child_node
+
+    def add_virtual_loss(self, virtual_loss: float):
+        '''Counts a visit that is still being simulated as a loss of size virtual_loss, so that other
+        threads descending the same tree prefer other children (best_child maximizes W/N).'''
+        self.N += 1
+        self.W -= virtual_loss
+
+    def backup_virtual(self, value: float, virtual_loss: float):
+        '''Replaces the virtual loss added on the way down by the simulated value; N already counts the visit.'''
+        self.W += value + virtual_loss
+
+    def action_to(self, child: MCTSNode) -> int:
+        '''Returns the action leading from this node to the given child, which may be shared with other parents.'''
+        if child.parent is self:
+            return child.action_from_parent
+
+        return self.actions[self.children.index(child)]
     
-    def backup(self, value_from_current_player: float):
+    def backup(self, value_from_last_mover: float):
         '''Backpropagate value up the tree.
-        value_from_current_player is the rollout value from the perspective of self.player_to_move.
+        value_from_last_mover is the rollout value from the perspective of the player who moved into
+        this node (the parent's player_to_move), so that best_child maximizes the selecting player's value.
         As we go up one level, the player perspective flips (zero-sum, two-player).'''
         node = self
-        value = value_from_current_player
+        value = value_from_last_mover
 
         while node is not None:
             node.N += 1
@@ -55,5 +142,15 @@ class MCTSNode:
             value = -value  # Switch perspective for zero-sum game
             node = node.parent
 
+    @staticmethod
+    def backup_path(path: list[MCTSNode], value_from_last_mover: float):
+        '''Same as backup, along an explicit root-to-leaf path (nodes of a DAG can have several parents).'''
+        value = value_from_last_mover
+
+        for node in reversed(path):
+            node.N += 1
+            node.W += value
+            value = -value  # Switch perspective for zero-sum game
+
     def __str__(self) -> str:
         return (f'Action: {self.action_from_parent}, N: {self.N}, W: {self.W:.2f}, Terminated: {self.state.is_terminal()}, Winner: {self.state._check_winner()}')
\ No newline at end of file
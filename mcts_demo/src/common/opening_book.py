@@ -0,0 +1,141 @@
+import mmap
+import os
+from typing import Callable
+import numpy as np
+from common.game_state import GameState
+
+
+class OpeningBook:
+    '''Precomputed root visit distributions, read from a memory-mapped file.
+
+    The file holds a header, the position hashes (GameState.hash_key) sorted ascending, the offset of each
+    position's moves, and the actions and visit counts of all positions back to back. Lookups binary-search
+    the mapped keys, so every process opening the same book shares its pages instead of loading a copy.
+    A book pickles as its path, so it can be passed to worker processes.'''
+
+    MAGIC = b'MOB1'
+    KEY_MASK = (1 << 64) - 1  # Keys are stored as unsigned 64-bit, hash() can be negative
+    HEADER = np.dtype([('magic', 'S4'), ('pad', '<u4'), ('n_positions', '<u8'), ('n_moves', '<u8')])
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lookups = 0
+        self.hits = 0
+
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = np.frombuffer(self._mmap, dtype=self.HEADER, count=1)[0]
+        if header['magic'] != self.MAGIC:
+            raise ValueError(f"'{path}' is not an opening book file.")
+
+        n_positions, n_moves = int(header['n_positions']), int(header['n_moves'])
+        offset = self.HEADER.itemsize
+        self._keys = np.frombuffer(self._mmap, dtype='<u8', count=n_positions, offset=offset)
+        offset += self._keys.nbytes
+        self._offsets = np.frombuffer(self._mmap, dtype='<u8', count=n_positions + 1, offset=offset)
+        offset += self._offsets.nbytes
+        self._actions = np.frombuffer(self._mmap, dtype='<i4', count=n_moves, offset=offset)
+        offset += self._actions.nbytes
+        self._visits = np.frombuffer(self._mmap, dtype='<u4', count=n_moves, offset=offset)
+
+    def get(self, state: GameState) -> dict[int, int] | None:
+        '''Returns the stored visit count of each root action for the position, or None if it is not in the book.
+        Entries with an action that is illegal in the position come from another position with the same
+        masked hash, and are treated as missing.'''
+        self.lookups += 1
+        key = state.hash_key() & self.KEY_MASK
+        index = int(np.searchsorted(self._keys, key))
+        if index == len(self._keys) or self._keys[index] != key:
+            return None
+
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        visits = dict(zip(self._actions[start:end].tolist(), self._visits[start:end].tolist()))
+        if not visits.keys() <= set(state.legal_actions()):
+            return None
+
+        self.hits += 1
+        return visits
+
+    @classmethod
+    def write(cls, path: str, positions: dict[int, dict[int, int]]):
+        '''Writes a book mapping position hashes to the visit count of each root action.'''
+        keys = sorted(key & cls.KEY_MASK for key in positions)
+        by_key = {key & cls.KEY_MASK: visits for key, visits in positions.items()}
+        counts = [len(by_key[key]) for key in keys]
+
+        header = np.zeros(1, dtype=cls.HEADER)
+        header['magic'], header['n_positions'], header['n_moves'] = cls.MAGIC, len(keys), sum(counts)
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype='<u8'))).astype('<u8')
+        actions = np.array([action for key in keys for action in by_key[key]], dtype='<i4')
+        visits = np.array([n for key in keys for n in by_key[key].values()], dtype='<u4')
+
+        with open(path, 'wb') as file:
+            for arr in (header, np.array(keys, dtype='<u8'), offsets, actions, visits):
+                file.write(arr.tobytes())
+
+    @staticmethod
+    def positions(root_state: GameState, depth: int) -> list[GameState]:
+        '''Returns the distinct non-terminal positions up to depth plies from root_state, breadth first.'''
+        seen: set[int] = set()
+        states: list[GameState] = []
+        frontier = [root_state]
+
+        for ply in range(depth + 1):
+            next_frontier = []
+            for state in frontier:
+                key = state.hash_key()
+                if key in seen or state.is_terminal():
+                    continue
+                seen.add(key)
+                states.append(state)
+                if ply < depth:
+                    next_frontier.extend(state.next_state(action) for action in state.legal_actions())
+            frontier = next_frontier
+
+        return states
+
+    @classmethod
+    def build(cls, path: str, root_state: GameState, depth: int,
+              search: Callable[[GameState], tuple[dict[int, int], int | None]], map_fn: Callable=map) -> int:
+        '''Searches every position up to depth plies from root_state with search (e.g. MCTS.root_visits),
+        writes the book to path and returns the number of positions. map_fn runs the searches, pass
+        an executor's map to spread them over processes. A search that ends on an immediate win
+        stores only the winning action.'''
+        states = cls.positions(root_state, depth)
+        positions = {state.hash_key(): {winning_action: 1} if winning_action is not None else visits
+                     for state, (visits, winning_action) in zip(states, map_fn(search, states))}
+
+        cls.write(path, positions)
+        return len(positions)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def close(self):
+        # Drop the views first, the mapping cannot close while they hold its buffer
+        self._keys = self._offsets = self._actions = self._visits = None
+        self._mmap.close()
+
+    def __getstate__(self) -> dict:
+        return {'path': self.path}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state['path'])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __enter__(self) -> 'OpeningBook':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __str__(self) -> str:
+        return f'Positions: {len(self)}, Lookups: {self.lookups}, Hit rate: {self.hit_rate:.1%}'
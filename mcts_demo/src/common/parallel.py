@@ -0,0 +1,168 @@
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from common.game_state import GameState
+from common.mcts import MCTS
+from common.mcts_node import MCTSNode
+
+
+def _root_worker(mcts_kwargs: dict, root_state: GameState, n_sim: int, seed: int) -> tuple[dict[int, int], int | None]:
+    random.seed(seed)
+    return MCTS(**mcts_kwargs).root_visits(root_state, n_sim)
+
+
+def _rollout_worker(mcts_kwargs: dict, leaves: list[tuple[GameState, int, int]], seed: int) -> list[list[float]]:
+    '''Rollout values of each (state, player, n_rollouts) leaf.'''
+    random.seed(seed)
+    mcts = MCTS(**mcts_kwargs)
+    return [[mcts.rollout(state, player) for _ in range(n_rollouts)] for state, player, n_rollouts in leaves]
+
+
+class ParallelMCTS:
+    '''MCTS spread over a pool of worker processes.
+
+    mode='root' runs an independent search per worker with its own seed and share of n_sim,
+    then sums the root visit counts. mode='leaf' grows a single tree in this process: each round
+    selects leaf_batch leaves (4 per worker by default), kept apart by virtual loss, and sends them
+    to the workers in one submission per worker, which runs leaf_rollouts rollouts of each leaf.
+    The last round is cut down so that exactly n_sim simulations are run.
+    With one worker both modes run the serial MCTS search in-process and return the same move.
+    Positions in the opening_book option are answered from the book in this process.
+    mcts_kwargs are passed to MCTS in every worker, so they must be picklable.'''
+
+    def __init__(self, workers: int | None=None, mode: str='root', leaf_rollouts: int=8, leaf_batch: int | None=None,
+                 **mcts_kwargs):
+        if mode not in ('root', 'leaf'):
+            raise ValueError(f"Unknown parallel mode '{mode}', expected 'root' or 'leaf'.")
+        for name, value in (('workers', workers), ('leaf_rollouts', leaf_rollouts), ('leaf_batch', leaf_batch)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1, got {value}.")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.leaf_rollouts = leaf_rollouts
+        self.leaf_batch = leaf_batch or 4 * self.workers
+        self.mcts_kwargs = mcts_kwargs
+        self.mcts = MCTS(**mcts_kwargs)
+        self._executor: Executor | None = None
+
+    def search(self, root_state: GameState, n_sim: int = 1000) -> int:
+        if self.workers == 1:
+            return self.mcts.search(root_state, n_sim)
+
+        book = self.mcts.opening_book
+        visits = book.get(root_state) if book is not None else None
+        if visits is not None:
+            return max(visits, key=visits.get)
+
+        if self.mode == 'root':
+            visits, winning_action = self._root_parallel(root_state, n_sim)
+        else:
+            visits, winning_action = self._leaf_parallel(root_state, n_sim)
+
+        if winning_action is not None:
+            return winning_action
+        if not visits:
+            raise ValueError("No children found from root node after simulations.")
+
+        return max(visits, key=visits.get)
+
+    def _root_parallel(self, root_state: GameState, n_sim: int) -> tuple[dict[int, int], int | None]:
+        executor = self._pool()
+        base_seed = random.getrandbits(32)
+        shares = [n_sim // self.workers + (i < n_sim % self.workers) for i in range(self.workers)]
+
+        futures = [executor.submit(_root_worker, self.mcts_kwargs, root_state, share, base_seed + i)
+                   for i, share in enumerate(shares) if share > 0]
+
+        merged: dict[int, int] = {}
+        winning_action = None
+        for future in futures:
+            visits, worker_winning_action = future.result()
+            if winning_action is None:
+                winning_action = worker_winning_action
+            for action, n in visits.items():
+                merged[action] = merged.get(action, 0) + n
+
+        return merged, winning_action
+
+    def _leaf_parallel(self, root_state: GameState, n_sim: int) -> tuple[dict[int, int], int | None]:
+        executor = self._pool()
+        root_node = MCTSNode(state=root_state)
+        seed = random.getrandbits(32)
+        root_player = root_state.current_player()
+        virtual_loss = self.mcts.virtual_loss
+        simulations = 0
+
+        while simulations < n_sim:
+            pending: list[tuple[list[MCTSNode], int]] = []  # Path to each leaf and its number of rollouts
+            planned = simulations
+
+            while len(pending) < self.leaf_batch and planned < n_sim:
+                node = root_node
+                path = [node]
+
+                # Selection, with virtual loss so the leaves of a round differ
+                while not node.state.is_terminal() and node.is_fully_expanded():
+                    node = node.best_child(self.mcts.c)
+                    path.append(node)
+
+                # Expansion
+                if not node.state.is_terminal():
+                    node = node.expand()
+                    path.append(node)
+
+                # Early exit on an immediate win for the root player, otherwise back up the exact result once
+                if node.state.is_terminal():
+                    if len(path) == 2 and node.state.reward(root_player) > 0:
+                        return {}, node.action_from_parent
+
+                    MCTSNode.backup_path(path, node.state.reward(-node.player_to_move))
+                    simulations += 1
+                    planned += 1
+                    continue
+
+                n_rollouts = min(self.leaf_rollouts, n_sim - planned)
+                for path_node in path:
+                    path_node.add_virtual_loss(virtual_loss)
+                pending.append((path, n_rollouts))
+                planned += n_rollouts
+
+            if not pending:
+                continue
+
+            # Simulation on the workers, one submission each, scored for the player who moved into the leaf
+            shares = [pending[i::self.workers] for i in range(min(self.workers, len(pending)))]
+            futures = [executor.submit(_rollout_worker, self.mcts_kwargs,
+                                       [(path[-1].state, -path[-1].player_to_move, n_rollouts) for path, n_rollouts in share],
+                                       seed + i)
+                       for i, share in enumerate(shares)]
+            seed += len(shares)
+
+            # Backpropagation, after taking the virtual loss back
+            for share, future in zip(shares, futures):
+                for (path, _), rollout_values in zip(share, future.result()):
+                    for path_node in path:
+                        path_node.N -= 1
+                        path_node.W += virtual_loss
+                    for rollout_value in rollout_values:
+                        MCTSNode.backup_path(path, rollout_value)
+                        simulations += 1
+
+        return {child.action_from_parent: child.N for child in root_node.children}, None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'ParallelMCTS':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
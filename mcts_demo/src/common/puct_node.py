@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import math
+from common.game_state import GameState
+
+
+class PUCTNode:
+    '''Search node for PUCT: all children are created at once on expansion, each with the
+    evaluator's prior probability P for the action leading to it.'''
+    __slots__ = ('state', 'parent', 'action_from_parent', 'children', 'N', 'W', 'P', 'player_to_move', 'is_expanded')
+
+    def __init__(self, state: GameState, parent: PUCTNode | None=None, action_from_parent: int | None=None, prior: float=1.0):
+        self.state = state
+        self.parent = parent
+        self.action_from_parent = action_from_parent
+        self.children: list[PUCTNode] = []
+        self.N = 0  # Visit count
+        self.W = 0.0  # Total value, from the perspective of the player who moved into this node
+        self.P = prior  # Prior probability of action_from_parent
+        self.player_to_move = state.current_player()
+        self.is_expanded = False
+
+    def best_child(self, c: float) -> PUCTNode:
+        # PUCT score = Q + c * P * sqrt(N_parent) / (1 + N)
+        #              ^   ^
+        #   exploitation   exploration guided by the prior
+        assert self.children, "No children to select from"
+
+        sqrt_parent_N = math.sqrt(self.N)
+        best, best_score = None, -math.inf
+
+        for child in self.children:
+            Q = child.W / child.N if child.N else 0.0
+            score = Q + c * child.P * sqrt_parent_N / (1 + child.N)
+            if score > best_score:
+                best, best_score = child, score
+
+        return best
+
+    def expand(self, priors: list[float]) -> int:
+        '''Creates one child per legal action, priors being aligned with state.legal_actions(). Returns the number of children.'''
+        for action, prior in zip(self.state.legal_actions(), priors):
+            self.children.append(PUCTNode(state=self.state.next_state(action), parent=self, action_from_parent=action, prior=prior))
+
+        self.is_expanded = True
+        return len(self.children)
+
+    def add_virtual_loss(self, virtual_loss: float):
+        '''Counts a visit whose value is still pending as a loss, see MCTSNode.add_virtual_loss.'''
+        self.N += 1
+        self.W -= virtual_loss
+
+    def backup_virtual(self, value: float, virtual_loss: float):
+        self.W += value + virtual_loss
+
+    def __str__(self) -> str:
+        return f'Action: {self.action_from_parent}, N: {self.N}, W: {self.W:.2f}, P: {self.P:.3f}'
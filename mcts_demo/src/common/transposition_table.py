@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from common.game_state import GameState
+
+if TYPE_CHECKING:
+    from common.mcts_node import MCTSNode
+
+
+class TranspositionTable:
+    '''Maps position hashes (GameState.hash_key) to the MCTSNode shared by every path reaching that position.
+
+    Every node of a search using the table is entered in it, so max_entries bounds the tree itself.
+    When the table is full, the oldest leaf (node without children) is evicted: it is removed from its
+    parents, whose action to it goes back to their untried actions, and nothing references it any more.
+    A leaf that stayed a leaf the longest is one the search has not gone back to, and the least costly
+    to drop since no subtree hangs from it.'''
+
+    def __init__(self, max_entries: int=100_000):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+
+        self.max_entries = max_entries
+        self._entries: dict[int, MCTSNode] = {}
+        self._leaves: OrderedDict[int, MCTSNode] = OrderedDict()  # Nodes without children by id, oldest first
+        self._extra_parents: dict[int, list[MCTSNode]] = {}  # Parents besides node.parent, by node id
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, key: int, state: GameState) -> MCTSNode | None:
+        '''Returns the node stored for the position, or None. The state guards against hash collisions.'''
+        self.lookups += 1
+        node = self._entries.get(key)
+
+        if node is None or node.state != state:
+            return None
+
+        self.hits += 1
+        return node
+
+    def put(self, key: int, node: MCTSNode):
+        '''Enters a new node, evicting the oldest leaves while the table is over max_entries.'''
+        self._entries[key] = node
+        self._leaves[id(node)] = node
+        self._leaves.pop(id(node.parent), None)  # About to get node as a child
+
+        while len(self._entries) > self.max_entries and self._leaves:
+            self._evict(self._leaves.popitem(last=False)[1])
+
+    def add_parent(self, node: MCTSNode, parent: MCTSNode):
+        '''Records a parent reaching node through a transposition, so eviction can unlink it.'''
+        self._leaves.pop(id(parent), None)
+        self._extra_parents.setdefault(id(node), []).append(parent)
+
+    def _evict(self, node: MCTSNode):
+        key = node.state.hash_key()
+        if self._entries.get(key) is node:
+            del self._entries[key]
+        self.evictions += 1
+
+        parents = self._extra_parents.pop(id(node), [])
+        if node.parent is not None:
+            parents.append(node.parent)
+        for parent in parents:
+            index = parent.children.index(node)
+            del parent.children[index]
+            parent.untried_actions.append(parent.actions.pop(index))
+            if not parent.children:
+                self._leaves[id(parent)] = parent
+
+    def clear(self):
+        self._entries.clear()
+        self._leaves.clear()
+        self._extra_parents.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return (f'Entries: {len(self)}/{self.max_entries}, Lookups: {self.lookups}, '
+                f'Hit rate: {self.hit_rate:.1%}, Evictions: {self.evictions}')
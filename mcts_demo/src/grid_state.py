@@ -0,0 +1,298 @@
+# -----------------------------------------
+# Grid games: Connect Four and Gomoku States
+# -----------------------------------------
+
+from __future__ import annotations
+import random
+from dataclasses import dataclass, field
+from common.game_state import GameState
+
+
+def _zobrist_keys(n: int, seed: int) -> tuple[tuple[int, ...], tuple[int, ...], int]:
+    '''Zobrist keys for X and O on n squares plus the O-to-move key, fixed so hashes are stable across processes.'''
+    rng = random.Random(seed)
+    return (tuple(rng.getrandbits(64) for _ in range(n)), tuple(rng.getrandbits(64) for _ in range(n)),
+            rng.getrandbits(64))
+
+
+def _wins_through(bits: int, bit: int, stride: int, win_length: int) -> bool:
+    '''True if the stones in bits make win_length in a row on one of the four lines through bit.'''
+    for shift in (1, stride - 1, stride, stride + 1):  # Row, anti-diagonal, column, diagonal
+        length = 1
+        i = bit + shift
+        while bits >> i & 1:
+            length += 1
+            i += shift
+        i = bit - shift
+        while i >= 0 and bits >> i & 1:
+            length += 1
+            i -= shift
+        if length >= win_length:
+            return True
+    return False
+
+
+@dataclass(frozen=True, slots=True)
+class GridState(GameState):
+    '''Two players placing stones on a WIDTH x HEIGHT grid, WIN_LENGTH in a row wins.
+
+    Each player's stones are one int bitboard: square (row, col) is bit row * STRIDE + col, where
+    STRIDE = WIDTH + 1 leaves an always-empty column so lines cannot wrap around the edge.
+    last_move is the square (row * WIDTH + col) of the stone just placed. The winner is found by
+    following the four lines through it only, and the Zobrist key is updated with that one stone.
+    States built without a last_move (e.g. from_board) scan every stone once instead.
+    Subclasses define the grid constants and the rules for actions in _actions and _square.'''
+    x: int = 0  # Bitboard of X stones
+    o: int = 0  # Bitboard of O stones
+    current_player_index: int = 1  # 1 or -1
+    last_move: int = field(default=-1, compare=False)  # Square of the last stone placed, -1 if unknown
+    key: int | None = field(default=None, repr=False, compare=False)  # Zobrist hash, computed if not given
+    winner: int | None = field(init=False, repr=False, compare=False)  # Cached on construction
+
+    WIDTH = 0
+    HEIGHT = 0
+    STRIDE = 1
+    WIN_LENGTH = 0
+    ZOBRIST_X = ()
+    ZOBRIST_O = ()
+    ZOBRIST_O_TO_MOVE = 0
+
+    def __post_init__(self):
+        if self.key is None:
+            object.__setattr__(self, 'key', self._full_hash())
+
+        if self.last_move >= 0:
+            mover = -self.current_player_index
+            bits = self.x if mover == 1 else self.o
+            winner = mover if _wins_through(bits, self._bit(self.last_move), self.STRIDE, self.WIN_LENGTH) else None
+        else:
+            winner = self._scan_winner()
+        object.__setattr__(self, 'winner', winner)
+
+    @classmethod
+    def from_board(cls, board: tuple[int, ...], current_player_index: int) -> GridState:
+        '''Builds a state from a row-major board of 1 (X), -1 (O) and 0 (empty).'''
+        x = sum(1 << cls._bit(square) for square, v in enumerate(board) if v == 1)
+        o = sum(1 << cls._bit(square) for square, v in enumerate(board) if v == -1)
+        return cls(x=x, o=o, current_player_index=current_player_index)
+
+    @property
+    def board(self) -> tuple[int, ...]:
+        return tuple(1 if self.x >> bit & 1 else -1 if self.o >> bit & 1 else 0
+                     for bit in map(self._bit, range(self.WIDTH * self.HEIGHT)))
+
+    @classmethod
+    def _bit(cls, square: int) -> int:
+        return square + square // cls.WIDTH
+
+    def _place(self, square: int) -> GridState:
+        bit = 1 << self._bit(square)
+        if self.current_player_index == 1:
+            key = self.key ^ self.ZOBRIST_X[square] ^ self.ZOBRIST_O_TO_MOVE
+            return type(self)(x=self.x | bit, o=self.o, current_player_index=-1, last_move=square, key=key)
+
+        key = self.key ^ self.ZOBRIST_O[square] ^ self.ZOBRIST_O_TO_MOVE
+        return type(self)(x=self.x, o=self.o | bit, current_player_index=1, last_move=square, key=key)
+
+    def _scan_winner(self) -> int | None:
+        for player, bits in ((1, self.x), (-1, self.o)):
+            remaining = bits
+            while remaining:
+                low = remaining & -remaining
+                if _wins_through(bits, low.bit_length() - 1, self.STRIDE, self.WIN_LENGTH):
+                    return player
+                remaining ^= low
+        return None
+
+    def _full_hash(self) -> int:
+        key = self.ZOBRIST_O_TO_MOVE if self.current_player_index == -1 else 0
+        for square in range(self.WIDTH * self.HEIGHT):
+            bit = self._bit(square)
+            if self.x >> bit & 1:
+                key ^= self.ZOBRIST_X[square]
+            elif self.o >> bit & 1:
+                key ^= self.ZOBRIST_O[square]
+        return key
+
+    @classmethod
+    def _actions(cls, occupied: int) -> list[int]:
+        '''Legal actions given the bitboard of occupied squares.'''
+        raise NotImplementedError
+
+    @classmethod
+    def _square(cls, occupied: int, action: int) -> int:
+        '''Square the action places a stone on, given the bitboard of occupied squares; raises ValueError if illegal.'''
+        raise NotImplementedError
+
+    def current_player(self) -> int:
+        return self.current_player_index
+
+    def legal_actions(self) -> list[int]:
+        return self._actions(self.x | self.o)
+
+    def next_state(self, action: int) -> GridState:
+        return self._place(self._square(self.x | self.o, action))
+
+    def is_terminal(self) -> bool:
+        return self.winner is not None or (self.x | self.o).bit_count() == self.WIDTH * self.HEIGHT
+
+    def reward(self, player: int) -> float:
+        if self.winner is None:
+            return 0.0  # Draw or ongoing
+
+        return 1.0 if self.winner == player else -1.0
+
+    def hash_key(self) -> int:
+        return self.key
+
+    def to_mutable(self) -> MutableGridState:
+        return MutableGridState(self)
+
+    def _check_winner(self) -> int | None:
+        return self.winner
+
+    def __str__(self) -> str:
+        symbols = {1: 'X', -1: 'O', 0: '.'}
+        board = self.board
+        # Row 0 is the bottom row
+        return '\n'.join(' '.join(symbols[board[row * self.WIDTH + col]] for col in range(self.WIDTH))
+                         for row in reversed(range(self.HEIGHT)))
+
+
+# ---------------------
+# Connect Four State
+# ---------------------
+
+_C4_ZOBRIST = _zobrist_keys(6 * 7, 0xc4)
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectFourState(GridState):
+    '''Connect Four on 7 columns x 6 rows: actions are columns, stones drop to the lowest empty row.'''
+    WIDTH = 7
+    HEIGHT = 6
+    STRIDE = 8
+    WIN_LENGTH = 4
+    ZOBRIST_X, ZOBRIST_O, ZOBRIST_O_TO_MOVE = _C4_ZOBRIST
+
+    # Bit of the top square of each column
+    TOP_BITS = tuple(1 << ((6 - 1) * 8 + col) for col in range(7))
+
+    @classmethod
+    def _actions(cls, occupied: int) -> list[int]:
+        return [col for col, top in enumerate(cls.TOP_BITS) if not occupied & top]
+
+    @classmethod
+    def _square(cls, occupied: int, action: int) -> int:
+        if not 0 <= action < cls.WIDTH or occupied & cls.TOP_BITS[action]:
+            raise ValueError("Invalid action")
+
+        row = 0
+        while occupied >> (row * cls.STRIDE + action) & 1:
+            row += 1
+        return row * cls.WIDTH + action
+
+
+# ---------------------
+# Gomoku State
+# ---------------------
+
+_GOMOKU_ZOBRIST = _zobrist_keys(15 * 15, 0x60)
+
+
+@dataclass(frozen=True, slots=True)
+class GomokuState(GridState):
+    '''Free-style Gomoku on a 15 x 15 board: actions are squares (row * 15 + col), five or more in a row wins.'''
+    WIDTH = 15
+    HEIGHT = 15
+    STRIDE = 16
+    WIN_LENGTH = 5
+    ZOBRIST_X, ZOBRIST_O, ZOBRIST_O_TO_MOVE = _GOMOKU_ZOBRIST
+
+    @classmethod
+    def _actions(cls, occupied: int) -> list[int]:
+        width = cls.WIDTH
+        return [square for square in range(width * cls.HEIGHT) if not occupied >> (square + square // width) & 1]
+
+    @classmethod
+    def _square(cls, occupied: int, action: int) -> int:
+        if not 0 <= action < cls.WIDTH * cls.HEIGHT or occupied >> cls._bit(action) & 1:
+            raise ValueError("Invalid action")
+
+        return action
+
+
+# ---------------------
+# Mutable grid state
+# ---------------------
+
+class MutableGridState(GameState):
+    '''A GridState that plays and takes back moves in place, see GameState.to_mutable.'''
+    __slots__ = ('game', 'x', 'o', 'current_player_index', 'last_move', 'key', 'winner', '_history')
+
+    def __init__(self, state: GridState):
+        self.game = type(state)  # Grid constants and rules
+        self.x = state.x
+        self.o = state.o
+        self.current_player_index = state.current_player_index
+        self.last_move = state.last_move
+        self.key = state.key
+        self.winner = state.winner
+        self._history: list[tuple[int, int, int | None]] = []  # (square, previous last_move, previous winner)
+
+    def apply(self, action: int):
+        game = self.game
+        square = game._square(self.x | self.o, action)
+        bit = square + square // game.WIDTH
+        self._history.append((square, self.last_move, self.winner))
+
+        if self.current_player_index == 1:
+            self.x |= 1 << bit
+            self.key ^= game.ZOBRIST_X[square] ^ game.ZOBRIST_O_TO_MOVE
+            if _wins_through(self.x, bit, game.STRIDE, game.WIN_LENGTH):
+                self.winner = 1
+        else:
+            self.o |= 1 << bit
+            self.key ^= game.ZOBRIST_O[square] ^ game.ZOBRIST_O_TO_MOVE
+            if _wins_through(self.o, bit, game.STRIDE, game.WIN_LENGTH):
+                self.winner = -1
+        self.current_player_index = -self.current_player_index
+        self.last_move = square
+
+    def undo(self):
+        game = self.game
+        square, self.last_move, self.winner = self._history.pop()
+        bit = 1 << (square + square // game.WIDTH)
+        self.current_player_index = -self.current_player_index
+
+        if self.current_player_index == 1:
+            self.x ^= bit
+            self.key ^= game.ZOBRIST_X[square] ^ game.ZOBRIST_O_TO_MOVE
+        else:
+            self.o ^= bit
+            self.key ^= game.ZOBRIST_O[square] ^ game.ZOBRIST_O_TO_MOVE
+
+    def snapshot(self) -> GridState:
+        return self.game(x=self.x, o=self.o, current_player_index=self.current_player_index,
+                         last_move=self.last_move, key=self.key)
+
+    def current_player(self) -> int:
+        return self.current_player_index
+
+    def legal_actions(self) -> list[int]:
+        return self.game._actions(self.x | self.o)
+
+    def is_terminal(self) -> bool:
+        return self.winner is not None or (self.x | self.o).bit_count() == self.game.WIDTH * self.game.HEIGHT
+
+    def reward(self, player: int) -> float:
+        if self.winner is None:
+            return 0.0  # Draw or ongoing
+
+        return 1.0 if self.winner == player else -1.0
+
+    def hash_key(self) -> int:
+        return self.key
+
+    def _check_winner(self) -> int | None:
+        return self.winner
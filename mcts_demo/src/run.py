@@ -1,45 +1,47 @@
 import random
 from common.game_state import GameState
 from common.mcts import MCTS
-from ttt_state import TTTState
+from ttt_state import BitboardTTTState, TTTState
 
-def play_game(mcts_iters: int=1000, seed: int=0, opponent: str='random') -> int:
+def play_game(mcts_iters: int=1000, seed: int=0, opponent: str='random', tree: str='node', bitboard: bool=False,
+              reuse_tree: bool=False, time_budget: float | None=None, verbose: bool=False) -> int:
     random.seed(seed)
     state: GameState = TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1)
-    mcts = MCTS()
+    if bitboard:
+        state = BitboardTTTState.from_board(state.board, state.current_player())
+    mcts = MCTS(tree=tree, reuse_tree=reuse_tree)
     move_num = 1
 
     while not state.is_terminal():
         if state.current_player() == 1:
             # X uses MCTS
-            print("MCTS Player's turn (X):")
-            action = mcts.search(root_state=state, n_sim=mcts_iters)
+            action = mcts.search(root_state=state, n_sim=mcts_iters, time_budget=time_budget)
         else:
             # O uses random policy
-            print("Random Player's turn (O):")
             if opponent == 'random':
                 # action = random_policy(state)
                 action = random.choice(state.legal_actions())
             else:
-                action = mcts.search(root_state=state, n_sim=mcts_iters)
+                action = mcts.search(root_state=state, n_sim=mcts_iters, time_budget=time_budget)
 
         state = state.next_state(action)
-        print(f'\nMove {move_num} ({"X" if state.current_player() == -1 else "O"} just played @{action}):')
-        print(state)
+        if verbose:
+            print(f'\nMove {move_num} ({"X" if state.current_player() == -1 else "O"} just played @{action}):')
+            print(state)
+            if state.current_player() == -1 or opponent != 'random':
+                print(f'Search: {mcts.last_search}')
         move_num += 1
 
     winner = state._check_winner()
-    if winner is None:
-        print("It's a draw!")
-        return 0
-    else:
-        print(f'Result: Player {"X" if winner == 1 else "O"} wins!')
-        return winner
+    if verbose:
+        print("It's a draw!" if winner is None else f'Result: Player {"X" if winner == 1 else "O"} wins!')
+
+    return winner or 0
 
 
 if __name__ == '__main__':
     print('\n=== Demo: MCTS (X) vs Random (O) ===\n')
-    _ = play_game(mcts_iters=10, seed=42, opponent='random')
+    _ = play_game(mcts_iters=10, seed=42, opponent='random', verbose=True)
 
     # print('\n=== Demo: MCTS (X) vs MCTS (O) ===\n')
-    # _ = play_game(mcts_iters=800, seed=42, opponent='mcts')
+    # _ = play_game(mcts_iters=800, seed=42, opponent='mcts', verbose=True)
@@ -0,0 +1,268 @@
+'''Seeded self-play tournaments between MCTS configurations, reported as JSON.
+
+Players are given as "random" or "mcts[:key=value,...]", e.g. "mcts:n_sim=400" or
+"mcts:n_sim=2000,tree=array". Keys are n_sim, time (seconds per move) and the MCTS options
+c_puct, tree, reuse_tree, threads, virtual_loss, solver, in_place, plus batch_rollout=<K>, transpositions=<entries>,
+puct=<eval batch size> and book=<opening book file> (see build_book.py); batch_rollout and puct are tic-tac-toe only.
+Every match plays half its games with each player moving first.
+
+    python tournament.py --games 1000 --match mcts:n_sim=400 random --match mcts:n_sim=1600 mcts:n_sim=400
+'''
+
+import argparse
+import functools
+import inspect
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from common.game_state import GameState
+from common.mcts import MCTS
+from common.opening_book import OpeningBook
+from common.transposition_table import TranspositionTable
+from grid_state import ConnectFourState, GomokuState
+from ttt_batch_rollout import TTTBatchRollout
+from ttt_evaluator import make_ttt_evaluator
+from ttt_state import BitboardTTTState, TTTState
+
+
+GAMES = {
+    'ttt': lambda: TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1),
+    'ttt-bitboard': lambda: BitboardTTTState(x=0, o=0, current_player_index=1),
+    'connect-four': ConnectFourState,
+    'gomoku': GomokuState,
+}
+
+DEFAULT_MATCHES = [
+    ('mcts:n_sim=100', 'random'),
+    ('mcts:n_sim=400', 'random'),
+    ('mcts:n_sim=1600', 'random'),
+    ('mcts:n_sim=1600', 'mcts:n_sim=400'),
+    ('mcts:n_sim=400,tree=array', 'mcts:n_sim=400'),
+]
+
+
+# Keys of an mcts player spec: the MCTS options, plus the ones Player turns into options or search arguments
+PLAYER_KEYS = {'n_sim', 'time', 'transpositions', 'puct', 'book'}
+MCTS_KEYS = set(inspect.signature(MCTS).parameters) - {'rollout_policy', 'transposition_table', 'evaluator',
+                                                       'opening_book', 'endgame_table', 'on_search'}
+# Keys backed by the tic-tac-toe evaluator and rollout engine, which only read tic-tac-toe states
+TTT_ONLY_KEYS = {'puct', 'batch_rollout'}
+TTT_GAMES = {'ttt', 'ttt-bitboard'}
+
+
+def parse_player(spec: str, game: str='ttt-bitboard') -> tuple[str, dict]:
+    name, _, options = spec.partition(':')
+    if name not in ('random', 'mcts'):
+        raise ValueError(f"Unknown player '{name}' in '{spec}', expected 'random' or 'mcts'.")
+
+    kwargs = {}
+    for option in filter(None, options.split(',')):
+        key, sep, value = option.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value, got '{option}' in '{spec}'.")
+        kwargs[key] = _parse_value(value)
+
+    if name == 'random' and kwargs:
+        raise ValueError(f"The random player takes no options, got '{spec}'.")
+    unknown = sorted(set(kwargs) - PLAYER_KEYS - MCTS_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown option(s) {', '.join(unknown)} in '{spec}', "
+                         f"expected one of: {', '.join(sorted(PLAYER_KEYS | MCTS_KEYS))}.")
+    ttt_only = sorted(set(kwargs) & TTT_ONLY_KEYS)
+    if ttt_only and game not in TTT_GAMES:
+        raise ValueError(f"Option(s) {', '.join(ttt_only)} in '{spec}' only support tic-tac-toe, not '{game}'.")
+
+    return name, kwargs
+
+
+def _parse_value(value: str) -> int | float | bool | str:
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+@functools.cache
+def open_book(path: str) -> OpeningBook:
+    '''Maps each book once per worker process, for all the players of all its games.'''
+    return OpeningBook(path)
+
+
+class Player:
+    '''Plays moves for one side and records its per-move latency and simulations.'''
+
+    def __init__(self, spec: str, seed: int, game: str='ttt-bitboard'):
+        self.spec = spec
+        self.name, options = parse_player(spec, game)
+        self.latencies: list[float] = []
+        self.simulations = 0
+        self.search_time = 0.0
+        self.rng = random.Random(seed)
+
+        if self.name == 'mcts':
+            self.n_sim = options.pop('n_sim', 1000 if 'time' not in options else None)
+            self.time_budget = options.pop('time', None)
+            self.mcts = MCTS(**self._mcts_kwargs(options, seed))
+
+    @staticmethod
+    def _mcts_kwargs(options: dict, seed: int) -> dict:
+        if 'batch_rollout' in options:
+            options['batch_rollout'] = TTTBatchRollout(options['batch_rollout'], seed=seed)
+        if 'transpositions' in options:
+            options['transposition_table'] = TranspositionTable(options.pop('transpositions'))
+        if 'puct' in options:
+            options['eval_batch_size'] = options.pop('puct')
+            options['evaluator'] = make_ttt_evaluator()
+        if 'book' in options:
+            options['opening_book'] = open_book(options.pop('book'))
+        return options
+
+    def move(self, state: GameState) -> int:
+        start = time.perf_counter()
+        if self.name == 'random':
+            action = self.rng.choice(state.legal_actions())
+        else:
+            action = self.mcts.search(state, n_sim=self.n_sim, time_budget=self.time_budget)
+            self.simulations += self.mcts.last_search.simulations
+            self.search_time += self.mcts.last_search.elapsed
+        self.latencies.append(time.perf_counter() - start)
+        return action
+
+
+def play_one(game: str, spec_a: str, spec_b: str, a_first: bool, seed: int) -> dict:
+    '''Plays one seeded game and returns the result for player A (1 win, 0 draw, -1 loss) and both players' timings.'''
+    random.seed(seed)
+    player_a, player_b = Player(spec_a, seed, game), Player(spec_b, seed + 1, game)
+    first, second = (player_a, player_b) if a_first else (player_b, player_a)
+
+    state = GAMES[game]()
+    first_player = state.current_player()
+    while not state.is_terminal():
+        mover = first if state.current_player() == first_player else second
+        state = state.next_state(mover.move(state))
+
+    result = state.reward(first_player)
+    return {
+        'result': int(result if a_first else -result),
+        'players': [{'latencies': p.latencies, 'simulations': p.simulations, 'search_time': p.search_time}
+                    for p in (player_a, player_b)],
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def wilson_interval(successes: int, n: int, z: float=1.96) -> tuple[float, float]:
+    '''Wilson score interval for a binomial proportion, e.g. the win rate.'''
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def score_interval(wins: int, draws: int, n: int, z: float=1.96) -> tuple[float, float]:
+    '''Normal-approximation interval for the mean score, games scoring 1, 1/2 or 0 (a trinomial, so the
+    Wilson interval does not apply). Clamped to [0, 1]; too optimistic for a handful of games.'''
+    if n == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / n
+    variance = (wins + draws / 4) / n - score * score
+    margin = z * math.sqrt(max(variance, 0.0) / n)
+    return max(0.0, score - margin), min(1.0, score + margin)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def summarize_player(spec: str, records: list[dict]) -> dict:
+    latencies = sorted(latency for record in records for latency in record['latencies'])
+    simulations = sum(record['simulations'] for record in records)
+    search_time = sum(record['search_time'] for record in records)
+
+    return {
+        'spec': spec,
+        'moves': len(latencies),
+        'sims_per_second': simulations / search_time if search_time else None,
+        'latency_ms': {f'p{q}': 1000 * percentile(latencies, q) for q in (50, 90, 95, 99)}
+                      | {'max': 1000 * latencies[-1] if latencies else 0.0},
+    }
+
+
+def run_match(executor: ProcessPoolExecutor, workers: int, game: str, spec_a: str, spec_b: str, n_games: int, seed: int) -> dict:
+    start = time.perf_counter()
+    records = list(executor.map(play_one, [game] * n_games, [spec_a] * n_games, [spec_b] * n_games,
+                                [i % 2 == 0 for i in range(n_games)], [seed + 2 * i for i in range(n_games)],
+                                chunksize=max(1, n_games // (4 * workers))))
+
+    wins = sum(record['result'] == 1 for record in records)
+    draws = sum(record['result'] == 0 for record in records)
+    losses = n_games - wins - draws
+
+    return {
+        'player_a': summarize_player(spec_a, [record['players'][0] for record in records]),
+        'player_b': summarize_player(spec_b, [record['players'][1] for record in records]),
+        'games': n_games,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'win_rate_ci95': list(wilson_interval(wins, n_games)),
+        'score': (wins + draws / 2) / n_games if n_games else None,
+        'score_ci95': list(score_interval(wins, draws, n_games)),
+        'wall_time': time.perf_counter() - start,
+        'peak_rss_kb': max((record['max_rss_kb'] for record in records), default=0),
+    }
+
+
+def run_tournament(matches: list[tuple[str, str]], n_games: int=1000, workers: int | None=None,
+                   game: str='ttt-bitboard', seed: int=0) -> dict:
+    # Fail fast on bad specs, before any worker builds a player
+    for spec_a, spec_b in matches:
+        parse_player(spec_a, game)
+        parse_player(spec_b, game)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = [run_match(executor, workers, game, spec_a, spec_b, n_games, seed) for spec_a, spec_b in matches]
+
+    return {
+        'game': game,
+        'seed': seed,
+        'workers': workers,
+        'matches': results,
+        'peak_rss_kb': max([resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]
+                           + [match['peak_rss_kb'] for match in results]),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='MCTS self-play tournament')
+    parser.add_argument('--match', nargs=2, action='append', metavar=('PLAYER_A', 'PLAYER_B'),
+                        help='players of one match, repeatable (default: MCTS budgets vs random and vs each other)')
+    parser.add_argument('--games', type=int, default=1000, help='games per match')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--game', choices=list(GAMES), default='ttt-bitboard')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = run_tournament([tuple(match) for match in args.match or DEFAULT_MATCHES],
+                            n_games=args.games, workers=args.workers, game=args.game, seed=args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,60 @@
+# ---------------------------------
+# Batched Tic-Tac-Toe Rollouts
+# ---------------------------------
+
+from typing import Callable
+import numpy as np
+from common.batch_rollout import BatchRollout
+from common.game_state import GameState
+from ttt_state import LINES
+
+
+LINE_INDEX = np.array(LINES)  # (8, 3) square indices of every line
+
+
+def uniform_policy(boards: np.ndarray, legal: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    '''Picks a uniformly random legal square on every board: the argmax of random keys over the empty squares.'''
+    keys = rng.random(legal.shape)
+    keys[~legal] = -1.0
+    return keys.argmax(axis=1)
+
+
+def winners(boards: np.ndarray) -> np.ndarray:
+    '''Returns 1, -1 or 0 (no line yet) for each row of a (K, 9) board array.'''
+    sums = boards[:, LINE_INDEX].sum(axis=2)
+    return (sums == 3).any(axis=1).astype(np.int8) - (sums == -3).any(axis=1).astype(np.int8)
+
+
+class TTTBatchRollout(BatchRollout):
+    '''Plays batch_size random tic-tac-toe games at once on a (K, 9) NumPy board array.
+
+    policy(boards, legal, rng) returns one square per board, for the rows of the games still in progress.
+    Works with any state exposing a 9-tuple board, i.e. TTTState and BitboardTTTState.'''
+
+    def __init__(self, batch_size: int=64, policy: Callable=uniform_policy, seed: int | None=None):
+        super().__init__(batch_size)
+        self.policy = policy
+        self.rng = np.random.default_rng(seed)
+
+    def rollout(self, state: GameState, player: int) -> float:
+        if state.is_terminal():
+            return state.reward(player)
+
+        boards = np.tile(np.asarray(state.board, dtype=np.int8), (self.batch_size, 1))
+        results = np.zeros(self.batch_size, dtype=np.int8)
+        active = np.arange(self.batch_size)
+        mover = state.current_player()
+
+        # Every game in progress plays one move per ply, so all of them have the same player to move
+        while active.size:
+            playing = boards[active]
+            moves = self.policy(playing, playing == 0, self.rng)
+            playing[np.arange(active.size), moves] = mover
+            boards[active] = playing
+
+            ply_winners = winners(playing)
+            results[active] = ply_winners
+            active = active[(ply_winners == 0) & (playing == 0).any(axis=1)]
+            mover = -mover
+
+        return float(np.mean(results * player))
@@ -0,0 +1,16 @@
+# ---------------------------
+# Tic-Tac-Toe Evaluator
+# ---------------------------
+
+import numpy as np
+from common.evaluator import NumpyEvaluator
+from common.game_state import GameState
+
+
+def encode_board(state: GameState) -> np.ndarray:
+    '''Board from the perspective of the player to move: 1 = own stone, -1 = opponent's.'''
+    return np.asarray(state.board, dtype=np.float64) * state.current_player()
+
+
+def make_ttt_evaluator(seed: int=0) -> NumpyEvaluator:
+    return NumpyEvaluator(encode_board, n_features=9, n_actions=9, seed=seed)
@@ -3,10 +3,35 @@
 # ------------------
 
 from __future__ import annotations
-from dataclasses import dataclass
+import random
+from dataclasses import dataclass, field
 from common.game_state import GameState
 
 
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
+    (0, 4, 8), (2, 4, 6)              # diagonals
+)
+
+
+def _winner(board) -> int | None:
+    for a, b, c in LINES:
+        s = board[a] + board[b] + board[c]
+        if s == 3:
+            return 1
+        elif s == -3:
+            return -1
+    return None
+
+
+# Zobrist keys, fixed so hashes are stable across processes
+_zobrist_rng = random.Random(0x77a)
+ZOBRIST_X = tuple(_zobrist_rng.getrandbits(64) for _ in range(9))
+ZOBRIST_O = tuple(_zobrist_rng.getrandbits(64) for _ in range(9))
+ZOBRIST_O_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
 @dataclass(frozen=True)
 class TTTState(GameState):
     board: tuple[int, ...]  # 0 = empty, 1 = X, -1 = O
@@ -38,22 +63,222 @@ class TTTState(GameState):
         return 1.0 if winner == player else -1.0
         # return 1.0 if (winner == 1 and player == 0) or (winner == -1 and player == 1) else -1.0
 
+    def hash_key(self) -> int:
+        key = ZOBRIST_O_TO_MOVE if self.current_player_index == -1 else 0
+        for i, v in enumerate(self.board):
+            if v == 1:
+                key ^= ZOBRIST_X[i]
+            elif v == -1:
+                key ^= ZOBRIST_O[i]
+        return key
+
+    def to_mutable(self) -> MutableTTTState:
+        return MutableTTTState(self.board, self.current_player_index)
+
     def _check_winner(self) -> int | None:
-        lines = [
-            (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
-            (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
-            (0, 4, 8), (2, 4, 6)              # diagonals
-        ]
-        for a, b, c in lines:
-            s = self.board[a] + self.board[b] + self.board[c]
-            if s == 3:
-                return 1
-            elif s == -3:
-                return -1
-        return None
+        return _winner(self.board)
     
     def __str__(self) -> str:
         symbols = {1: 'X', -1: 'O', 0: ' '}
         rows = ['|'.join(symbols[self.board[i * 3 + j]] for j in range(3)) for i in range(3)]
 
         return '\n-+-+-\n'.join(rows)
+
+
+class MutableTTTState(GameState):
+    '''TTTState that plays and takes back moves in place, see GameState.to_mutable.'''
+    __slots__ = ('board', 'current_player_index', '_history')
+
+    def __init__(self, board: tuple[int, ...], current_player_index: int):
+        self.board = list(board)
+        self.current_player_index = current_player_index
+        self._history: list[int] = []  # Square of each applied move
+
+    def apply(self, action: int):
+        if self.board[action] != 0:
+            raise ValueError("Invalid action")
+
+        self._history.append(action)
+        self.board[action] = self.current_player_index
+        self.current_player_index = -self.current_player_index
+
+    def undo(self):
+        self.board[self._history.pop()] = 0
+        self.current_player_index = -self.current_player_index
+
+    def snapshot(self) -> TTTState:
+        return TTTState(board=tuple(self.board), current_player_index=self.current_player_index)
+
+    def current_player(self) -> int:
+        return self.current_player_index
+
+    def legal_actions(self) -> list[int]:
+        return [i for i, v in enumerate(self.board) if v == 0]
+
+    def is_terminal(self) -> bool:
+        return self._check_winner() is not None or all(v != 0 for v in self.board)
+
+    def reward(self, player: int) -> float:
+        winner = self._check_winner()
+        if winner is None:
+            return 0.0  # Draw or ongoing
+
+        return 1.0 if winner == player else -1.0
+
+    def _check_winner(self) -> int | None:
+        return _winner(self.board)
+
+
+# ---------------------------
+# Bitboard Tic-Tac-Toe State
+# ---------------------------
+
+FULL_MASK = 0x1FF  # All 9 squares occupied
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in LINES)
+
+# Indexed by a 9-bit player bitboard: True if it contains a complete line
+HAS_LINE = tuple(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL_MASK + 1))
+
+# Indexed by a 9-bit empty-squares mask: the empty squares in ascending order, as TTTState returns them
+EMPTY_SQUARES = tuple(tuple(i for i in range(9) if empty >> i & 1) for empty in range(FULL_MASK + 1))
+
+
+def _zobrist_by_bits(keys: tuple[int, ...]) -> tuple[int, ...]:
+    table = [0] * (FULL_MASK + 1)
+    for bits in range(1, FULL_MASK + 1):
+        low = bits & -bits
+        table[bits] = table[bits ^ low] ^ keys[low.bit_length() - 1]
+    return tuple(table)
+
+
+# Indexed by a 9-bit player bitboard: the XOR of that player's Zobrist keys, equal to TTTState.hash_key
+ZOBRIST_X_BITS = _zobrist_by_bits(ZOBRIST_X)
+ZOBRIST_O_BITS = _zobrist_by_bits(ZOBRIST_O)
+
+
+@dataclass(frozen=True, slots=True)
+class BitboardTTTState(GameState):
+    x: int  # Bitboard of X stones, bit i = square i
+    o: int  # Bitboard of O stones
+    current_player_index: int  # 1 or -1
+    winner: int | None = field(init=False, repr=False, compare=False)  # Cached on construction
+
+    def __post_init__(self):
+        winner = 1 if HAS_LINE[self.x] else -1 if HAS_LINE[self.o] else None
+        object.__setattr__(self, 'winner', winner)
+
+    @classmethod
+    def from_board(cls, board: tuple[int, ...], current_player_index: int) -> BitboardTTTState:
+        x = sum(1 << i for i, v in enumerate(board) if v == 1)
+        o = sum(1 << i for i, v in enumerate(board) if v == -1)
+        return cls(x=x, o=o, current_player_index=current_player_index)
+
+    @property
+    def board(self) -> tuple[int, ...]:
+        return tuple(1 if self.x >> i & 1 else -1 if self.o >> i & 1 else 0 for i in range(9))
+
+    def current_player(self) -> int:
+        return self.current_player_index
+
+    def legal_actions(self) -> list[int]:
+        return list(EMPTY_SQUARES[~(self.x | self.o) & FULL_MASK])
+
+    def num_legal_actions(self) -> int:
+        return 9 - (self.x | self.o).bit_count()
+
+    def next_state(self, action: int) -> BitboardTTTState:
+        bit = 1 << action
+        if (self.x | self.o) & bit:
+            raise ValueError("Invalid action")
+
+        if self.current_player_index == 1:
+            return BitboardTTTState(x=self.x | bit, o=self.o, current_player_index=-1)
+        return BitboardTTTState(x=self.x, o=self.o | bit, current_player_index=1)
+
+    def is_terminal(self) -> bool:
+        return self.winner is not None or (self.x | self.o) == FULL_MASK
+
+    def reward(self, player: int) -> float:
+        if self.winner is None:
+            return 0.0  # Draw or ongoing
+
+        return 1.0 if self.winner == player else -1.0
+
+    def hash_key(self) -> int:
+        key = ZOBRIST_X_BITS[self.x] ^ ZOBRIST_O_BITS[self.o]
+        return key ^ ZOBRIST_O_TO_MOVE if self.current_player_index == -1 else key
+
+    def to_mutable(self) -> MutableBitboardTTTState:
+        return MutableBitboardTTTState(self.x, self.o, self.current_player_index)
+
+    def _check_winner(self) -> int | None:
+        return self.winner
+
+    def __str__(self) -> str:
+        symbols = {1: 'X', -1: 'O', 0: ' '}
+        board = self.board
+        rows = ['|'.join(symbols[board[i * 3 + j]] for j in range(3)) for i in range(3)]
+
+        return '\n-+-+-\n'.join(rows)
+
+
+class MutableBitboardTTTState(GameState):
+    '''BitboardTTTState that plays and takes back moves in place, see GameState.to_mutable.'''
+    __slots__ = ('x', 'o', 'current_player_index', 'winner', '_history')
+
+    def __init__(self, x: int, o: int, current_player_index: int):
+        self.x = x
+        self.o = o
+        self.current_player_index = current_player_index
+        self.winner = 1 if HAS_LINE[x] else -1 if HAS_LINE[o] else None
+        self._history: list[int] = []  # Bit of each applied move
+
+    def apply(self, action: int):
+        bit = 1 << action
+        if (self.x | self.o) & bit:
+            raise ValueError("Invalid action")
+
+        self._history.append(bit)
+        if self.current_player_index == 1:
+            self.x |= bit
+            if HAS_LINE[self.x]:
+                self.winner = 1
+        else:
+            self.o |= bit
+            if HAS_LINE[self.o]:
+                self.winner = -1
+        self.current_player_index = -self.current_player_index
+
+    def undo(self):
+        bit = self._history.pop()
+        self.current_player_index = -self.current_player_index
+        if self.current_player_index == 1:
+            self.x ^= bit
+        else:
+            self.o ^= bit
+        self.winner = 1 if HAS_LINE[self.x] else -1 if HAS_LINE[self.o] else None
+
+    def snapshot(self) -> BitboardTTTState:
+        return BitboardTTTState(x=self.x, o=self.o, current_player_index=self.current_player_index)
+
+    def current_player(self) -> int:
+        return self.current_player_index
+
+    def legal_actions(self) -> list[int]:
+        return list(EMPTY_SQUARES[~(self.x | self.o) & FULL_MASK])
+
+    def is_terminal(self) -> bool:
+        return self.winner is not None or (self.x | self.o) == FULL_MASK
+
+    def reward(self, player: int) -> float:
+        if self.winner is None:
+            return 0.0  # Draw or ongoing
+
+        return 1.0 if self.winner == player else -1.0
+
+    def hash_key(self) -> int:
+        key = ZOBRIST_X_BITS[self.x] ^ ZOBRIST_O_BITS[self.o]
+        return key ^ ZOBRIST_O_TO_MOVE if self.current_player_index == -1 else key
+
+    def _check_winner(self) -> int | None:
+        return self.winner
@@ -0,0 +1,37 @@
+import os
+import sys
+from dataclasses import dataclass
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir, 'src'))
+
+from common.game_state import GameState
+
+
+@dataclass(frozen=True)
+class WideState(GameState):
+    '''Synthetic game with a fixed branching factor, ending after two moves.'''
+    width: int
+    depth: int = 0
+    player: int = 1
+
+    def current_player(self) -> int:
+        return self.player
+
+    def legal_actions(self) -> list[int]:
+        return list(range(self.width))
+
+    def next_state(self, action: int) -> 'WideState':
+        return WideState(width=self.width, depth=self.depth + 1, player=-self.player)
+
+    def is_terminal(self) -> bool:
+        return self.depth >= 2
+
+    def reward(self, player: int) -> float:
+        return 0.0
+
+
+@pytest.fixture
+def wide_state():
+    '''Returns a WideState factory: wide_state(width).'''
+    return WideState
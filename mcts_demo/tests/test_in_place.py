@@ -0,0 +1,21 @@
+import random
+import pytest
+from common.mcts import MCTS
+from grid_state import ConnectFourState, GomokuState
+from ttt_state import BitboardTTTState, TTTState
+
+
+@pytest.mark.parametrize('state, n_sim', [
+    (TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1), 1000),
+    (BitboardTTTState.from_board((0, 0, 0, 0, 0, 0, 0, 0, 0), 1), 1000),
+    (ConnectFourState(), 500),
+    (GomokuState(), 100),
+])
+def test_in_place_search_matches_immutable(state, n_sim):
+    moves = []
+    for in_place in (False, True):
+        random.seed(0)
+        mcts = MCTS(in_place=in_place)
+        moves.append(mcts.search(state, n_sim=n_sim))
+        assert mcts.last_search.simulations == n_sim
+    assert moves[0] == moves[1]
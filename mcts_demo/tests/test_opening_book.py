@@ -0,0 +1,41 @@
+import random
+import pytest
+from common.mcts import MCTS
+from common.opening_book import OpeningBook
+from ttt_state import BitboardTTTState
+
+EMPTY_BOARD = BitboardTTTState.from_board((0, 0, 0, 0, 0, 0, 0, 0, 0), 1)
+
+
+class CollidingState(BitboardTTTState):
+    def hash_key(self) -> int:
+        return EMPTY_BOARD.hash_key()  # Every position collides with the empty board
+
+
+@pytest.fixture(scope='module')
+def book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('book') / 'ttt.book')
+    random.seed(0)
+    OpeningBook.build(path, EMPTY_BOARD, 1, lambda position: MCTS().root_visits(position, 200))
+    with OpeningBook(path) as book:
+        yield book
+
+
+def test_colliding_position_with_illegal_book_moves_is_a_miss(book):
+    state = CollidingState(x=0b1, o=0b10, current_player_index=1)
+
+    assert book.get(EMPTY_BOARD) is not None
+    assert book.get(state) is None
+
+
+def test_start_and_step_answer_from_the_book(book):
+    visits = book.get(EMPTY_BOARD)
+    mcts = MCTS(opening_book=book)
+
+    mcts.start(EMPTY_BOARD)
+    stats = mcts.step(n_sim=100)
+
+    assert stats.reason == 'book'
+    assert stats.simulations == 0
+    assert mcts.visit_counts() == visits
+    assert mcts.stop() == max(visits, key=visits.get)
@@ -0,0 +1,41 @@
+import pytest
+from common.endgame_table import EndgameTable
+from common.mcts import MCTS
+from common.transposition_table import TranspositionTable
+from ttt_batch_rollout import TTTBatchRollout
+from ttt_evaluator import make_ttt_evaluator
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'tree': 'array', 'reuse_tree': True}, "reuse_tree is not supported with tree='array'."),
+    ({'tree': 'array', 'threads': 2}, "threads > 1 is not supported with tree='array'."),
+    ({'threads': 2, 'transposition_table': TranspositionTable()}, 'transposition_table is not supported with threads > 1.'),
+    ({'evaluator': make_ttt_evaluator(), 'reuse_tree': True}, 'reuse_tree is not supported with evaluator.'),
+    ({'endgame_table': EndgameTable(), 'threads': 4}, 'solver is not supported with threads > 1.'),
+    ({'in_place': True, 'batch_rollout': TTTBatchRollout(4)}, 'batch_rollout is not supported with in_place.'),
+    ({'evaluator': make_ttt_evaluator(), 'batch_rollout': TTTBatchRollout(4)}, 'batch_rollout is not supported with evaluator.'),
+])
+def test_incompatible_options(options, message):
+    with pytest.raises(ValueError, match=message.replace('(', r'\(')):
+        MCTS(**options)
+
+
+@pytest.mark.parametrize('options', [
+    {'reuse_tree': True, 'threads': 4},
+    {'transposition_table': TranspositionTable(), 'solver': True, 'in_place': True},
+    {'evaluator': make_ttt_evaluator(), 'eval_batch_size': 1},
+    {'tree': 'array', 'batch_rollout': TTTBatchRollout(4), 'profile': True},
+])
+def test_compatible_options(options):
+    MCTS(**options)
+
+
+@pytest.mark.parametrize('eval_batch_size', [0, -1])
+def test_eval_batch_size_below_one(eval_batch_size):
+    with pytest.raises(ValueError, match=f'eval_batch_size must be at least 1, got {eval_batch_size}.'):
+        MCTS(evaluator=make_ttt_evaluator(), eval_batch_size=eval_batch_size)
+
+
+def test_unknown_tree():
+    with pytest.raises(ValueError, match='Unknown tree type'):
+        MCTS(tree='list')
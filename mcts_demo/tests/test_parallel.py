@@ -0,0 +1,51 @@
+import pickle
+import random
+import pytest
+from common.mcts import MCTS
+from common.opening_book import OpeningBook
+from common.parallel import ParallelMCTS
+from ttt_state import BitboardTTTState
+
+EMPTY_BOARD = BitboardTTTState.from_board((0, 0, 0, 0, 0, 0, 0, 0, 0), 1)
+
+
+@pytest.fixture(scope='module')
+def leaf_parallel():
+    with ParallelMCTS(workers=2, mode='leaf', leaf_rollouts=7, leaf_batch=3) as mcts:
+        yield mcts
+
+
+@pytest.mark.parametrize('n_sim', [1, 5, 33, 500])
+def test_leaf_parallel_runs_exactly_n_sim(leaf_parallel, n_sim):
+    random.seed(0)
+    visits, winning_action = leaf_parallel._leaf_parallel(EMPTY_BOARD, n_sim)
+    assert winning_action is None
+    assert sum(visits.values()) == n_sim
+
+
+def test_root_parallel_sums_the_workers_visits():
+    random.seed(0)
+    with ParallelMCTS(workers=2, mode='root') as mcts:
+        visits, _ = mcts._root_parallel(EMPTY_BOARD, 501)
+    assert sum(visits.values()) == 501
+
+
+def test_book_positions_skip_the_workers(tmp_path):
+    path = str(tmp_path / 'ttt.book')
+    random.seed(0)
+    OpeningBook.build(path, EMPTY_BOARD, 1, lambda position: MCTS().root_visits(position, 200))
+
+    with OpeningBook(path) as book:
+        visits = book.get(EMPTY_BOARD)
+        for mode in ('root', 'leaf'):
+            with ParallelMCTS(workers=2, mode=mode, opening_book=book) as parallel:
+                assert parallel.search(EMPTY_BOARD, n_sim=200) == max(visits, key=visits.get)
+                assert parallel._executor is None  # Answered without starting the pool
+
+        assert pickle.loads(pickle.dumps(book)).get(EMPTY_BOARD) == visits
+
+
+@pytest.mark.parametrize('option', ['workers', 'leaf_rollouts', 'leaf_batch'])
+def test_options_below_one_are_rejected(option):
+    with pytest.raises(ValueError, match=f'{option} must be at least 1, got 0.'):
+        ParallelMCTS(mode='leaf', **{option: 0})
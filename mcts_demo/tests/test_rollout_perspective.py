@@ -0,0 +1,15 @@
+import random
+import pytest
+from common.mcts import MCTS
+from ttt_state import TTTState
+
+# O threatens 0-1-2 and X, to move, has no win of its own: only 2 saves the game
+MUST_BLOCK = TTTState(board=(-1, -1, 0, 0, 1, 0, 0, 0, 1), current_player_index=1)
+
+
+@pytest.mark.parametrize('tree', ['node', 'array'])
+@pytest.mark.parametrize('seed', range(5))
+def test_search_blocks_the_opponents_win(tree, seed):
+    # Rollouts scored for the wrong player make the search prefer the moves that lose
+    random.seed(seed)
+    assert MCTS(tree=tree).search(MUST_BLOCK, n_sim=500) == 2
@@ -0,0 +1,87 @@
+import random
+from common.endgame_table import EndgameTable
+from common.mcts import MCTS
+from ttt_state import BitboardTTTState
+
+EMPTY_BOARD = BitboardTTTState.from_board((0, 0, 0, 0, 0, 0, 0, 0, 0), 1)
+
+
+def solve(state, mcts):
+    mcts.start(state)
+    root = mcts._search_root
+    stats = mcts.step(n_sim=1_000_000)
+    action = mcts.stop()
+    return root, stats, action
+
+
+def test_empty_board_is_a_draw():
+    random.seed(0)
+    root, stats, _ = solve(EMPTY_BOARD, MCTS(solver=True))
+
+    assert stats.reason == 'solved'
+    assert root.proven == 0.0
+
+
+def test_lost_position():
+    # X threatens 0-3-6 and 6-7-8, O to move cannot block both
+    state = BitboardTTTState.from_board((1, 0, -1, 0, -1, 0, 1, 0, 1), -1)
+
+    random.seed(0)
+    root, stats, _ = solve(state, MCTS(solver=True))
+
+    assert stats.reason == 'solved'
+    assert root.proven == 1.0  # Won for X, who moved into the root
+
+
+def test_winning_move_is_chosen():
+    # X to move wins with 2
+    state = BitboardTTTState.from_board((1, 1, 0, -1, -1, 0, 0, 0, 0), 1)
+
+    random.seed(0)
+    root, stats, action = solve(state, MCTS(solver=True))
+
+    assert action == 2
+    assert MCTS(solver=True).search(state, n_sim=100) == 2
+
+
+def test_endgame_table_values_and_round_trip(tmp_path):
+    random.seed(0)
+    table = EndgameTable()
+    root, _, _ = solve(EMPTY_BOARD, MCTS(endgame_table=table))
+
+    assert table.get(EMPTY_BOARD) == -root.proven  # The table scores the player to move
+    win = BitboardTTTState.from_board((1, 1, 0, -1, -1, 0, 0, 0, 0), 1)
+    if table.get(win) is not None:
+        assert table.get(win) == 1.0
+
+    path = str(tmp_path / 'ttt.egt')
+    table.save(path)
+    loaded = EndgameTable(path)
+    assert len(loaded) == len(table)
+    assert loaded._values == table._values
+
+    # A search that starts from a solved position knows its value without simulating
+    random.seed(0)
+    root, stats, _ = solve(EMPTY_BOARD, MCTS(endgame_table=loaded))
+    assert root.proven == 0.0
+    assert stats.simulations < 2000
+
+
+class CollidingState(BitboardTTTState):
+    def hash_key(self) -> int:
+        return 42  # Every position collides
+
+
+def test_endgame_table_detects_hash_collisions(tmp_path):
+    a = CollidingState(x=0b1, o=0, current_player_index=-1)
+    b = CollidingState(x=0b10, o=0, current_player_index=-1)
+    table = EndgameTable()
+    table.put(a, 1.0)
+
+    assert table.get(a) == 1.0
+    assert table.get(b) is None
+
+    path = str(tmp_path / 'colliding.egt')
+    table.save(path)
+    assert EndgameTable(path).get(b) is None
+    assert EndgameTable(path).get(a) == 1.0
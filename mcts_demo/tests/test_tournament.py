@@ -0,0 +1,37 @@
+import pytest
+from tournament import parse_player, run_tournament, score_interval, wilson_interval
+
+
+def test_parse_player():
+    assert parse_player('random') == ('random', {})
+    assert parse_player('mcts:n_sim=400,tree=array,solver=true,c_puct=1.5') == \
+        ('mcts', {'n_sim': 400, 'tree': 'array', 'solver': True, 'c_puct': 1.5})
+
+
+@pytest.mark.parametrize('spec, message', [
+    ('alphazero', 'Unknown player'),
+    ('mcts:n_sim', 'Expected key=value'),
+    ('mcts:nsim=400', 'Unknown option'),
+    ('mcts:evaluator=x', 'Unknown option'),
+    ('random:n_sim=10', 'takes no options'),
+])
+def test_bad_specs_fail_before_any_game(spec, message):
+    with pytest.raises(ValueError, match=message):
+        run_tournament([('random', spec)], n_games=2, workers=1)
+
+
+@pytest.mark.parametrize('spec', ['mcts:puct=8', 'mcts:batch_rollout=16'])
+def test_ttt_only_options_are_rejected_for_other_games(spec):
+    assert parse_player(spec, 'ttt')[0] == 'mcts'
+    for game in ('connect-four', 'gomoku'):
+        with pytest.raises(ValueError, match=f"only support tic-tac-toe, not '{game}'"):
+            run_tournament([(spec, 'random')], n_games=2, workers=1, game=game)
+
+
+def test_score_interval():
+    assert score_interval(0, 100, 100) == (0.5, 0.5)  # All draws: no variance
+    low, high = score_interval(40, 20, 100)
+    assert low < 0.5 < high
+    # Draws shrink the interval against the same score from wins and losses only
+    assert high - low < score_interval(50, 0, 100)[1] - score_interval(50, 0, 100)[0]
+    assert score_interval(50, 0, 100) == pytest.approx(wilson_interval(50, 100), abs=0.01)
@@ -0,0 +1,41 @@
+import random
+import pytest
+from common.mcts import MCTS
+from common.transposition_table import TranspositionTable
+from ttt_state import TTTState
+
+EMPTY_BOARD = TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1)
+
+
+def reachable(root):
+    seen, stack = {id(root)}, [root]
+    while stack:
+        for child in stack.pop().children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return len(seen)
+
+
+@pytest.mark.parametrize('max_entries', [20, 200])
+def test_tree_stays_within_max_entries(max_entries):
+    random.seed(0)
+    table = TranspositionTable(max_entries)
+    mcts = MCTS(transposition_table=table)
+    mcts.start(EMPTY_BOARD)
+    mcts.step(n_sim=3000)
+
+    assert table.evictions > 0
+    assert len(table) <= max_entries
+    assert reachable(mcts._search_root) <= max_entries
+    assert mcts.stop() in EMPTY_BOARD.legal_actions()
+
+
+def test_nodes_counts_only_new_nodes():
+    random.seed(0)
+    table = TranspositionTable()
+    mcts = MCTS(transposition_table=table)
+    mcts.search(EMPTY_BOARD, n_sim=2000)
+
+    assert table.hits > 0
+    assert mcts.last_search.nodes == len(table) - 1  # The root is not an expansion
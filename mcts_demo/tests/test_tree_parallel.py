@@ -0,0 +1,59 @@
+import random
+import pytest
+from common.mcts import MCTS
+from ttt_state import BitboardTTTState
+
+EMPTY_BOARD = BitboardTTTState.from_board((0, 0, 0, 0, 0, 0, 0, 0, 0), 1)
+
+
+def nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.children)
+
+
+@pytest.mark.parametrize('threads', [2, 4, 8])
+def test_root_visits_equal_simulations(threads):
+    random.seed(0)
+    mcts = MCTS(threads=threads)
+    mcts.start(EMPTY_BOARD)
+    root = mcts._search_root
+    stats = mcts.step(2000)
+    mcts.stop()
+
+    assert stats.reason == 'n_sim'
+    assert stats.simulations == 2000
+    assert root.N == 2000
+    assert sum(child.N for child in root.children) == 2000  # No simulation ends at the empty board
+
+
+@pytest.mark.parametrize('threads', [2, 8])
+def test_virtual_loss_is_taken_back(threads):
+    # Rollout values are whole numbers, so a virtual loss of 0.25 left anywhere shows in W
+    random.seed(0)
+    mcts = MCTS(threads=threads, virtual_loss=0.25)
+    mcts.start(EMPTY_BOARD)
+    root = mcts._search_root
+    mcts.step(2000)
+    mcts.stop()
+
+    for node in nodes(root):
+        assert node.W == round(node.W), f'virtual loss left on {node}'
+        assert abs(node.W) <= node.N
+
+
+def test_same_statistics_shape_as_serial():
+    random.seed(0)
+    serial = MCTS()
+    serial.start(EMPTY_BOARD)
+    serial.step(2000)
+
+    random.seed(0)
+    parallel = MCTS(threads=4)
+    parallel.start(EMPTY_BOARD)
+    parallel.step(2000)
+
+    assert set(serial.visit_counts()) == set(parallel.visit_counts()) == set(range(9))
+    assert parallel.stop() == serial.stop() == 4
@@ -0,0 +1,46 @@
+import random
+import pytest
+from common.array_tree import ArrayTree
+from common.mcts import MCTS
+from common.mcts_node import MCTSNode
+from ttt_state import TTTState
+
+EMPTY_BOARD = TTTState(board=(0, 0, 0, 0, 0, 0, 0, 0, 0), current_player_index=1)
+
+
+@pytest.mark.parametrize('width', [9, 32, 100, 1000])
+def test_selection_paths_agree(wide_state, width):
+    rng = random.Random(width)
+    state = wide_state(width=width)
+    root, tree = MCTSNode(state=state), ArrayTree(state)
+    for _ in range(width):
+        node, (index, _) = root.expand(), tree.expand(ArrayTree.ROOT, state)
+        node.N = tree.N[index] = rng.randrange(1, 1000)
+        node.W = tree.W[index] = rng.uniform(-node.N, node.N)
+    root.N = tree.N[ArrayTree.ROOT] = sum(child.N for child in root.children)
+
+    first = tree.first_child[ArrayTree.ROOT]
+    assert (root.children.index(root.best_child(1.4))
+            == tree.best_child(ArrayTree.ROOT, 1.4) - first
+            == tree.best_child_vectorized(ArrayTree.ROOT, 1.4) - first)
+
+
+def test_node_and_array_trees_choose_the_same_moves():
+    rng = random.Random(1234)
+    for game in range(10):
+        state = EMPTY_BOARD
+        for _ in range(rng.randrange(0, 5)):
+            state = state.next_state(rng.choice(state.legal_actions()))
+
+        moves = []
+        for tree in ('node', 'array'):
+            random.seed(game)
+            moves.append(MCTS(tree=tree).search(state, n_sim=300))
+        assert moves[0] == moves[1], f'position {game}: {state.board}'
+
+
+def test_array_tree_replays_node_states():
+    tree = ArrayTree(EMPTY_BOARD)
+    node, state = tree.expand(ArrayTree.ROOT, EMPTY_BOARD)
+    node, state = tree.expand(node, state)
+    assert tree.state(node) == state == EMPTY_BOARD.next_state(tree.action[tree.parent[node]]).next_state(tree.action[node])